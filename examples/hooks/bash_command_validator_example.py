@@ -29,17 +29,76 @@ Make sure to change your path to your actual script.
 """
 
 import json
-import re
+import os
+import shlex
 import sys
 
-# Define validation rules as a list of (regex pattern, message) tuples
+# Characters of control operators (";", "&&", "|", ...) and redirections
+# (">", ">&", "&>>", ...); shlex returns each run of them as one token
+_OPERATOR_CHARS = ";&|()<>\n"
+
+
+def _is_redirection(token: str) -> bool:
+    """True for redirection operators, including "&" in ">&", "&>" and "&>>"."""
+    return ("<" in token or ">" in token) and not token.strip("<>&|")
+
+
+def _pipelines(command: str) -> list[list[list[str]]]:
+    """Split a command line into pipelines of simple commands (argv lists).
+
+    Redirection operators and their targets are left out of the argv lists
+    (a descriptor number before the operator is kept).
+
+    >>> _pipelines("cd src && grep foo *.py | head")
+    [[['cd', 'src']], [['grep', 'foo', '*.py'], ['head']]]
+    >>> _pipelines("grep foo f 2>&1 | head")
+    [[['grep', 'foo', 'f', '2'], ['head']]]
+    >>> _pipelines("grep x > /dev/null 2>&1")
+    [[['grep', 'x', '2']]]
+    >>> _pipelines("make &> log; make &>> log; cmd >&2 & grep x")
+    [[['make']], [['make']], [['cmd']], [['grep', 'x']]]
+    """
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=_OPERATOR_CHARS)
+    lexer.whitespace = " \t\r"
+    lexer.whitespace_split = True
+    lexer.commenters = "#"
+
+    pipelines: list[list[list[str]]] = [[[]]]
+    try:
+        tokens = list(lexer)
+    except ValueError:
+        # Unbalanced quotes: fall back to whitespace splitting
+        tokens = command.split()
+    tokens = iter(tokens)
+    for token in tokens:
+        if _is_redirection(token):
+            # Skip the target too: "2>&1" is not the "&" operator
+            next(tokens, None)
+        elif token in ("|", "|&"):
+            pipelines[-1].append([])
+        elif token and not token.strip(_OPERATOR_CHARS):
+            pipelines.append([[]])
+        else:
+            pipelines[-1][-1].append(token)
+    return [[argv for argv in p if argv] for p in pipelines if any(p)]
+
+
+def _program(argv: list[str]) -> str:
+    return os.path.basename(argv[0])
+
+
+# Define validation rules as (check, message) tuples; each check gets one
+# pipeline, so commands after `&&` or `;` are checked too
 _VALIDATION_RULES = [
     (
-        r"^grep\b(?!.*\|)",
+        lambda pipeline: len(pipeline) == 1 and _program(pipeline[0]) == "grep",
         "Use 'rg' (ripgrep) instead of 'grep' for better performance and features",
     ),
     (
-        r"^find\s+\S+\s+-name\b",
+        lambda pipeline: any(
+            _program(argv) == "find" and len(argv) > 2 and argv[2] == "-name"
+            for argv in pipeline
+        ),
         "Use 'rg --files | rg pattern' or 'rg --files -g pattern' instead of 'find -name' for better performance",
     ),
 ]
@@ -47,8 +106,9 @@ _VALIDATION_RULES = [
 
 def _validate_command(command: str) -> list[str]:
     issues = []
-    for pattern, message in _VALIDATION_RULES:
-        if re.search(pattern, command):
+    pipelines = _pipelines(command)
+    for check, message in _VALIDATION_RULES:
+        if any(check(pipeline) for pipeline in pipelines):
             issues.append(message)
     return issues
 
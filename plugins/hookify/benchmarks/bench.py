@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""In-process microbenchmarks for hookify's config loader and rule engine.
+
+Measures extract_frontmatter, load_rules (cold and warm snapshot, from
+rule files or one rule pack) and
+RuleEngine.evaluate_rules / evaluate_many over synthetic rule sets and inputs, reports
+throughput and p50/p99 latency, and writes machine-readable results.
+
+Usage:
+    python3 bench.py [--quick] [--output results.json] [--compare old.json]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Allow running as a script: make the "hookify" package importable
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if os.path.dirname(PLUGIN_ROOT) not in sys.path:
+    sys.path.insert(0, os.path.dirname(PLUGIN_ROOT))
+
+from hookify.benchmarks import generators
+from hookify.core.config_loader import extract_frontmatter, load_rules
+from hookify.core.rule_engine import RuleEngine
+from hookify.core.rule_index import RuleIndex
+
+RULE_COUNTS = [10, 100, 1000, 10000]
+QUICK_RULE_COUNTS = [10, 100, 1000]
+
+
+def measure(fn: Callable[[], Any], min_time: float, max_iterations: int,
+            bytes_per_call: int = 0) -> Dict[str, Any]:
+    """Call fn repeatedly and summarize per-call latency."""
+    fn()  # warm-up (caches, lazily built indexes)
+    samples: List[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_iterations and (len(samples) < 5 or time.perf_counter() < deadline):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+
+    samples.sort()
+    mean = statistics.fmean(samples)
+    result = {
+        'iterations': len(samples),
+        'mean_ms': mean * 1e3,
+        'p50_ms': samples[len(samples) // 2] * 1e3,
+        'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e3,
+        'ops_per_sec': 1.0 / mean if mean else float('inf'),
+    }
+    if bytes_per_call:
+        result['mb_per_sec'] = bytes_per_call / mean / 1e6 if mean else float('inf')
+    return result
+
+
+def _input_size(input_data: Dict[str, Any]) -> int:
+    return len(json.dumps(input_data.get('tool_input', {})))
+
+
+def bench_parsing(counts: List[int], args) -> List[Dict[str, Any]]:
+    results = []
+    for count in counts:
+        texts = [generators.rule_file_text(r) for r in generators.make_rules(count, seed=count)]
+        total = sum(len(t) for t in texts)
+
+        def parse_all():
+            for text in texts:
+                extract_frontmatter(text)
+
+        results.append({'name': 'extract_frontmatter', 'params': {'rules': count},
+                        **measure(parse_all, args.min_time, args.max_iterations, total)})
+    return results
+
+
+def bench_loading(counts: List[int], args) -> List[Dict[str, Any]]:
+    results = []
+    cwd = os.getcwd()
+    for (layout, write), count in itertools.product(
+            (('rules', generators.write_rule_files), ('pack', generators.write_rule_pack)), counts):
+        with tempfile.TemporaryDirectory() as project, tempfile.TemporaryDirectory() as state:
+            write(generators.make_rules(count, seed=count), os.path.join(project, '.claude'))
+            os.environ['HOOKIFY_STATE_DIR'] = state
+            os.chdir(project)
+            try:
+                def load_cold():
+                    # Drop the snapshot and in-process memo: full parse
+                    for name in os.listdir(state):
+                        os.unlink(os.path.join(state, name))
+                    from hookify.core import config_loader
+                    config_loader._snapshot_memo.clear()
+                    config_loader._rule_memo.clear()
+                    load_rules()
+
+                def load_warm():
+                    # Fresh process equivalent: snapshot on disk, no memo
+                    from hookify.core import config_loader
+                    config_loader._snapshot_memo.clear()
+                    config_loader._rule_memo.clear()
+                    load_rules()
+
+                results.append({'name': f'load_{layout}_cold', 'params': {'rules': count},
+                                **measure(load_cold, args.min_time, args.max_iterations)})
+                results.append({'name': f'load_{layout}_warm', 'params': {'rules': count},
+                                **measure(load_warm, args.min_time, args.max_iterations)})
+                results.append({'name': f'load_{layout}_resident', 'params': {'rules': count},
+                                **measure(load_rules, args.min_time, args.max_iterations)})
+            finally:
+                os.chdir(cwd)
+                os.environ.pop('HOOKIFY_STATE_DIR', None)
+    return results
+
+
+def _inputs(args, workdir: str) -> Dict[str, Dict[str, Any]]:
+    mb = 1 << 20
+    transcript = os.path.join(workdir, 'transcript.jsonl')
+    generators.write_transcript(transcript, (8 if args.quick else 64) * mb)
+    return {
+        'bash_short': generators.bash_input(),
+        'write_1mb': generators.write_input(1 * mb),
+        'write_4mb': generators.write_input(4 * mb),
+        'multiedit_500': generators.multiedit_input(500),
+        'stop_transcript': generators.stop_input(transcript),
+    }
+
+
+def bench_evaluation(counts: List[int], args) -> List[Dict[str, Any]]:
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        inputs = _inputs(args, workdir)
+        for count in counts:
+            index = RuleIndex(generators.make_rules(count, seed=count))
+            engine = RuleEngine()
+            for input_name, input_data in inputs.items():
+                rules = index.rules_for_input(input_data['hook_event_name'], input_data)
+                size = _input_size(input_data)
+                if 'transcript_path' in input_data:
+                    size = os.path.getsize(input_data['transcript_path'])
+
+                results.append({
+                    'name': 'evaluate_rules',
+                    'params': {'rules': count, 'applicable_rules': len(rules), 'input': input_name},
+                    **measure(lambda: engine.evaluate_rules(rules, input_data),
+                              args.min_time, args.max_iterations, size),
+                })
+
+            # A replay-style stream of in-memory inputs, one evaluate_many call
+            batch = [v for k, v in inputs.items() if k != 'stop_transcript'] * 25
+
+            def run_batch():
+                for _ in engine.evaluate_many(index, batch):
+                    pass
+
+            results.append({
+                'name': 'evaluate_many',
+                'params': {'rules': count, 'inputs': len(batch)},
+                **measure(run_batch, args.min_time, args.max_iterations,
+                          sum(_input_size(i) for i in batch)),
+            })
+    return results
+
+
+def _key(result: Dict[str, Any]) -> str:
+    params = ','.join(f'{k}={v}' for k, v in sorted(result['params'].items())
+                      if k != 'applicable_rules')
+    return f"{result['name']}[{params}]"
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> int:
+    """Print p50 ratios against a previous run; return number of regressions."""
+    with open(baseline_path) as f:
+        baseline = {_key(r): r for r in json.load(f)['results']}
+
+    regressions = 0
+    print(f"\n{'benchmark':70} {'base p50':>10} {'new p50':>10} {'ratio':>7}")
+    for result in results:
+        old = baseline.get(_key(result))
+        if not old:
+            continue
+        ratio = result['p50_ms'] / old['p50_ms'] if old['p50_ms'] else float('inf')
+        flag = '  REGRESSION' if ratio > threshold else ''
+        regressions += bool(flag)
+        print(f"{_key(result):70} {old['p50_ms']:10.3f} {result['p50_ms']:10.3f} {ratio:7.2f}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--quick', action='store_true', help="smaller rule sets and inputs")
+    parser.add_argument('--only', choices=['parse', 'load', 'evaluate'], action='append',
+                        help="run only these groups (repeatable)")
+    parser.add_argument('--min-time', type=float, default=0.5,
+                        help="seconds to spend per benchmark (default 0.5)")
+    parser.add_argument('--max-iterations', type=int, default=1000)
+    parser.add_argument('--output', help="write results as JSON to this path")
+    parser.add_argument('--compare', metavar='BASELINE', help="compare with a previous --output file")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="p50 ratio above which --compare reports a regression")
+    args = parser.parse_args(argv)
+
+    counts = QUICK_RULE_COUNTS if args.quick else RULE_COUNTS
+    groups = args.only or ['parse', 'load', 'evaluate']
+    results: List[Dict[str, Any]] = []
+    if 'parse' in groups:
+        results += bench_parsing(counts, args)
+    if 'load' in groups:
+        results += bench_loading(counts, args)
+    if 'evaluate' in groups:
+        results += bench_evaluation(counts, args)
+
+    print(f"{'benchmark':70} {'iters':>6} {'p50 ms':>10} {'p99 ms':>10} {'ops/s':>10} {'MB/s':>8}")
+    for r in results:
+        mbs = f"{r['mb_per_sec']:8.1f}" if 'mb_per_sec' in r else ' ' * 8
+        print(f"{_key(r):70} {r['iterations']:6d} {r['p50_ms']:10.3f} {r['p99_ms']:10.3f} "
+              f"{r['ops_per_sec']:10.1f} {mbs}")
+
+    if args.output:
+        with open(os.path.join(PLUGIN_ROOT, '.claude-plugin', 'plugin.json')) as f:
+            version = json.load(f).get('version')
+        meta = {
+            'hookify_version': version,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': args.quick,
+        }
+        with open(args.output, 'w') as f:
+            json.dump({'meta': meta, 'results': results}, f, indent=2)
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Cold-start latency harness for plugin hook scripts.
+
+Runs each hook the way Claude Code does - a fresh `python3` subprocess with
+the hook JSON on stdin and CLAUDE_PLUGIN_ROOT set - and records wall time,
+import time (`-X importtime`) and peak RSS per hook and payload class.
+
+Covers the four hookify entry points, security-guidance's
+security_reminder_hook.py and examples/hooks/bash_command_validator_example.py.
+
+Usage:
+    python3 cold_start.py [--runs 20] [--with-server] [--output startup.json] [--compare old.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+# Allow running as a script: make the "hookify" package importable
+PLUGIN_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if os.path.dirname(PLUGIN_ROOT) not in sys.path:
+    sys.path.insert(0, os.path.dirname(PLUGIN_ROOT))
+
+from hookify.benchmarks import generators
+from hookify.benchmarks.bench import compare
+
+PLUGINS_DIR = os.path.dirname(PLUGIN_ROOT)
+REPO_ROOT = os.path.dirname(PLUGINS_DIR)
+SECURITY_ROOT = os.path.join(PLUGINS_DIR, 'security-guidance')
+
+# name -> (script, CLAUDE_PLUGIN_ROOT, payload classes it is registered for)
+HOOKS = {
+    'hookify/pretooluse': (os.path.join(PLUGIN_ROOT, 'hooks', 'pretooluse.py'), PLUGIN_ROOT,
+                           ['bash_short', 'read', 'write_1mb', 'multiedit_500']),
+    'hookify/posttooluse': (os.path.join(PLUGIN_ROOT, 'hooks', 'posttooluse.py'), PLUGIN_ROOT,
+                            ['bash_short', 'read', 'write_1mb']),
+    'hookify/stop': (os.path.join(PLUGIN_ROOT, 'hooks', 'stop.py'), PLUGIN_ROOT,
+                     ['stop']),
+    'hookify/userpromptsubmit': (os.path.join(PLUGIN_ROOT, 'hooks', 'userpromptsubmit.py'), PLUGIN_ROOT,
+                                 ['prompt']),
+    'security_reminder': (os.path.join(SECURITY_ROOT, 'hooks', 'security_reminder_hook.py'), SECURITY_ROOT,
+                          ['write_1mb', 'multiedit_500']),
+    'bash_command_validator': (os.path.join(REPO_ROOT, 'examples', 'hooks', 'bash_command_validator_example.py'),
+                               None, ['bash_short']),
+}
+
+
+def payloads(workdir: str) -> Dict[str, Dict[str, Any]]:
+    """Hook stdin payloads per class, written as Claude Code sends them."""
+    transcript = os.path.join(workdir, 'transcript.jsonl')
+    generators.write_transcript(transcript, 4 << 20)
+    common = {'session_id': 'cold-start-bench', 'transcript_path': transcript, 'cwd': workdir}
+    post = {'tool_response': {'stdout': 'ok', 'stderr': '', 'interrupted': False}}
+    return {
+        'bash_short': {**common, **generators.bash_input()},
+        'read': {**common, 'hook_event_name': 'PreToolUse', 'tool_name': 'Read',
+                 'tool_input': {'file_path': os.path.join(workdir, 'README.md')}},
+        'write_1mb': {**common, **generators.write_input(1 << 20)},
+        'multiedit_500': {**common, **generators.multiedit_input(500)},
+        'stop': {**common, 'hook_event_name': 'Stop', 'stop_hook_active': False},
+        'prompt': {**common, 'hook_event_name': 'UserPromptSubmit',
+                   'user_prompt': 'Please run the tests and fix any failures'},
+        '_post': post,
+    }
+
+
+def measure_hook(script: str, plugin_root: Optional[str], payload_path: str,
+                 env: Dict[str, str], cwd: str, runs: int) -> Dict[str, Any]:
+    """Spawn a hook `runs` times through the launcher and summarize."""
+    run_env = dict(env)
+    if plugin_root:
+        run_env['CLAUDE_PLUGIN_ROOT'] = plugin_root
+    spec = {
+        'cmd': [sys.executable, script],
+        'env': run_env,
+        'cwd': cwd,
+        'payload': payload_path,
+        'runs': runs,
+        'import_runs': max(1, runs // 4),
+    }
+    launcher = subprocess.run([sys.executable, os.path.join(os.path.dirname(__file__), 'spawn.py'),
+                               json.dumps(spec)], stdout=subprocess.PIPE, check=True)
+    report = json.loads(launcher.stdout)
+
+    walls = sorted(r['wall_s'] * 1e3 for r in report['runs'])
+    import_ms = sorted(_total_import_time(err) / 1e3 for err in report['importtime_stderr'])
+    return {
+        'iterations': len(walls),
+        'p50_ms': walls[len(walls) // 2],
+        'p99_ms': walls[min(len(walls) - 1, int(len(walls) * 0.99))],
+        'mean_ms': sum(walls) / len(walls),
+        'import_ms': import_ms[len(import_ms) // 2],
+        'peak_rss_kb': max(r['rss_kb'] for r in report['runs']),
+        'exit_codes': sorted({r['exit_code'] for r in report['runs']}),
+    }
+
+
+def _total_import_time(stderr: str) -> int:
+    """Sum cumulative time of top-level imports from -X importtime output."""
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|', 2)
+        if not name.startswith(' ' * 2):
+            # Top-level import (nested ones are indented further)
+            total += int(cumulative.strip())
+    return total
+
+
+def _start_server(project: str, env: Dict[str, str]) -> None:
+    subprocess.run([sys.executable, os.path.join(PLUGIN_ROOT, 'core', 'server.py'), 'start'],
+                   cwd=project, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def _stop_server(project: str, env: Dict[str, str]) -> None:
+    subprocess.run([sys.executable, os.path.join(PLUGIN_ROOT, 'core', 'server.py'), 'stop'],
+                   cwd=project, env=env, stdout=subprocess.DEVNULL)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=20, help="processes per hook/payload (default 20)")
+    parser.add_argument('--hook', action='append', choices=sorted(HOOKS),
+                        help="only these hooks (repeatable)")
+    parser.add_argument('--rules', type=int, default=0,
+                        help="also install this many synthetic hookify rules (default: examples only)")
+    parser.add_argument('--with-server', action='store_true',
+                        help="measure hookify hooks with the resident server running")
+    parser.add_argument('--output', help="write results as JSON to this path")
+    parser.add_argument('--compare', metavar='BASELINE', help="compare with a previous --output file")
+    parser.add_argument('--threshold', type=float, default=1.25)
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        project = os.path.join(workdir, 'project')
+        rules_dir = os.path.join(project, '.claude')
+        os.makedirs(rules_dir)
+        # The shipped examples as active rules, plus optional synthetic ones
+        for name in os.listdir(os.path.join(PLUGIN_ROOT, 'examples')):
+            shutil.copy(os.path.join(PLUGIN_ROOT, 'examples', name),
+                        os.path.join(rules_dir, f'hookify.{name}'))
+        if args.rules:
+            generators.write_rule_files(generators.make_rules(args.rules), rules_dir)
+
+        env = dict(os.environ)
+        env['HOME'] = workdir  # security_reminder keeps state under ~/.claude
+        env['HOOKIFY_STATE_DIR'] = os.path.join(workdir, 'state')
+        if not args.with_server:
+            env['HOOKIFY_NO_SERVER'] = '1'
+
+        classes = payloads(workdir)
+        post = classes.pop('_post')
+        payload_files = {}
+        for hook_name in args.hook or sorted(HOOKS):
+            for payload_class in HOOKS[hook_name][2]:
+                payload = dict(classes[payload_class])
+                if hook_name == 'hookify/posttooluse':
+                    payload = {**payload, **post, 'hook_event_name': 'PostToolUse'}
+                path = os.path.join(workdir, f'{hook_name.replace("/", "_")}-{payload_class}.json')
+                with open(path, 'w') as f:
+                    json.dump(payload, f)
+                payload_files[(hook_name, payload_class)] = path
+
+        if args.with_server:
+            _start_server(project, env)
+        try:
+            for (hook_name, payload_class), path in payload_files.items():
+                script, plugin_root = HOOKS[hook_name][:2]
+                results.append({
+                    'name': 'cold_start',
+                    'params': {'hook': hook_name, 'payload': payload_class},
+                    **measure_hook(script, plugin_root, path, env, project, args.runs),
+                })
+        finally:
+            if args.with_server:
+                _stop_server(project, env)
+
+    print(f"{'hook':28} {'payload':16} {'p50 ms':>9} {'p99 ms':>9} {'import ms':>10} {'peak RSS MB':>12} {'exit':>6}")
+    for r in results:
+        print(f"{r['params']['hook']:28} {r['params']['payload']:16} {r['p50_ms']:9.1f} {r['p99_ms']:9.1f} "
+              f"{r['import_ms']:10.1f} {r['peak_rss_kb'] / 1024:12.1f} {','.join(map(str, r['exit_codes'])):>6}")
+
+    if args.output:
+        with open(os.path.join(PLUGIN_ROOT, '.claude-plugin', 'plugin.json')) as f:
+            version = json.load(f).get('version')
+        meta = {
+            'hookify_version': version,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'runs': args.runs,
+            'rules': args.rules,
+            'with_server': args.with_server,
+        }
+        with open(args.output, 'w') as f:
+            json.dump({'meta': meta, 'results': results}, f, indent=2)
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
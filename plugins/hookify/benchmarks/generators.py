@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Synthetic rule sets and hook inputs for hookify benchmarks.
+
+Everything is generated from a seeded Random so runs are comparable across
+versions.
+"""
+
+import json
+import os
+import random
+from typing import Any, Dict, List
+
+from hookify.core.config_loader import Rule, Condition
+
+WORDS = [
+    'build', 'test', 'deploy', 'config', 'secret', 'token', 'user', 'cache',
+    'server', 'client', 'handler', 'request', 'response', 'logger', 'debug',
+    'value', 'index', 'buffer', 'stream', 'parser', 'module', 'package',
+]
+
+COMMANDS = [
+    'ls -la', 'git status', 'npm test', 'pytest -q', 'cargo build --release',
+    'rm -rf build/', 'grep -rn TODO src/', 'find . -name "*.py"',
+    'docker compose up -d', 'curl -s https://example.com/api | jq .',
+    'chmod 755 scripts/run.sh', 'python3 -m pip install -r requirements.txt',
+]
+
+# (field, operator, pattern factory) for each rule event
+_CONDITION_SHAPES = {
+    'bash': [
+        ('command', 'regex_match', lambda r, w: rf'{w}\s+-{r.choice("rfvqx")}'),
+        ('command', 'contains', lambda r, w: f'{w} --'),
+        ('command', 'starts_with', lambda r, w: w),
+        ('command', 'regex_match', lambda r, w: rf'^{w}\b.*\|'),
+    ],
+    'file': [
+        ('file_path', 'regex_match', lambda r, w: rf'{w}\.(ts|py|env)$'),
+        ('file_path', 'ends_with', lambda r, w: f'.{w}'),
+        ('new_text', 'contains', lambda r, w: f'{w}('),
+        ('new_text', 'regex_match', lambda r, w: rf'{w}_(KEY|SECRET)\s*=\s*["\']'),
+        ('content', 'not_contains', lambda r, w: f'@{w}'),
+    ],
+    'stop': [
+        ('transcript', 'not_contains', lambda r, w: f'{w} passed'),
+        ('transcript', 'regex_match', lambda r, w: rf'{w}\s+(failed|error)'),
+    ],
+    'prompt': [
+        ('user_prompt', 'contains', lambda r, w: w),
+        ('user_prompt', 'regex_match', lambda r, w: rf'\b{w}\b'),
+    ],
+}
+
+
+def _word(rng: random.Random) -> str:
+    return f'{rng.choice(WORDS)}{rng.randint(0, 999)}'
+
+
+def make_rules(count: int, seed: int = 0) -> List[Rule]:
+    """Generate count enabled rules with mixed events, operators and fields."""
+    rng = random.Random(seed)
+    events = ['bash', 'bash', 'file', 'file', 'stop', 'prompt']
+    rules = []
+    for i in range(count):
+        event = rng.choice(events)
+        shapes = _CONDITION_SHAPES[event]
+        conditions = []
+        for _ in range(rng.randint(1, 3)):
+            field, operator, pattern = rng.choice(shapes)
+            conditions.append(Condition(field=field, operator=operator,
+                                        pattern=pattern(rng, _word(rng))))
+        rules.append(Rule(
+            name=f'bench-rule-{i}',
+            enabled=True,
+            event=event,
+            conditions=conditions,
+            action=rng.choice(['warn', 'warn', 'block']),
+            tool_matcher=rng.choice([None, None, 'Bash', 'Edit|Write|MultiEdit']),
+            message=f'Benchmark rule {i} matched.',
+        ))
+    return rules
+
+
+def rule_file_text(rule: Rule) -> str:
+    """Render a rule in the .local.md format load_rules reads."""
+    lines = ['---', f'name: {rule.name}', f'enabled: {str(rule.enabled).lower()}',
+             f'event: {rule.event}', f'action: {rule.action}']
+    if rule.tool_matcher:
+        lines.append(f'tool_matcher: {rule.tool_matcher}')
+    lines.append('conditions:')
+    for c in rule.conditions:
+        lines.append(f'  - field: {c.field}')
+        lines.append(f'    operator: {c.operator}')
+        lines.append(f'    pattern: {c.pattern}')
+    lines += ['---', '', rule.message, '']
+    return '\n'.join(lines)
+
+
+def write_rule_files(rules: List[Rule], rules_dir: str) -> None:
+    """Write rules as hookify.<name>.local.md files into rules_dir."""
+    os.makedirs(rules_dir, exist_ok=True)
+    for rule in rules:
+        with open(os.path.join(rules_dir, f'hookify.{rule.name}.local.md'), 'w') as f:
+            f.write(rule_file_text(rule))
+
+
+def write_rule_pack(rules: List[Rule], rules_dir: str, name: str = 'bench') -> None:
+    """Write rules as one hookify.<name>.pack.jsonl rule pack into rules_dir."""
+    os.makedirs(rules_dir, exist_ok=True)
+    with open(os.path.join(rules_dir, f'hookify.{name}.pack.jsonl'), 'w') as f:
+        for rule in rules:
+            data = {'name': rule.name, 'enabled': rule.enabled, 'event': rule.event,
+                    'action': rule.action, 'message': rule.message,
+                    'conditions': [{'field': c.field, 'operator': c.operator, 'pattern': c.pattern}
+                                   for c in rule.conditions]}
+            if rule.tool_matcher:
+                data['tool_matcher'] = rule.tool_matcher
+            f.write(json.dumps(data) + '\n')
+
+
+def _text(rng: random.Random, size: int) -> str:
+    """Source-like text of roughly size characters."""
+    parts = []
+    total = 0
+    while total < size:
+        line = f'    {rng.choice(WORDS)}_{rng.choice(WORDS)} = {rng.choice(WORDS)}({rng.randint(0, 9999)})\n'
+        parts.append(line)
+        total += len(line)
+    return ''.join(parts)
+
+
+def bash_input(seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {
+        'hook_event_name': 'PreToolUse',
+        'tool_name': 'Bash',
+        'tool_input': {'command': f'{rng.choice(COMMANDS)} && {rng.choice(COMMANDS)}'},
+    }
+
+
+def write_input(size: int, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {
+        'hook_event_name': 'PreToolUse',
+        'tool_name': 'Write',
+        'tool_input': {'file_path': f'src/{rng.choice(WORDS)}.py', 'content': _text(rng, size)},
+    }
+
+
+def multiedit_input(edits: int, edit_size: int = 200, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    return {
+        'hook_event_name': 'PreToolUse',
+        'tool_name': 'MultiEdit',
+        'tool_input': {
+            'file_path': f'src/{rng.choice(WORDS)}.ts',
+            'edits': [{'old_string': _text(rng, edit_size), 'new_string': _text(rng, edit_size)}
+                      for _ in range(edits)],
+        },
+    }
+
+
+def write_transcript(path: str, size: int, seed: int = 0) -> None:
+    """Write a JSONL transcript of roughly size bytes."""
+    rng = random.Random(seed)
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < size:
+            entry = {
+                'type': rng.choice(['user', 'assistant']),
+                'message': {'content': _text(rng, rng.randint(200, 4000))},
+            }
+            line = json.dumps(entry) + '\n'
+            f.write(line)
+            written += len(line)
+
+
+def stop_input(transcript_path: str) -> Dict[str, Any]:
+    return {
+        'hook_event_name': 'Stop',
+        'reason': 'Task complete',
+        'transcript_path': transcript_path,
+    }
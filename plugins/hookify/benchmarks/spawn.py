@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Process launcher for the hookify cold-start harness.
+
+Linux carries a process's peak RSS across fork and exec, so a hook spawned
+directly by the harness would report the harness's own (much larger) peak.
+cold_start.py runs this small stdlib-only launcher instead, which spawns the
+hook processes and prints their timings as JSON. The floor for peak RSS is
+then a bare interpreter, below what any hook uses.
+
+Usage (internal):
+    python3 spawn.py SPEC_JSON
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+
+def run_once(cmd: List[str], payload_path: str, env: Dict[str, str], cwd: str) -> Dict[str, Any]:
+    """Run one hook process; return wall time, peak RSS, exit code and stderr."""
+    # Output goes to temp files so neither pipe can fill up and block the hook
+    with open(payload_path, 'rb') as stdin, tempfile.TemporaryFile() as out, \
+            tempfile.TemporaryFile() as err:
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdin=stdin, stdout=out, stderr=err, env=env, cwd=cwd)
+        # Reap with wait4 rather than Popen.wait to get the child's rusage
+        _, status, rusage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - t0
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        stdout_bytes = out.tell()
+        err.seek(0)
+        stderr = err.read()
+
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss_kb = rusage.ru_maxrss / 1024 if sys.platform == 'darwin' else rusage.ru_maxrss
+    return {
+        'wall_s': wall,
+        'rss_kb': rss_kb,
+        'exit_code': proc.returncode,
+        'stdout_bytes': stdout_bytes,
+        'stderr': stderr.decode('utf-8', 'replace'),
+    }
+
+
+def main() -> int:
+    spec = json.loads(sys.argv[1])
+    cmd, env, cwd = spec['cmd'], spec['env'], spec['cwd']
+    payload = spec['payload']
+
+    # One untimed run primes the OS page cache and the rule snapshot
+    run_once(cmd, payload, env, cwd)
+    runs = [run_once(cmd, payload, env, cwd) for _ in range(spec['runs'])]
+    for r in runs:
+        del r['stderr']
+    imports = [run_once(cmd[:1] + ['-X', 'importtime'] + cmd[1:], payload, env, cwd)
+               for _ in range(spec['import_runs'])]
+    json.dump({'runs': runs, 'importtime_stderr': [r['stderr'] for r in imports]}, sys.stdout)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
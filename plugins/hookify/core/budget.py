@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Evaluation budgets for hookify plugin.
+
+A rule with a catastrophically backtracking regex, or a transcript
+condition on a huge session, must not hold a tool call until the hook
+times out. Expensive conditions run under a Deadline: when it expires the
+condition is aborted, and its rule is reported and skipped. Field values
+are capped before matching; a rule whose result could differ on the rest
+of a capped value is reported and skipped the same way.
+
+Limits come from the environment (0 disables a limit):
+    HOOKIFY_CONDITION_BUDGET_MS  time per condition (default 1000)
+    HOOKIFY_HOOK_BUDGET_MS       time for all rules of one hook call (default 5000)
+    HOOKIFY_MAX_FIELD_BYTES      bytes of a field value that are matched (default 4 MiB)
+"""
+
+import os
+import signal
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+DEFAULT_CONDITION_BUDGET_MS = 1000
+# Hooks time out after 10 s; leave room for startup and rule loading
+DEFAULT_HOOK_BUDGET_MS = 5000
+DEFAULT_MAX_FIELD_BYTES = 4 * 1024 * 1024
+
+
+class BudgetExceeded(Exception):
+    """Raised when a condition or hook runs past its time or size budget."""
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+@dataclass
+class Budget:
+    """Time and size limits for one evaluation (0 means unlimited)."""
+    condition_ms: float = DEFAULT_CONDITION_BUDGET_MS
+    hook_ms: float = DEFAULT_HOOK_BUDGET_MS
+    max_field_bytes: int = DEFAULT_MAX_FIELD_BYTES
+
+    @classmethod
+    def from_env(cls) -> 'Budget':
+        """Create Budget from HOOKIFY_* environment variables."""
+        return cls(
+            condition_ms=_env_number('HOOKIFY_CONDITION_BUDGET_MS', DEFAULT_CONDITION_BUDGET_MS),
+            hook_ms=_env_number('HOOKIFY_HOOK_BUDGET_MS', DEFAULT_HOOK_BUDGET_MS),
+            max_field_bytes=int(_env_number('HOOKIFY_MAX_FIELD_BYTES', DEFAULT_MAX_FIELD_BYTES)),
+        )
+
+    def cap(self, value: str) -> str:
+        """Truncate value to max_field_bytes of UTF-8."""
+        limit = self.max_field_bytes
+        # A str of n chars encodes to at least n bytes, at most 4n
+        if not limit or len(value) * 4 <= limit:
+            return value
+        if len(value) > limit:
+            value = value[:limit]
+        data = value.encode('utf-8', 'surrogatepass')
+        if len(data) <= limit:
+            return value
+        return data[:limit].decode('utf-8', 'ignore')
+
+
+class Deadline:
+    """Context manager that aborts the enclosed code after `seconds`.
+
+    Uses SIGALRM, which the regex engine and file reads check while they
+    run. Where that is unavailable (Windows, or not the main thread) the
+    code runs unbounded.
+    """
+
+    def __init__(self, seconds: Optional[float], message: str = 'time budget exceeded'):
+        self.seconds = seconds
+        self.message = message
+        self._armed = False
+        self._old_handler = None
+        self._old_timer = (0.0, 0.0)
+        self._started = 0.0
+
+    def __enter__(self) -> 'Deadline':
+        if not self.seconds or not hasattr(signal, 'setitimer'):
+            return self
+        try:
+            self._old_handler = signal.signal(signal.SIGALRM, self._expired)
+        except ValueError:
+            # Signals can only be handled in the main thread
+            return self
+        self._started = time.monotonic()
+        self._old_timer = signal.setitimer(signal.ITIMER_REAL, self.seconds)
+        self._armed = True
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if not self._armed:
+            return
+        self._armed = False
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        # None: the previous handler was not installed from Python
+        signal.signal(signal.SIGALRM, self._old_handler if self._old_handler is not None
+                      else signal.SIG_DFL)
+        delay, interval = self._old_timer
+        if delay:
+            # Re-arm a timer someone else had set, minus the time we used
+            elapsed = time.monotonic() - self._started
+            signal.setitimer(signal.ITIMER_REAL, max(delay - elapsed, 1e-6), interval)
+
+    def _expired(self, signum, frame) -> None:
+        if self._armed:
+            raise BudgetExceeded(self.message)
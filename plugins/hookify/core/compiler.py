@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Rule compiler for hookify plugin.
+
+Turns each Rule into a CompiledRule once, when the rule set is loaded: the
+tool matcher is split into a set, conditions are kept in the order they
+should be checked, and each condition's operator is resolved to the
+function that applies it (regexes compiled up front). Evaluating a rule is
+then a loop over prepared predicates with no dispatch on operator strings.
+
+New operators and specialized matchers plug in here: an operator is an
+entry in OPERATORS, a factory that returns the test for one condition.
+"""
+
+import re
+import sys
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+from hookify.core.budget import BudgetExceeded
+from hookify.core.config_loader import Condition, Rule
+from hookify.core.fields import LINE_FIELDS, RESPONSE_FIELDS, Accessor, FieldView
+from hookify.core.match_lists import MATCHERS, list_entries
+
+# Fields scanned in chunks by their own matcher instead of being loaded as
+# one string (kept out of the literal prefilter and combined regex scans):
+# the transcript from disk, tool output from the hook input
+STREAMED_FIELDS = frozenset({'transcript'}) | RESPONSE_FIELDS
+# Operators the chunked scans apply; others read the whole value through
+# the field's accessor
+STREAMED_OPERATORS = frozenset({'regex_match', 'contains', 'not_contains',
+                                'equals', 'starts_with', 'ends_with'})
+# Operators applied to each line of a multi-valued field (a match on any
+# line counts); the others see the whole text
+PER_LINE_OPERATORS = frozenset({'equals', 'starts_with', 'ends_with',
+                                'in_set', 'path_prefix', 'glob_match'})
+
+# The result of each operator that the rest of a capped value can't change
+# (a literal found in the prefix is in the whole value)
+PREFIX_RESULTS = {'contains': True, 'not_contains': False, 'starts_with': True}
+
+# test(engine, value) -> bool, for one condition and a field value
+Test = Callable[[Any, str], bool]
+
+
+@lru_cache(maxsize=256)
+def parse_tool_matcher(matcher: Optional[str]) -> Optional[FrozenSet[str]]:
+    """Split a tool_matcher like "Edit|Write" once. None means any tool."""
+    if not matcher or matcher == '*':
+        return None
+    return frozenset(matcher.split('|'))
+
+
+class CompiledCondition:
+    """One condition, ready to check against a FieldView."""
+
+    __slots__ = ('condition', 'index', 'field', 'operator', 'pattern',
+                 'accessor', 'regex', 'test', 'per_line', 'check')
+
+    def __init__(self, condition: Condition, index: int):
+        """
+        Args:
+            condition: Condition as loaded
+            index: Its position in rule.conditions (profiler and cost model key)
+        """
+        self.condition = condition
+        self.index = index
+        self.field = condition.field
+        self.operator = condition.operator
+        self.pattern = condition.pattern
+        self.accessor: Accessor = condition.accessor
+        self.regex: Optional[re.Pattern] = None
+        factory = OPERATORS.get(self.operator, _never)
+        self.test: Test = factory(self)
+        self.per_line = self.field in LINE_FIELDS and self.operator in PER_LINE_OPERATORS
+        if self.per_line:
+            self.test = _any_line(self.test)
+        # check(engine, fields) -> bool
+        if (self.field in STREAMED_FIELDS and self.operator in STREAMED_OPERATORS
+                and factory is not _never):
+            self.check = self._check_streamed
+        else:
+            self.check = self._check_value
+
+    def _check_value(self, engine, fields: FieldView) -> bool:
+        value = fields.get(self.field, self.accessor)
+        if value is None:
+            return False
+        result = self.test(engine, value)
+        if self.field in fields.capped and not self._holds_uncapped(result, value):
+            raise BudgetExceeded(f"{self.field} is over {engine.budget.max_field_bytes} bytes "
+                                 f"(HOOKIFY_MAX_FIELD_BYTES) and {self.operator} "
+                                 f"depends on the rest of it")
+        return result
+
+    def _holds_uncapped(self, result: bool, value: str) -> bool:
+        # True if result, found on the capped prefix value, holds for the
+        # whole field value
+        if self.per_line:
+            # The last line may be cut short
+            return False
+        if not result and self.operator in ('equals', 'starts_with'):
+            # The whole value is longer still, so it can't match either
+            return len(self.pattern) <= len(value)
+        return PREFIX_RESULTS.get(self.operator) is result
+
+    def _check_streamed(self, engine, fields: FieldView) -> bool:
+        # A transcript passed inline is matched like any other field;
+        # otherwise the engine scans the session file from disk
+        if self.field in fields.tool_input:
+            return self._check_value(engine, fields)
+        if self.field in RESPONSE_FIELDS:
+            return engine.match_response(self, fields.input_data)
+        return engine.match_transcript(self, fields.input_data)
+
+
+class CompiledRule:
+    """An enabled rule reduced to a predicate over one hook input."""
+
+    __slots__ = ('rule', 'name', 'action', 'tools', 'conditions', 'order')
+
+    def __init__(self, rule: Rule):
+        self.rule = rule
+        self.name = rule.name
+        self.action = rule.action
+        # None means any tool
+        self.tools = parse_tool_matcher(rule.tool_matcher)
+        # The condition_order this was compiled for (see compiled_rule())
+        self.order = rule.condition_order
+        order = rule.condition_order or range(len(rule.conditions))
+        self.conditions: Tuple[CompiledCondition, ...] = tuple(
+            CompiledCondition(rule.conditions[i], i) for i in order)
+
+    def matches(self, engine, fields: FieldView) -> bool:
+        """True if the tool matches and every condition holds.
+
+        Rules without conditions never match.
+        """
+        if self.tools is not None and fields.tool_name not in self.tools:
+            return False
+        if not self.conditions:
+            return False
+        for condition in self.conditions:
+            if not condition.check(engine, fields):
+                return False
+        return True
+
+
+def compile_rule(rule: Rule) -> CompiledRule:
+    """Compile rule (re-reading its list files) and keep the result on it."""
+    compiled = rule.compiled = CompiledRule(rule)
+    return compiled
+
+
+def compiled_rule(rule: Rule) -> CompiledRule:
+    """Return the CompiledRule for rule, compiling it on first use.
+
+    The result is kept on the rule and rebuilt if its condition_order
+    has changed since.
+    """
+    compiled = rule.compiled
+    if compiled is None or compiled.order is not rule.condition_order:
+        compiled = compile_rule(rule)
+    return compiled
+
+
+# Operator factories: each takes the CompiledCondition and returns its test
+
+def _regex_match(condition: CompiledCondition) -> Test:
+    try:
+        condition.regex = re.compile(condition.pattern, re.IGNORECASE)
+    except re.error as e:
+        print(f"Invalid regex pattern '{condition.pattern}': {e}", file=sys.stderr)
+        return _never(condition)
+
+    def test(engine, value):
+        return engine.match_regex(condition, value)
+    return test
+
+
+def _contains(condition: CompiledCondition) -> Test:
+    def test(engine, value):
+        return engine.contains(condition, value)
+    return test
+
+
+def _not_contains(condition: CompiledCondition) -> Test:
+    def test(engine, value):
+        return not engine.contains(condition, value)
+    return test
+
+
+def _equals(condition: CompiledCondition) -> Test:
+    pattern = condition.pattern
+
+    def test(engine, value):
+        return value == pattern
+    return test
+
+
+def _starts_with(condition: CompiledCondition) -> Test:
+    pattern = condition.pattern
+
+    def test(engine, value):
+        return value.startswith(pattern)
+    return test
+
+
+def _ends_with(condition: CompiledCondition) -> Test:
+    pattern = condition.pattern
+
+    def test(engine, value):
+        return value.endswith(pattern)
+    return test
+
+
+def _list_match(condition: CompiledCondition) -> Test:
+    # The list is read and indexed here, once per compile
+    entries = list_entries(condition.pattern)
+    if entries is None:
+        return _never(condition)
+    match = MATCHERS[condition.operator](entries).matches
+
+    def test(engine, value):
+        return match(value)
+    return test
+
+
+def _any_line(test: Test) -> Test:
+    def any_line(engine, value):
+        return any(test(engine, line) for line in value.split('\n'))
+    return any_line
+
+
+def _never(condition: CompiledCondition) -> Test:
+    # Unknown operators (and invalid regexes) never match
+    def test(engine, value):
+        return False
+    return test
+
+
+OPERATORS: Dict[str, Callable[[CompiledCondition], Test]] = {
+    'regex_match': _regex_match,
+    'contains': _contains,
+    'not_contains': _not_contains,
+    'equals': _equals,
+    'starts_with': _starts_with,
+    'ends_with': _ends_with,
+    'in_set': _list_match,
+    'path_prefix': _list_match,
+    'glob_match': _list_match,
+}
@@ -1,24 +1,61 @@
 #!/usr/bin/env python3
 """Configuration loader for hookify plugin.
 
-Loads and parses .claude/hookify.*.local.md files.
+Loads and parses .claude/hookify.*.local.md files, and rule packs
+(.claude/hookify.*.pack.jsonl) that hold many rules in one file, from the
+user's, the project root's and nested packages' .claude directories.
 """
 
 import os
-import sys
-import glob
 import re
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass, field
+import sys
+import json
+import fnmatch
+import hashlib
+from typing import List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass, field, fields
+
+from hookify.core.fields import compile_field
+from hookify.utils.manifest import manifest_path, source_settings, write_manifest
+
+
+# Where rule files live, relative to the project root (and to each
+# directory below it, see rule_sources)
+RULES_DIR = '.claude'
+# Marks a project root when CLAUDE_PROJECT_DIR doesn't apply
+PROJECT_MARKER = '.git'
+RULE_FILE_PATTERN = 'hookify.*.local.md'
+RULE_PACK_PATTERN = 'hookify.*.pack.jsonl'
+
+# Values a rule pack is validated against
+EVENTS = ('bash', 'file', 'stop', 'prompt', 'all')
+ACTIONS = ('warn', 'block')
+OPERATORS = ('regex_match', 'contains', 'not_contains', 'equals', 'starts_with', 'ends_with',
+             'in_set', 'path_prefix', 'glob_match')
+
+# {{name}} in a rule pack's regex patterns refers to one of its pattern lists
+_PATTERN_LIST_REF = re.compile(r'\{\{\s*([\w.-]+)\s*\}\}')
+
+# Bump when the parsed Rule/Condition layout changes so stale snapshots are dropped
+SNAPSHOT_FORMAT = 3
+
+# In-process memo for long-lived processes (the hookify server): snapshot
+# file stat -> parsed snapshot, and rule file path -> (fingerprint, Rule)
+_snapshot_memo: Dict[str, Any] = {}
+_rule_memo: Dict[str, Any] = {}
 
 
 @dataclass
 class Condition:
     """A single condition for matching."""
-    field: str  # "command", "new_text", "old_text", "file_path", etc.
+    field: str  # "command", "new_text", etc., or a path like "tool_input.edits[*].old_string"
     operator: str  # "regex_match", "contains", "equals", etc.
     pattern: str  # Pattern to match
 
+    def __post_init__(self):
+        # Compiled field accessor (not a dataclass field, so not serialized)
+        self.accessor = compile_field(self.field)
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Condition':
         """Create Condition from dict."""
@@ -41,6 +78,13 @@ class Rule:
     tool_matcher: Optional[str] = None  # Override tool matching
     message: str = ""  # Message body from markdown
 
+    def __post_init__(self):
+        # Order in which to check conditions (indexes into conditions), set
+        # by RuleIndex from the cost model; None means file order
+        self.condition_order: Optional[Tuple[int, ...]] = None
+        # CompiledRule built from this rule (see compiler.compiled_rule)
+        self.compiled = None
+
     @classmethod
     def from_dict(cls, frontmatter: Dict[str, Any], message: str) -> 'Rule':
         """Create Rule from frontmatter dict and message body."""
@@ -196,7 +240,11 @@ def extract_frontmatter(content: str) -> tuple[Dict[str, Any], str]:
 
 
 def load_rules(event: Optional[str] = None) -> List[Rule]:
-    """Load all hookify rules from .claude directory.
+    """Load all hookify rules that apply in the current directory.
+
+    Rules come from every rule source (see rule_sources), merged; parsed
+    rules are reused from an on-disk snapshot when the rule files are
+    unchanged (see load_rule_snapshot).
 
     Args:
         event: Optional event filter ("bash", "file", "stop", etc.)
@@ -206,39 +254,407 @@ def load_rules(event: Optional[str] = None) -> List[Rule]:
     """
     rules = []
 
-    # Find all hookify.*.local.md files
-    pattern = os.path.join('.claude', 'hookify.*.local.md')
-    files = glob.glob(pattern)
+    for rule in load_rule_snapshot()['rules']:
+        # Filter by event if specified
+        if event:
+            if rule.event != 'all' and rule.event != event:
+                continue
+
+        # Only include enabled rules
+        if rule.enabled:
+            rules.append(rule)
+
+    return rules
+
+
+def project_root(start_dir: str = '.') -> str:
+    """Return the root of the project start_dir is in.
 
-    for file_path in files:
+    CLAUDE_PROJECT_DIR (which Claude Code sets for hooks) when start_dir is
+    inside it; otherwise the nearest directory at or above start_dir that
+    holds a PROJECT_MARKER; otherwise start_dir itself.
+    """
+    start = os.path.abspath(start_dir)
+    env_root = os.environ.get('CLAUDE_PROJECT_DIR')
+    if env_root:
+        env_root = os.path.abspath(env_root)
+        if start == env_root or start.startswith(env_root.rstrip(os.sep) + os.sep):
+            return env_root
+
+    path = start
+    while True:
+        if os.path.exists(os.path.join(path, PROJECT_MARKER)):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return start
+        path = parent
+
+
+def rule_sources(start_dir: str = '.') -> List[str]:
+    """Rule directories that apply in start_dir, lowest precedence first.
+
+    1. User-global rules: HOOKIFY_USER_RULES_DIR, default ~/.claude
+       (an empty HOOKIFY_USER_RULES_DIR turns them off)
+    2. The project root's .claude (see project_root)
+    3. The .claude of every directory below the root down to start_dir,
+       so a package in a monorepo can add rules of its own
+
+    Directories that don't exist are listed too, so creating one later is
+    noticed. A directory reached twice (the home directory as project
+    root) keeps its higher place.
+    """
+    start = os.path.abspath(start_dir)
+    root = project_root(start)
+    chain = [start]
+    while chain[-1] != root:
+        parent = os.path.dirname(chain[-1])
+        if parent == chain[-1]:
+            break
+        chain.append(parent)
+
+    user_dir = source_settings()[1]
+    sources = [os.path.abspath(os.path.expanduser(user_dir))] if user_dir else []
+    sources.extend(os.path.join(d, RULES_DIR) for d in reversed(chain))
+
+    seen = set()
+    unique = []
+    for rules_dir in reversed(sources):
+        real = os.path.realpath(rules_dir)
+        if real not in seen:
+            seen.add(real)
+            unique.append(rules_dir)
+    return unique[::-1]
+
+
+def load_rule_snapshot(rules_dir: Optional[str] = None, start_dir: str = '.') -> Dict[str, Any]:
+    """Load the rules that apply in start_dir, reusing the cached parse when possible.
+
+    Rules are read from every directory of rule_sources(start_dir) and
+    merged: a rule overrides every rule of the same name from directories
+    of lower precedence, so a project can replace a user-global rule, or
+    turn it off with a rule of that name and `enabled: false`. The merged
+    set is kept as one snapshot per start_dir, which also records the
+    sources, so the project root is only searched for again when one of
+    them changes.
+
+    Each rule file (or rule pack) is fingerprinted by (mtime_ns, size,
+    inode). Files whose fingerprint matches the snapshot are not opened;
+    only new or changed files are parsed. When a directory's mtime is
+    unchanged too, its listing is skipped and only the known files are
+    stat'ed.
+
+    The manifest hook scripts check before loading anything (see
+    utils/manifest.py) is rewritten along with the snapshot.
+
+    Args:
+        rules_dir: Load only this directory instead (no merging, no
+            manifest), e.g. to replay a rule set that isn't installed
+        start_dir: Directory rule sources are found from
+
+    Returns:
+        Dict with 'rules' (the merged rules, enabled or not: each source's
+        in file name order, a pack's rules in pack order, lowest
+        precedence first), 'sources' (the rule directories that exist, in
+        the same order) and 'version' (a digest identifying this exact
+        rule set), and 'changed' (True if this call found the rule files
+        changed since the snapshot and rewrote it).
+    """
+    if rules_dir is not None:
+        cache_path = _snapshot_path(rules_dir)
+        sources = [rules_dir]
+        return _load_sources(sources, _dir_mtimes(sources), cache_path, _read_snapshot(cache_path))
+
+    # Imported lazily: only needed when loading layered sources
+    from hookify.utils.state import state_path
+
+    cache_path = state_path('ruleset', start_dir)
+    snapshot = _read_snapshot(cache_path)
+    settings = source_settings()
+    sources = snapshot.get('sources') if snapshot and snapshot.get('settings') == settings else None
+    if sources:
+        dir_mtimes = _dir_mtimes(sources)
+        cached_dirs = snapshot.get('dirs', {})
+        if any(cached_dirs.get(d, {}).get('mtime') != dir_mtimes[d] for d in sources):
+            # A source changed: look for the project root again
+            sources = None
+    if not sources:
+        sources = rule_sources(start_dir)
+        dir_mtimes = _dir_mtimes(sources)
+    return _load_sources(sources, dir_mtimes, cache_path, snapshot, start_dir, settings)
+
+
+def _dir_mtimes(sources: List[str]) -> Dict[str, Optional[int]]:
+    """Rule directory -> st_mtime_ns, or None if it doesn't exist."""
+    mtimes: Dict[str, Optional[int]] = {}
+    for rules_dir in sources:
         try:
-            rule = load_rule_file(file_path)
-            if not rule:
+            mtimes[rules_dir] = os.stat(rules_dir).st_mtime_ns
+        except OSError:
+            mtimes[rules_dir] = None
+    return mtimes
+
+
+def _load_sources(sources: List[str], dir_mtimes: Dict[str, Optional[int]], cache_path: str,
+                  snapshot: Optional[Dict[str, Any]], start_dir: Optional[str] = None,
+                  settings: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Load and merge the rules of sources (see load_rule_snapshot).
+
+    The manifest is written for start_dir, if given.
+    """
+    cached_dirs = snapshot.get('dirs', {}) if snapshot else {}
+    changed = snapshot is None or snapshot.get('sources') != sources
+
+    # Per source: name -> fingerprint of its valid rule files, name -> rules
+    layers: List[Tuple[Dict[str, List[int]], Dict[str, List[Rule]]]] = []
+    # Fingerprints of every rule file, including invalid ones (for the manifest)
+    stats: Dict[str, List[int]] = {}
+
+    for rules_dir in sources:
+        dir_mtime = dir_mtimes[rules_dir]
+        cached = cached_dirs.get(rules_dir) or {}
+        cached_files = cached.get('files', {})
+        files: Dict[str, List[int]] = {}
+        rules_by_name: Dict[str, List[Rule]] = {}
+        layers.append((files, rules_by_name))
+        if dir_mtime is None:
+            changed = changed or cached.get('mtime') is not None
+            continue
+
+        if cached.get('mtime') == dir_mtime:
+            names = list(cached_files)
+        else:
+            names = _list_rule_files(rules_dir)
+            changed = True
+
+        for name in sorted(names):
+            file_path = os.path.join(rules_dir, name)
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                # Deleted since the directory was listed
+                changed = True
+                continue
+
+            fingerprint = [st.st_mtime_ns, st.st_size, st.st_ino]
+            stats[file_path] = fingerprint
+            memo = _rule_memo.get(file_path)
+            if memo and memo[0] == fingerprint:
+                rules_by_name[name] = memo[1]
+                files[name] = fingerprint
                 continue
 
-            # Filter by event if specified
-            if event:
-                if rule.event != 'all' and rule.event != event:
+            cached_file = cached_files.get(name)
+            if cached_file and cached_file['stat'] == fingerprint:
+                try:
+                    rules = [_rule_from_json(r) for r in cached_file['rules']]
+                except (KeyError, TypeError, ValueError, AttributeError):
+                    # Damaged entry: parse the file again below
+                    rules = None
+                if rules is not None:
+                    rules_by_name[name] = rules
+                    files[name] = fingerprint
+                    _rule_memo[file_path] = (fingerprint, rules)
                     continue
 
-            # Only include enabled rules
-            if rule.enabled:
-                rules.append(rule)
+            changed = True
+            try:
+                if fnmatch.fnmatchcase(name, RULE_PACK_PATTERN):
+                    rules = load_rule_pack(file_path)
+                else:
+                    rule = load_rule_file(file_path)
+                    rules = [rule] if rule else None
+            except Exception as e:
+                print(f"Warning: Unexpected error loading {file_path} ({type(e).__name__}): {e}", file=sys.stderr)
+                continue
+            if rules is not None:
+                for rule in rules:
+                    _warn_risky_patterns(rule, file_path)
+                rules_by_name[name] = rules
+                files[name] = fingerprint
+                _rule_memo[file_path] = (fingerprint, rules)
+            # Invalid files are not cached so they are retried (and reported) next time
+
+        if len(files) != len(cached_files):
+            changed = True
+
+    rules = _merge_layers([[rule for name in sorted(rules_by_name) for rule in rules_by_name[name]]
+                           for _, rules_by_name in layers])
+    if changed:
+        _write_snapshot(cache_path, {
+            'format': SNAPSHOT_FORMAT,
+            'loader': _loader_stamp(),
+            'settings': settings,
+            'sources': sources,
+            'dirs': {
+                rules_dir: {
+                    'mtime': dir_mtimes[rules_dir],
+                    'files': {
+                        name: {'stat': files[name],
+                               'rules': [_rule_to_json(r) for r in rules_by_name[name]]}
+                        for name in files
+                    },
+                }
+                for rules_dir, (files, rules_by_name) in zip(sources, layers)
+            },
+        })
+    if start_dir is not None and (changed or not os.path.exists(manifest_path(start_dir))):
+        write_manifest(start_dir, settings, dir_mtimes, stats, rules)
+
+    return {
+        'rules': rules,
+        'sources': [d for d in sources if dir_mtimes[d] is not None],
+        'changed': changed,
+        'version': _ruleset_version({
+            os.path.join(rules_dir, name): fingerprint
+            for rules_dir, (files, _) in zip(sources, layers)
+            for name, fingerprint in files.items()
+        }, sources),
+    }
+
+
+def _merge_layers(layers: List[List[Rule]]) -> List[Rule]:
+    """Rules of every layer (lowest precedence first), minus overridden ones.
+
+    A rule is dropped when a later layer has a rule of the same name.
+    """
+    merged: List[Rule] = []
+    later_names: set = set()
+    for rules in reversed(layers):
+        merged[:0] = [r for r in rules if r.name not in later_names]
+        later_names.update(r.name for r in rules)
+    return merged
 
-        except (IOError, OSError, PermissionError) as e:
-            # File I/O errors - log and continue
-            print(f"Warning: Failed to read {file_path}: {e}", file=sys.stderr)
-            continue
-        except (ValueError, KeyError, AttributeError, TypeError) as e:
-            # Parsing errors - log and continue
-            print(f"Warning: Failed to parse {file_path}: {e}", file=sys.stderr)
-            continue
-        except Exception as e:
-            # Unexpected errors - log with type details
-            print(f"Warning: Unexpected error loading {file_path} ({type(e).__name__}): {e}", file=sys.stderr)
+
+def _list_rule_files(rules_dir: str) -> List[str]:
+    """List rule file names in rules_dir."""
+    try:
+        with os.scandir(rules_dir) as it:
+            return [e.name for e in it
+                    if (fnmatch.fnmatchcase(e.name, RULE_FILE_PATTERN) or
+                        fnmatch.fnmatchcase(e.name, RULE_PACK_PATTERN)) and e.is_file()]
+    except OSError as e:
+        print(f"Warning: Failed to list {rules_dir}: {e}", file=sys.stderr)
+        return []
+
+
+def _ruleset_version(files: Dict[str, List[int]], sources: List[str] = ()) -> str:
+    """Digest identifying a rule set by its sources and files' fingerprints."""
+    payload = json.dumps([SNAPSHOT_FORMAT, _loader_stamp(), list(sources), sorted(files.items())])
+    return hashlib.sha1(payload.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+
+
+def _loader_stamp() -> int:
+    """mtime of this module, so plugin updates invalidate old snapshots."""
+    try:
+        return os.stat(__file__).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _warn_risky_patterns(rule: Rule, file_path: str) -> None:
+    """Warn about regexes that may backtrack catastrophically.
+
+    Runs when a rule file is (re)parsed, so each change is reported once.
+    """
+    # Imported lazily: only needed when a rule file changed
+    from hookify.core.regex_set import redos_risk
+
+    for condition in rule.conditions:
+        if condition.operator != 'regex_match':
             continue
+        reason = redos_risk(condition.pattern)
+        if reason:
+            print(f"Warning: {file_path}: pattern '{condition.pattern}' may backtrack "
+                  f"catastrophically ({reason}); it will be skipped when it exceeds "
+                  f"its time budget", file=sys.stderr)
 
-    return rules
+
+def _snapshot_path(rules_dir: str) -> str:
+    # Imported lazily: only needed when a rules directory exists
+    from hookify.utils.state import state_path
+    return state_path('rules', rules_dir)
+
+
+def _read_snapshot(cache_path: str) -> Optional[Dict[str, Any]]:
+    """Read a snapshot, returning None if missing, corrupt or stale."""
+    try:
+        st = os.stat(cache_path)
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        memo = _snapshot_memo.get(cache_path)
+        if memo and memo[0] == key:
+            return memo[1]
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict):
+        return None
+    if snapshot.get('format') != SNAPSHOT_FORMAT or snapshot.get('loader') != _loader_stamp():
+        return None
+    if not _snapshot_layout_ok(snapshot):
+        # Truncated or hand-edited: rebuild from the rule files
+        return None
+    _snapshot_memo[cache_path] = (key, snapshot)
+    return snapshot
+
+
+def _snapshot_layout_ok(snapshot: Dict[str, Any]) -> bool:
+    """Check the layout _load_sources relies on.
+
+    Cached rules are checked when they are rebuilt (see _load_sources).
+    """
+    sources = snapshot.get('sources')
+    dirs = snapshot.get('dirs')
+    if not isinstance(sources, list) or not isinstance(dirs, dict):
+        return False
+    if not all(isinstance(d, str) for d in sources):
+        return False
+    for entry in dirs.values():
+        if not isinstance(entry, dict) or not isinstance(entry.get('files'), dict):
+            return False
+        if entry.get('mtime') is not None and not isinstance(entry['mtime'], int):
+            return False
+        for cached in entry['files'].values():
+            if (not isinstance(cached, dict) or not isinstance(cached.get('stat'), list)
+                    or not isinstance(cached.get('rules'), list)):
+                return False
+    return True
+
+
+def _write_snapshot(cache_path: str, snapshot: Dict[str, Any]) -> None:
+    """Atomically replace the snapshot file. Failures are not fatal."""
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # json.dumps uses the C encoder; json.dump to a file does not
+            f.write(json.dumps(snapshot, separators=(',', ':')))
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Warning: Could not write rule cache {cache_path}: {e}", file=sys.stderr)
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def _rule_to_json(rule: Rule) -> Dict[str, Any]:
+    """Snapshot form of a Rule (like dataclasses.asdict, without the deep copy)."""
+    data = {name: getattr(rule, name) for name in _RULE_FIELDS}
+    data['conditions'] = [{name: getattr(c, name) for name in _CONDITION_FIELDS}
+                          for c in rule.conditions]
+    return data
+
+
+_RULE_FIELDS = tuple(f.name for f in fields(Rule))
+_CONDITION_FIELDS = tuple(f.name for f in fields(Condition))
+
+
+def _rule_from_json(data: Dict[str, Any]) -> Rule:
+    """Rebuild a Rule from its snapshot form (_rule_to_json output)."""
+    data = dict(data)
+    data['conditions'] = [Condition(**c) for c in data.get('conditions', [])]
+    return Rule(**data)
 
 
 def load_rule_file(file_path: str) -> Optional[Rule]:
@@ -274,6 +690,142 @@ def load_rule_file(file_path: str) -> Optional[Rule]:
         return None
 
 
+def load_rule_pack(file_path: str) -> Optional[List[Rule]]:
+    """Load a rule pack: many rules in one JSON Lines file.
+
+    The first line may be a header with shared settings:
+
+        {"pack": "security", "defaults": {"event": "bash", "action": "block"},
+         "patterns": {"secrets": ["AKIA[0-9A-Z]{16}", "ghp_[A-Za-z0-9]{36}"]}}
+
+    Every other line is one rule, with the same keys as a rule file's
+    frontmatter plus "message". Keys missing from a rule come from
+    "defaults". In regex_match patterns, {{secrets}} stands for any
+    pattern of that list. Invalid rules are reported and skipped.
+
+    Returns:
+        List of Rule objects, or None if the file can't be read.
+    """
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except (IOError, OSError, UnicodeDecodeError) as e:
+        print(f"Error: Cannot read {file_path}: {e}", file=sys.stderr)
+        return None
+
+    defaults: Dict[str, Any] = {}
+    pattern_lists: Dict[str, str] = {}
+    rules: List[Rule] = []
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            print(f"Warning: {file_path}:{line_no}: invalid JSON ({e}); rule skipped", file=sys.stderr)
+            continue
+
+        if isinstance(data, dict) and 'pack' in data and not rules:
+            error = _pack_header_error(data)
+            if error:
+                print(f"Warning: {file_path}:{line_no}: {error}; header ignored", file=sys.stderr)
+                continue
+            defaults = data.get('defaults', {})
+            pattern_lists = {
+                name: '(?:' + '|'.join(patterns) + ')'
+                for name, patterns in data.get('patterns', {}).items()
+            }
+            continue
+
+        if isinstance(data, dict):
+            data = {**defaults, **data}
+        error = _pack_rule_error(data, pattern_lists)
+        if error:
+            print(f"Warning: {file_path}:{line_no}: {error}; rule skipped", file=sys.stderr)
+            continue
+        rules.append(Rule.from_dict(_expand_pattern_lists(data, pattern_lists),
+                                    data.get('message', '')))
+    return rules
+
+
+def _pack_header_error(header: Dict[str, Any]) -> Optional[str]:
+    """Why a rule pack header is invalid, or None."""
+    defaults = header.get('defaults', {})
+    if not isinstance(defaults, dict):
+        return "'defaults' must be an object"
+    patterns = header.get('patterns', {})
+    if not isinstance(patterns, dict) or not all(
+            isinstance(v, list) and v and all(isinstance(p, str) for p in v)
+            for v in patterns.values()):
+        return "'patterns' must map names to non-empty lists of strings"
+    return None
+
+
+def _pack_rule_error(data: Any, pattern_lists: Dict[str, str]) -> Optional[str]:
+    """Why a rule pack line is not a valid rule, or None."""
+    if not isinstance(data, dict):
+        return "rule must be a JSON object"
+    name = data.get('name')
+    if not isinstance(name, str) or not name:
+        return "'name' is required"
+    if data.get('event', 'all') not in EVENTS:
+        return f"rule '{name}': unknown event {data.get('event')!r}"
+    if data.get('action', 'warn') not in ACTIONS:
+        return f"rule '{name}': unknown action {data.get('action')!r}"
+    if not isinstance(data.get('enabled', True), bool):
+        return f"rule '{name}': 'enabled' must be true or false"
+    for key in ('pattern', 'tool_matcher', 'message'):
+        if data.get(key) is not None and not isinstance(data[key], str):
+            return f"rule '{name}': '{key}' must be a string"
+
+    conditions = data.get('conditions')
+    if conditions is None:
+        if not data.get('pattern'):
+            return f"rule '{name}': needs 'conditions' or 'pattern'"
+        conditions = [{'operator': 'regex_match', 'pattern': data['pattern']}]
+    elif not isinstance(conditions, list) or not conditions:
+        return f"rule '{name}': 'conditions' must be a non-empty list"
+
+    for i, condition in enumerate(conditions):
+        where = f"rule '{name}' condition {i + 1}"
+        if not isinstance(condition, dict):
+            return f"{where}: must be an object"
+        if 'field' in condition and not isinstance(condition['field'], str):
+            return f"{where}: 'field' must be a string"
+        operator = condition.get('operator', 'regex_match')
+        if operator not in OPERATORS:
+            return f"{where}: unknown operator {operator!r}"
+        pattern = condition.get('pattern', '')
+        if not isinstance(pattern, str):
+            return f"{where}: 'pattern' must be a string"
+        for ref in _PATTERN_LIST_REF.findall(pattern):
+            if operator != 'regex_match':
+                return f"{where}: pattern lists can only be used with regex_match"
+            if ref not in pattern_lists:
+                return f"{where}: unknown pattern list '{ref}'"
+    return None
+
+
+def _expand_pattern_lists(data: Dict[str, Any], pattern_lists: Dict[str, str]) -> Dict[str, Any]:
+    """Replace {{name}} references with the pattern list's alternation."""
+    if not pattern_lists:
+        return data
+
+    def expand(pattern: str) -> str:
+        return _PATTERN_LIST_REF.sub(lambda m: pattern_lists[m.group(1)], pattern)
+
+    data = dict(data)
+    if isinstance(data.get('pattern'), str):
+        data['pattern'] = expand(data['pattern'])
+    if isinstance(data.get('conditions'), list):
+        data['conditions'] = [
+            {**c, 'pattern': expand(c.get('pattern', ''))}
+            if c.get('operator', 'regex_match') == 'regex_match' else c
+            for c in data['conditions']
+        ]
+    return data
+
+
 # For testing
 if __name__ == '__main__':
     import sys
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Condition ordering for hookify plugin.
+
+A rule matches only if all its conditions do, so they can be checked in
+any order. Checking cheap conditions that usually fail first (equals,
+starts_with) means the expensive ones (regexes over a multi-MB Write,
+transcript scans) run less often. Conditions are ranked by
+cost / (1 - pass rate), which minimizes the expected cost of the AND.
+
+Costs and pass rates are estimated from the operator and field, or taken
+from the profiler's measurements when `/hookify:stats` has recorded
+enough of them (see save_measured_costs).
+"""
+
+import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from hookify.core.config_loader import Condition, Rule
+from hookify.core.profiler import condition_label
+
+# Relative cost of one check, per operator (regexes include compilation
+# lookups and backtracking; unknown operators never match and cost nothing)
+OPERATOR_COST = {
+    'equals': 1.0,
+    'starts_with': 1.0,
+    'ends_with': 1.0,
+    'contains': 2.0,
+    'not_contains': 2.0,
+    'regex_match': 8.0,
+    # Hash, trie and glob lookups; in_set also splits the value into words
+    'in_set': 3.0,
+    'path_prefix': 1.5,
+    'glob_match': 2.0,
+}
+# Share of evaluations that pass, per operator, without measurements
+OPERATOR_PASS_RATE = {
+    'equals': 0.1,
+    'starts_with': 0.2,
+    'ends_with': 0.2,
+    'contains': 0.3,
+    'not_contains': 0.7,
+    'regex_match': 0.3,
+    'in_set': 0.1,
+    'path_prefix': 0.2,
+    'glob_match': 0.2,
+}
+# Fields that are usually long; scanning operators cost more on them
+LARGE_FIELDS = frozenset({'content', 'new_text', 'new_string', 'old_text', 'old_string',
+                          'user_prompt', 'tool_response', 'stdout', 'stderr'})
+LARGE_FIELD_FACTOR = 4.0
+# Transcript conditions read the session file from disk
+TRANSCRIPT_FACTOR = 1000.0
+# transcript.last_* fields read only its end
+TRANSCRIPT_TAIL_FACTOR = 20.0
+# Regexes flagged by redos_risk()
+RISKY_REGEX_FACTOR = 10.0
+
+# Evaluations a condition needs before its measured cost is trusted
+MIN_SAMPLES = 20
+MAX_PASS_RATE = 0.99
+
+
+def static_cost(condition: Condition) -> Tuple[float, float]:
+    """Estimated (cost, pass rate) of one condition."""
+    operator = condition.operator
+    if operator not in OPERATOR_COST:
+        return 0.0, 0.0
+    cost = OPERATOR_COST[operator]
+    if condition.field == 'transcript':
+        cost *= TRANSCRIPT_FACTOR
+    elif condition.field.startswith('transcript.last_'):
+        cost *= TRANSCRIPT_TAIL_FACTOR
+    elif operator not in ('equals', 'starts_with', 'ends_with', 'path_prefix', 'glob_match') and (
+            condition.field in LARGE_FIELDS or '[*]' in condition.field):
+        cost *= LARGE_FIELD_FACTOR
+    if operator == 'regex_match':
+        from hookify.core.regex_set import redos_risk
+        if redos_risk(condition.pattern):
+            cost *= RISKY_REGEX_FACTOR
+    return cost, OPERATOR_PASS_RATE[operator]
+
+
+def condition_order(rule: Rule,
+                    measured: Optional[Dict[str, List[Any]]] = None) -> Tuple[int, ...]:
+    """Indexes of rule.conditions in the order they should be checked.
+
+    Args:
+        rule: Rule whose conditions are ordered
+        measured: "rule name#index" -> [mean ms, pass rate, label], as
+            written by save_measured_costs(). Used only when every
+            condition of the rule has a measurement for its current label.
+    """
+    n = len(rule.conditions)
+    if n < 2:
+        return tuple(range(n))
+
+    costs = None
+    if measured:
+        costs = []
+        for i, condition in enumerate(rule.conditions):
+            entry = measured.get(f'{rule.name}#{i}')
+            if not entry or entry[2] != condition_label(condition):
+                costs = None
+                break
+            costs.append((entry[0], entry[1]))
+    if costs is None:
+        costs = [static_cost(c) for c in rule.conditions]
+
+    def rank(i: int) -> float:
+        cost, pass_rate = costs[i]
+        return cost / (1.0 - min(pass_rate, MAX_PASS_RATE))
+
+    # sorted() is stable: equal ranks keep file order
+    return tuple(sorted(range(n), key=rank))
+
+
+def costs_path(project_dir: str = '.') -> str:
+    from hookify.utils.state import state_path
+    return state_path('costs', project_dir)
+
+
+def save_measured_costs(conditions: Dict[str, List[Any]], path: str) -> None:
+    """Store measured condition costs for condition_order().
+
+    Args:
+        conditions: "rule name#index" -> [evaluated, matched, total ms,
+            max ms, label], as aggregated from the profiler's stats
+        path: Where to write them (costs_path())
+    """
+    measured = {
+        key: [total / evaluated, matched / evaluated, label]
+        for key, (evaluated, matched, total, _peak, label) in conditions.items()
+        if evaluated >= MIN_SAMPLES
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(measured, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except OSError:
+        # Measurements only tune the order; without them estimates are used
+        pass
+
+
+# path -> (stat, measurements) of the last read
+_measured_memo: Dict[str, Any] = {}
+
+
+def load_measured_costs(path: str) -> Tuple[Optional[Tuple[int, int]], Dict[str, List[Any]]]:
+    """Read save_measured_costs() output.
+
+    Returns:
+        (stat key of the file, or None if it doesn't exist; measurements)
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None, {}
+    key = (st.st_mtime_ns, st.st_size)
+    memo = _measured_memo.get(path)
+    if memo and memo[0] == key:
+        return memo
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            measured = json.load(f)
+    except (OSError, ValueError):
+        measured = {}
+    if not isinstance(measured, dict):
+        measured = {}
+    _measured_memo[path] = (key, measured)
+    return key, measured
+
+
+def order_rules(rules: Iterable[Rule], measured: Optional[Dict[str, List[Any]]] = None) -> None:
+    """Set condition_order on each rule."""
+    for rule in rules:
+        rule.condition_order = condition_order(rule, measured)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Per-session decision cache for hookify plugin.
+
+Agents often repeat a tool call verbatim (the same `npm test`, an Edit
+retried after a failure), and PostToolUse sees the same tool input that
+PreToolUse already checked. The outcome of evaluating a rule bucket only
+depends on the rule set, the rule event, the tool and the values of the
+fields its conditions read, so the matched rules are cached under a digest
+of exactly those.
+
+Entries are kept per session in the hookify state directory, at most
+MAX_ENTRIES of them, least recently used evicted first. Buckets that read
+a volatile field (the transcript grows on every call) are never cached,
+nor are PostToolUse buckets that read the tool's output, nor evaluations
+cut short by a time or size budget.
+
+Set HOOKIFY_DECISION_CACHE=0 to disable it.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from hookify.core.fields import RESPONSE_FIELDS, TAIL_FIELDS, FieldView
+
+MAX_ENTRIES = 512
+# Sessions whose caches a long-lived process (the hookify server) keeps
+MAX_SESSIONS = 16
+
+# Fields whose value can change between identical hook inputs
+VOLATILE_FIELDS = frozenset({'transcript'}) | TAIL_FIELDS
+
+# session_id -> DecisionCache, most recently used last
+_caches: 'OrderedDict[str, DecisionCache]' = OrderedDict()
+
+
+def decision_cache_enabled() -> bool:
+    return os.environ.get('HOOKIFY_DECISION_CACHE', '') != '0'
+
+
+def decision_key(version: str, event: Optional[str], tool_name: str,
+                 fields: Iterable[str], input_data: Dict[str, Any],
+                 cap: Optional[Callable[[str], str]] = None) -> Optional[str]:
+    """Digest identifying one evaluation, or None if it must not be cached.
+
+    Args:
+        version: Rule-set version (RuleIndex.version)
+        event: Rule event the hook maps to ("bash", "file", ...)
+        tool_name: Tool being used
+        fields: Condition fields read by the rules being evaluated
+        input_data: Hook input JSON
+        cap: Size cap applied to field values before matching
+    """
+    fields = sorted(fields)
+    if VOLATILE_FIELDS.intersection(fields):
+        return None
+    if 'tool_response' in input_data and RESPONSE_FIELDS.intersection(fields):
+        # Tool output is rarely repeated, and can be too big to hash
+        return None
+    view = FieldView(input_data, cap)
+    h = hashlib.sha1(json.dumps([version, event, tool_name]).encode('utf-8'))
+    for field in fields:
+        value = view.get(field)
+        h.update(b'\0' + field.encode('utf-8', 'surrogatepass'))
+        if value is None:
+            h.update(b'\1')
+        else:
+            data = value.encode('utf-8', 'surrogatepass')
+            # Length prefix so adjacent values can't run together
+            h.update(b'\2%d:' % len(data))
+            h.update(data)
+    return h.hexdigest()
+
+
+class DecisionCache:
+    """Bounded LRU map of decision key -> indexes of the matched rules.
+
+    Indexes refer to the rule bucket the key was computed for, which is
+    fixed by the rule-set version, event and tool in the key.
+    """
+
+    def __init__(self, session_id: str, version: str):
+        from hookify.utils.state import session_state_path
+
+        self.file = session_state_path('decisions', session_id)
+        self.version = version
+        self.entries: 'OrderedDict[str, List[int]]' = OrderedDict()
+        self._stat = None
+        self.load()
+
+    def load(self) -> None:
+        """(Re)read the session's entries, keeping only the current rule set's."""
+        try:
+            st = os.stat(self.file)
+            stat = (st.st_mtime_ns, st.st_size, st.st_ino)
+            if stat == self._stat:
+                return
+            with open(self.file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._stat = stat
+        if isinstance(data, dict) and data.get('version') == self.version:
+            self.entries = OrderedDict(data.get('entries', {}))
+        else:
+            self.entries = OrderedDict()
+
+    def get(self, key: str) -> Optional[List[int]]:
+        matched = self.entries.get(key)
+        if matched is not None:
+            self.entries.move_to_end(key)
+        return matched
+
+    def put(self, key: str, matched: List[int]) -> None:
+        """Store a result and write the cache file. Failures are not fatal."""
+        self.entries[key] = matched
+        self.entries.move_to_end(key)
+        while len(self.entries) > MAX_ENTRIES:
+            self.entries.popitem(last=False)
+
+        tmp_path = f"{self.file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.version, 'entries': self.entries}, f,
+                          separators=(',', ':'))
+            os.replace(tmp_path, self.file)
+            st = os.stat(self.file)
+            self._stat = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except OSError as e:
+            print(f"Warning: Could not write decision cache {self.file}: {e}", file=sys.stderr)
+
+
+def decision_cache_for(input_data: Dict[str, Any], version: str) -> Optional[DecisionCache]:
+    """The session's DecisionCache for this rule-set version.
+
+    None when caching is disabled or the input carries no session_id.
+    """
+    session_id = input_data.get('session_id')
+    if not session_id or not isinstance(session_id, str) or not decision_cache_enabled():
+        return None
+    cache = _caches.get(session_id)
+    if cache is None or cache.version != version:
+        cache = _caches[session_id] = DecisionCache(session_id, version)
+        while len(_caches) > MAX_SESSIONS:
+            _caches.popitem(last=False)
+    else:
+        # Another process may have added entries since
+        cache.load()
+    _caches.move_to_end(session_id)
+    return cache
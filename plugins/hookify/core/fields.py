@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""Field access for hookify plugin.
+
+A condition's field name is compiled once, when its rule is loaded, into an
+accessor: a function that pulls the field's text out of a hook input. The
+built-in names ("command", "new_text", "file_path", ...) keep their
+per-tool meaning, and `command.argv0`, `command.segments` and the other
+COMMAND_FIELDS read the parsed Bash command (see shell.py), the
+RESPONSE_FIELDS the tool's output (see response.py) and the TAIL_FIELDS
+the end of the transcript (see transcript.py); a dotted path such as
+`tool_input.edits[*].old_string` walks the hook input JSON directly.
+
+During evaluation a FieldView resolves each field at most once per input,
+so rules sharing a field (or a MultiEdit join, or a str() of a non-string
+value) don't repeat the work.
+"""
+
+import json
+import re
+import sys
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from hookify.utils.payload import LazyObject
+
+# accessor(tool_name, tool_input, input_data) -> field text, or None if absent
+Accessor = Callable[[str, Dict[str, Any], Optional[Dict[str, Any]]], Optional[str]]
+
+# One path segment: a key followed by any number of [N] / [*] subscripts
+_SEGMENT = re.compile(r'([^.\[\]]+)((?:\[(?:\*|-?\d+)\])*)$')
+_SUBSCRIPT = re.compile(r'\[(\*|-?\d+)\]')
+
+# Path step kinds
+KEY, INDEX, ALL = 'key', 'index', 'all'
+
+# Fields read from the parsed Bash command; multi-valued, one value per
+# line (kept in sync with shell.ParsedCommand.field)
+COMMAND_FIELDS = frozenset({'command.segments', 'command.argv0', 'command.args',
+                            'command.flags', 'command.redirects'})
+
+# Fields holding the tool's output (PostToolUse); see response.py
+RESPONSE_FIELDS = frozenset({'tool_response', 'stdout', 'stderr'})
+
+# Fields read from the end of the transcript (same as transcript.TAIL_FIELDS,
+# not imported: that loads the scanner)
+TAIL_FIELDS = frozenset({'transcript.last_assistant', 'transcript.last_n_messages',
+                         'transcript.last_tool_calls'})
+
+# Multi-valued fields, one value per line
+LINE_FIELDS = COMMAND_FIELDS | {'transcript.last_tool_calls'}
+
+
+def is_field_path(field: str) -> bool:
+    """True if field is a dotted/subscripted path rather than a plain name."""
+    return '.' in field or '[' in field
+
+
+def parse_field_path(path: str) -> Optional[List[Tuple[str, Any]]]:
+    """Split `tool_input.edits[*].old_string` into steps.
+
+    Returns:
+        [(KEY, 'tool_input'), (KEY, 'edits'), (ALL, None), (KEY, 'old_string')],
+        or None if path is malformed
+    """
+    steps: List[Tuple[str, Any]] = []
+    for segment in path.split('.'):
+        m = _SEGMENT.match(segment)
+        if not m:
+            return None
+        steps.append((KEY, m.group(1)))
+        for sub in _SUBSCRIPT.findall(m.group(2)):
+            steps.append((ALL, None) if sub == '*' else (INDEX, int(sub)))
+    return steps
+
+
+@lru_cache(maxsize=1024)
+def compile_field(field: str) -> Accessor:
+    """Return the accessor for a condition field (cached per name)."""
+    if field in COMMAND_FIELDS:
+        return _command_accessor(field)
+    if field in TAIL_FIELDS:
+        return _tail_accessor(field)
+    if is_field_path(field):
+        steps = parse_field_path(field)
+        if steps is not None:
+            return _path_accessor(steps)
+    return _named_accessor(field)
+
+
+def _text(value: Any) -> str:
+    """Text of a value reached through a path; JSON for non-strings."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, LazyObject):
+        value = value.decode()
+    try:
+        return json.dumps(value, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _path_accessor(steps: List[Tuple[str, Any]]) -> Accessor:
+    # A wildcard makes the field a join of every value it reaches
+    many = any(kind == ALL for kind, _ in steps)
+
+    def accessor(tool_name, tool_input, input_data):
+        values = [input_data or {}]
+        for kind, arg in steps:
+            reached = []
+            for value in values:
+                if kind == KEY:
+                    if isinstance(value, Mapping) and arg in value:
+                        reached.append(value[arg])
+                elif kind == INDEX:
+                    if isinstance(value, list) and -len(value) <= arg < len(value):
+                        reached.append(value[arg])
+                elif isinstance(value, list):
+                    reached.extend(value)
+                elif isinstance(value, Mapping):
+                    reached.extend(value.values())
+            values = reached
+            if not values:
+                return None
+        if many:
+            return ' '.join(_text(v) for v in values)
+        return _text(values[0])
+
+    return accessor
+
+
+def _command_accessor(field: str) -> Accessor:
+    # Imported lazily: only rules on command.* fields need the parser
+    from hookify.core.shell import parse_command
+    command = _named_accessor('command')
+
+    def accessor(tool_name, tool_input, input_data):
+        text = command(tool_name, tool_input, input_data)
+        if text is None:
+            return None
+        return parse_command(text).field(field)
+
+    return accessor
+
+
+def _tail_accessor(field: str) -> Accessor:
+    def accessor(tool_name, tool_input, input_data):
+        transcript_path = input_data.get('transcript_path') if input_data else None
+        if not transcript_path:
+            return None
+        # Imported lazily: only Stop-style rules read the transcript
+        from hookify.core.transcript import transcript_tail
+        return transcript_tail(transcript_path, field)
+
+    return accessor
+
+
+def _named_accessor(field: str) -> Accessor:
+    """Accessor for a plain field name.
+
+    A key of that name in tool_input always wins; otherwise the name's
+    built-in meaning for the hook event and tool applies.
+    """
+    fallback = _BUILTIN_FIELDS.get(field, _absent)
+
+    def accessor(tool_name, tool_input, input_data):
+        if field in tool_input:
+            value = tool_input[field]
+            if isinstance(value, str):
+                return value
+            return str(value)
+        return fallback(tool_name, tool_input, input_data)
+
+    return accessor
+
+
+def _absent(tool_name, tool_input, input_data):
+    return None
+
+
+def _reason(tool_name, tool_input, input_data):
+    # Stop event specific field
+    if input_data:
+        return input_data.get('reason', '')
+    return None
+
+
+def _user_prompt(tool_name, tool_input, input_data):
+    # For UserPromptSubmit events
+    if input_data:
+        return input_data.get('user_prompt', '')
+    return None
+
+
+def _transcript(tool_name, tool_input, input_data):
+    # Read transcript file if path provided (the engine normally scans it
+    # from disk in chunks instead; see TranscriptScanner)
+    transcript_path = input_data.get('transcript_path') if input_data else None
+    if not transcript_path:
+        return None
+    try:
+        with open(transcript_path, 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        print(f"Warning: Transcript file not found: {transcript_path}", file=sys.stderr)
+    except PermissionError:
+        print(f"Warning: Permission denied reading transcript: {transcript_path}", file=sys.stderr)
+    except (IOError, OSError) as e:
+        print(f"Warning: Error reading transcript {transcript_path}: {e}", file=sys.stderr)
+    except UnicodeDecodeError as e:
+        print(f"Warning: Encoding error in transcript {transcript_path}: {e}", file=sys.stderr)
+    return ''
+
+
+def _response_field(field: str) -> Callable:
+    def accessor(tool_name, tool_input, input_data):
+        # Imported lazily: only PostToolUse rules read tool output (and the
+        # engine normally scans it in chunks instead; see response.py)
+        from hookify.core.response import response_text
+        return response_text(field, input_data)
+    return accessor
+
+
+def _command(tool_name, tool_input, input_data):
+    if tool_name == 'Bash':
+        return tool_input.get('command', '')
+    return None
+
+
+def _file_path(tool_name, tool_input, input_data):
+    if tool_name in ('Write', 'Edit', 'MultiEdit'):
+        return tool_input.get('file_path', '')
+    return None
+
+
+def _content(tool_name, tool_input, input_data):
+    if tool_name in ('Write', 'Edit'):
+        # Write uses 'content', Edit has 'new_string'
+        return tool_input.get('content') or tool_input.get('new_string', '')
+    if tool_name == 'MultiEdit':
+        return _joined_edits(tool_input)
+    return None
+
+
+def _new_text(tool_name, tool_input, input_data):
+    if tool_name in ('Write', 'Edit'):
+        return tool_input.get('new_string', '')
+    if tool_name == 'MultiEdit':
+        return _joined_edits(tool_input)
+    return None
+
+
+def _new_string(tool_name, tool_input, input_data):
+    if tool_name in ('Write', 'Edit'):
+        return tool_input.get('new_string', '')
+    return None
+
+
+def _old_text(tool_name, tool_input, input_data):
+    if tool_name in ('Write', 'Edit'):
+        return tool_input.get('old_string', '')
+    return None
+
+
+def _joined_edits(tool_input: Dict[str, Any]) -> str:
+    # Concatenate all edits
+    return ' '.join(e.get('new_string', '') for e in tool_input.get('edits', []))
+
+
+# Built-in meaning of plain field names that are not tool_input keys
+_BUILTIN_FIELDS: Dict[str, Callable] = {
+    'reason': _reason,
+    'user_prompt': _user_prompt,
+    'transcript': _transcript,
+    'tool_response': _response_field('tool_response'),
+    'stdout': _response_field('stdout'),
+    'stderr': _response_field('stderr'),
+    'command': _command,
+    'file_path': _file_path,
+    'content': _content,
+    'new_text': _new_text,
+    'new_string': _new_string,
+    'old_text': _old_text,
+    'old_string': _old_text,
+}
+
+
+class FieldView:
+    """Field values of one hook input, each extracted at most once."""
+
+    __slots__ = ('input_data', 'tool_name', 'tool_input', 'capped', '_cap', '_values')
+
+    def __init__(self, input_data: Dict[str, Any],
+                 cap: Optional[Callable[[str], str]] = None):
+        """
+        Args:
+            input_data: Hook input JSON (a dict, or a LazyObject from
+                utils.payload)
+            cap: Optional function applied to each value once, e.g. to
+                truncate it to a size budget
+        """
+        self.input_data = input_data
+        self.tool_name = input_data.get('tool_name', '')
+        self.tool_input = input_data.get('tool_input', {})
+        # Fields whose value cap shortened
+        self.capped: Set[str] = set()
+        self._cap = cap
+        self._values: Dict[str, Optional[str]] = {}
+
+    def get(self, field: str, accessor: Optional[Accessor] = None) -> Optional[str]:
+        """Value of field, or None if the input doesn't have it.
+
+        Args:
+            field: Condition field name or path
+            accessor: The field's compiled accessor, if the caller has it
+        """
+        try:
+            return self._values[field]
+        except KeyError:
+            pass
+        value = (accessor or compile_field(field))(self.tool_name, self.tool_input, self.input_data)
+        if value is not None and self._cap is not None:
+            capped = self._cap(value)
+            if len(capped) != len(value):
+                self.capped.add(field)
+            value = capped
+        self._values[field] = value
+        return value
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Shared hook evaluation for hookify plugin.
+
+Maps a Claude Code hook event to the hookify rule event, looks up the
+matching rules in the dispatch index and evaluates them. Used both by the
+hook scripts (in-process path) and by the resident server.
+"""
+
+import time
+from typing import Dict, Any, Optional
+
+from hookify.core.rule_index import load_rule_index, rule_event_for
+from hookify.core.rule_engine import RuleEngine
+from hookify.core.profiler import Profiler, profiling_enabled
+from hookify.core.decision_cache import decision_cache_for, decision_key
+from hookify.core.matchers import missing_tools
+
+
+def run_hook(hook_name: str, input_data: Dict[str, Any],
+             engine: Optional[RuleEngine] = None,
+             started: Optional[float] = None) -> Dict[str, Any]:
+    """Evaluate the rules for one hook invocation.
+
+    Args:
+        hook_name: Claude Code hook event ("PreToolUse", "Stop", ...)
+        input_data: Hook input JSON
+        engine: Optional long-lived RuleEngine (the server keeps one warm)
+        started: time.time() when the hook call started, for the latency
+            recorded with HOOKIFY_PROFILE (defaults to now)
+
+    Returns:
+        Response dict for Claude Code ({} if no rules match).
+    """
+    if not profiling_enabled():
+        return _evaluate(hook_name, input_data, engine)
+
+    if started is None:
+        started = time.time()
+    profiler = Profiler()
+    error = None
+    try:
+        return _evaluate(hook_name, input_data, engine, profiler)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        profiler.save(hook_name, input_data.get('tool_name', ''), time.time() - started, error)
+
+
+def _evaluate(hook_name: str, input_data: Dict[str, Any], engine: Optional[RuleEngine],
+              profiler: Optional[Profiler] = None) -> Dict[str, Any]:
+    index = load_rule_index()
+    event = rule_event_for(hook_name, input_data)
+    tool_name = input_data.get('tool_name', '')
+    rules = index.rules_for(event, tool_name)
+    # Rules the recorded matchers no longer reach, checked once per rule-set change
+    notice = missing_tools(index.rules) if index.changed else None
+    if not rules:
+        # No rule targets this event/tool
+        return {'systemMessage': notice} if notice else {}
+    if engine is None:
+        engine = RuleEngine()
+    hook_event = input_data.get('hook_event_name', '')
+
+    # Identical calls earlier in the session (including the PreToolUse of
+    # this PostToolUse) reuse their result
+    # first_block_wins keeps fewer matched rules, so it gets its own entries
+    version = f"{index.version}:first-block" if engine.first_block_wins else index.version
+    cache = decision_cache_for(input_data, version)
+    key = None
+    if cache is not None:
+        key = decision_key(version, event, tool_name, index.fields_for(event, tool_name),
+                           input_data, engine.budget.cap)
+        cached = cache.get(key) if key else None
+        if cached is not None and all(0 <= i < len(rules) for i in cached):
+            if profiler is not None:
+                profiler.cached = True
+            return _with_notice(engine.response(hook_event, [rules[i] for i in cached]), notice)
+
+    engine.profiler = profiler
+    try:
+        matched, skipped = engine.match_rules(rules, input_data)
+    finally:
+        engine.profiler = None
+    if key and not skipped:
+        # Rules are compared by identity: the same name may occur twice
+        positions = {id(rule): i for i, rule in enumerate(rules)}
+        cache.put(key, [positions[id(rule)] for rule in matched])
+    return _with_notice(engine.response(hook_event, matched, skipped), notice)
+
+
+def _with_notice(response: Dict[str, Any], notice: Optional[str]) -> Dict[str, Any]:
+    if notice:
+        message = response.get('systemMessage')
+        response['systemMessage'] = f"{message}\n\n{notice}" if message else notice
+    return response
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""Literal prefiltering for hookify plugin.
+
+Every contains/not_contains pattern, and the longest literal that a
+regex_match pattern requires (e.g. "rm" for rm\\s+-rf), is collected per
+field into one multi-literal automaton. One scan of a field tells which
+literals occur, so rules whose literals are absent are rejected before any
+regex runs, and contains/not_contains are answered without their own scan.
+"""
+
+import re
+from functools import lru_cache
+from typing import AbstractSet, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+_QUANTIFIER = re.compile(r'\{(\d*)(?:,(\d*))?\}')
+
+# Below this many literals, plain `in` checks (CPython's fast substring
+# search) beat one automaton scan; measured crossover is ~150-200 literals
+MIN_AUTOMATON_LITERALS = 160
+
+
+@lru_cache(maxsize=1024)
+def required_literal(pattern: str) -> Optional[str]:
+    """Return a literal every match of pattern must contain, or None.
+
+    Conservative: only plain characters and escaped punctuation at the top
+    level are considered; groups, classes and optional atoms break literal
+    runs, and top-level alternation yields None. Only ASCII literals are
+    returned because they are matched case-insensitively (as regex_match
+    patterns are).
+    """
+    try:
+        if re.compile(pattern).flags & re.VERBOSE:
+            return None
+    except re.error:
+        return None
+
+    runs: List[str] = []
+    run: List[str] = []
+
+    def end_run():
+        if run:
+            runs.append(''.join(run))
+            run.clear()
+
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '\\':
+            nxt = pattern[i + 1] if i + 1 < n else ''
+            i += 2
+            if nxt and not nxt.isalnum() and nxt.isascii():
+                run.append(nxt)
+                i = _apply_quantifier(pattern, i, run, end_run)
+            else:
+                # Classes (\s, \d), assertions (\b), escapes (\n, \x41), backrefs
+                end_run()
+                i = _skip_quantifier(pattern, i)
+        elif c == '[':
+            end_run()
+            i = _skip_quantifier(pattern, _skip_class(pattern, i))
+        elif c == '(':
+            end_run()
+            i = _skip_quantifier(pattern, _skip_group(pattern, i))
+        elif c == '|':
+            return None
+        elif c in '.^$':
+            end_run()
+            i = _skip_quantifier(pattern, i + 1)
+        elif c in '*+?' or (c == '{' and _QUANTIFIER.match(pattern, i)):
+            # Quantifier with no preceding atom we tracked
+            end_run()
+            i += 1
+        else:
+            i += 1
+            if c.isascii():
+                run.append(c)
+                i = _apply_quantifier(pattern, i, run, end_run)
+            else:
+                end_run()
+                i = _skip_quantifier(pattern, i)
+    end_run()
+
+    best = max(runs, key=len, default='')
+    return best if len(best) >= 2 else None
+
+
+def _apply_quantifier(pattern: str, i: int, run: List[str], end_run: Callable) -> int:
+    """Handle a quantifier after the literal char just appended to run."""
+    if i >= len(pattern):
+        return i
+    c = pattern[i]
+    m = _QUANTIFIER.match(pattern, i) if c == '{' else None
+    if c in '*?' or (m and (m.group(1) or '0') == '0'):
+        # Atom may be absent
+        run.pop()
+        end_run()
+    elif c == '+' or m:
+        # Atom present at least once, but the run can't continue past it
+        end_run()
+    else:
+        return i
+    return _skip_lazy(pattern, m.end() if m else i + 1)
+
+
+def _skip_quantifier(pattern: str, i: int) -> int:
+    if i >= len(pattern):
+        return i
+    if pattern[i] in '*+?':
+        return _skip_lazy(pattern, i + 1)
+    m = _QUANTIFIER.match(pattern, i) if pattern[i] == '{' else None
+    return _skip_lazy(pattern, m.end()) if m else i
+
+
+def _skip_lazy(pattern: str, i: int) -> int:
+    """Skip a lazy (?) or possessive (+) modifier."""
+    return i + 1 if i < len(pattern) and pattern[i] in '?+' else i
+
+
+def _skip_class(pattern: str, i: int) -> int:
+    """Return the index after the character class starting at i."""
+    i += 1
+    if i < len(pattern) and pattern[i] == '^':
+        i += 1
+    if i < len(pattern) and pattern[i] == ']':
+        i += 1
+    while i < len(pattern) and pattern[i] != ']':
+        i += 2 if pattern[i] == '\\' else 1
+    return i + 1
+
+
+def _skip_group(pattern: str, i: int) -> int:
+    """Return the index after the group starting at i."""
+    depth = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == '[':
+            i = _skip_class(pattern, i)
+            continue
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+class LiteralSet:
+    """Finds which of many literals occur in a text with one scan.
+
+    The literals are compiled into a trie-shaped regex so the regex engine
+    walks all of them in a single pass (an Aho-Corasick-style automaton
+    without a third-party dependency).
+    """
+
+    def __init__(self, literals: Iterable[str], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        fold = str.lower if ignore_case else (lambda s: s)
+        self.literals: Tuple[str, ...] = tuple(dict.fromkeys(fold(lit) for lit in literals if lit))
+
+        # Literals that are prefixes of each literal (itself included): the
+        # scan reports the longest literal at each position, and its
+        # prefixes occur there too
+        literal_set = set(self.literals)
+        self._prefixes: Dict[str, List[str]] = {
+            lit: [lit[:k] for k in range(1, len(lit) + 1) if lit[:k] in literal_set]
+            for lit in self.literals
+        }
+
+        self._regex = None
+        if len(self.literals) >= MIN_AUTOMATON_LITERALS:
+            flags = re.IGNORECASE if ignore_case else 0
+            self._regex = re.compile(f'(?=({_trie_regex(self.literals)}))', flags)
+
+    def __contains__(self, literal: str) -> bool:
+        return literal in self._prefixes
+
+    def present(self, text: str) -> Set[str]:
+        """Return the literals that occur in text."""
+        if self._regex is None:
+            if not self.ignore_case:
+                return {lit for lit in self.literals if lit in text}
+            if text.isascii():
+                lowered = text.lower()
+                return {lit for lit in self.literals if lit in lowered}
+            # Unicode case folding isn't 1:1 with str.lower(); let re decide
+            return {lit for lit in self.literals
+                    if re.search(re.escape(lit), text, re.IGNORECASE)}
+
+        found: Set[str] = set()
+        seen: Set[str] = set()
+        for m in self._regex.finditer(text):
+            longest = m.group(1)
+            if longest in seen:
+                continue
+            seen.add(longest)
+            found.update(self._prefixes[self._literal_for(longest)])
+            if len(found) == len(self.literals):
+                break
+        return found
+
+    def _literal_for(self, matched: str) -> str:
+        """Map matched text back to the literal it matched."""
+        if not self.ignore_case:
+            return matched
+        lowered = matched.lower()
+        if lowered in self._prefixes:
+            return lowered
+        # Non-ASCII case-insensitive match (e.g. U+212A KELVIN SIGN for "k")
+        for lit in self.literals:
+            if len(lit) == len(matched) and re.fullmatch(re.escape(lit), matched, re.IGNORECASE):
+                return lit
+        return lowered
+
+
+def _trie_regex(literals: Iterable[str]) -> str:
+    """Render literals as a regex that matches the longest literal at a position."""
+    trie: Dict[str, Any] = {}
+    for lit in literals:
+        node = trie
+        for ch in lit:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def render(node: Dict[str, Any]) -> str:
+        terminal = '' in node
+        branches = [re.escape(ch) + render(child) for ch, child in node.items() if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional: prefer the longer literal
+        if terminal:
+            return f'(?:{body})?'
+        return body
+
+    return render(trie)
+
+
+@lru_cache(maxsize=256)
+def literal_set(literals: Tuple[str, ...], ignore_case: bool) -> LiteralSet:
+    """Build (or reuse) the LiteralSet for a tuple of literals."""
+    return LiteralSet(literals, ignore_case)
+
+
+class LiteralPrefilter:
+    """Rejects rules whose required literals are absent from the input.
+
+    Built per rule list; remembers, per input, which literals each field
+    contains. Call reset() before evaluating a new input.
+    """
+
+    def __init__(self, rules, skip_fields=frozenset()):
+        # id(rule) -> [(field, literal, ignore_case, must_be_present)]
+        self._requirements: Dict[int, List[Tuple[str, str, bool, bool]]] = {}
+        by_field: Dict[Tuple[str, bool], Dict[str, None]] = {}
+
+        for rule in rules:
+            requirements = []
+            for condition in rule.conditions:
+                if condition.field in skip_fields:
+                    continue
+                if condition.operator in ('contains', 'not_contains'):
+                    if not condition.pattern:
+                        continue
+                    requirements.append((condition.field, condition.pattern, False,
+                                         condition.operator == 'contains'))
+                elif condition.operator == 'regex_match':
+                    literal = required_literal(condition.pattern)
+                    if literal is None:
+                        continue
+                    requirements.append((condition.field, literal.lower(), True, True))
+                else:
+                    continue
+                field, literal, ignore_case, _ = requirements[-1]
+                by_field.setdefault((field, ignore_case), {})[literal] = None
+            if requirements:
+                self._requirements[id(rule)] = requirements
+
+        self._sets = {key: literal_set(tuple(lits), key[1]) for key, lits in by_field.items()}
+        self._found: Dict[Tuple[str, bool], Set[str]] = {}
+
+    def reset(self) -> None:
+        self._found = {}
+
+    def passes(self, rule, get_value: Callable[[str], Optional[str]],
+               capped: AbstractSet[str] = frozenset()) -> bool:
+        """Return False if rule can't match the current input.
+
+        Args:
+            rule: Rule to check
+            get_value: Field name -> value (None if missing)
+            capped: Fields whose value get_value truncated; a literal missing
+                from those may be past the cut, so it doesn't rule out a match
+        """
+        for field, literal, ignore_case, must_be_present in self._requirements.get(id(rule), ()):
+            found = self.found(field, ignore_case, get_value)
+            if found is None:
+                # Field missing: the condition (and so the rule) fails
+                return False
+            if (literal in found) != must_be_present:
+                if must_be_present and field in capped:
+                    # Left to the condition, which reports the capped value
+                    continue
+                return False
+        return True
+
+    def found(self, field: str, ignore_case: bool,
+              get_value: Callable[[str], Optional[str]]) -> Optional[Set[str]]:
+        """Literals present in field (None if the field is missing)."""
+        key = (field, ignore_case)
+        if key not in self._found:
+            value = get_value(field)
+            self._found[key] = None if value is None else self._sets[key].present(value)
+        return self._found[key]
+
+    def contains(self, field: str, pattern: str,
+                 get_value: Callable[[str], Optional[str]]) -> Optional[bool]:
+        """Answer `pattern in field` from the scan, or None if not tracked."""
+        key = (field, False)
+        if key not in self._sets or pattern not in self._sets[key]:
+            return None
+        found = self.found(field, False, get_value)
+        return None if found is None else pattern in found
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""List-backed operators for hookify plugin.
+
+in_set, path_prefix and glob_match match a field against a list of
+entries: hosts, paths, directories or globs. A condition's pattern is
+either the entries inline, separated by "|", or "@" followed by a list
+file with one entry per line (blank lines and "#" comments are skipped):
+
+    pattern: "@.claude/banned-hosts.txt"
+
+Relative list file paths, and relative path_prefix entries and values,
+are resolved against the project root (config_loader.project_root), so a
+rule works the same from any subdirectory. Each list
+is read and indexed once, when its rule is compiled (a hash set, a trie of
+path components, or a glob index), so checking a value costs about the
+same for 10 entries as for 20,000.
+"""
+
+import fnmatch
+import os
+import re
+import sys
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+# Operators whose pattern names a list
+LIST_OPERATORS = frozenset({'in_set', 'path_prefix', 'glob_match'})
+
+# Runs of host/word characters inside a command word ("evil.com" in
+# "https://evil.com:8080/x")
+_TOKEN = re.compile(r'[\w.-]+')
+
+# Characters that make a glob entry more than a literal
+_GLOB_CHARS = frozenset('*?[')
+
+# Trie node key marking the end of an entry
+_END = ''
+
+# list file path -> ((mtime_ns, size), entries)
+_file_memo: Dict[str, Tuple[Tuple[int, int], Tuple[str, ...]]] = {}
+
+# (cwd, CLAUDE_PROJECT_DIR) -> list_base()
+_bases: Dict[Tuple[str, Optional[str]], str] = {}
+
+
+def list_base() -> str:
+    """Directory relative list paths are resolved against: the project root."""
+    key = (os.getcwd(), os.environ.get('CLAUDE_PROJECT_DIR'))
+    base = _bases.get(key)
+    if base is None:
+        # Imported lazily: config_loader is loaded by then anyway
+        from hookify.core.config_loader import project_root
+        base = _bases[key] = project_root(key[0])
+    return base
+
+
+def _absolute(path: str) -> str:
+    return os.path.normpath(os.path.join(list_base(), os.path.expanduser(path)))
+
+
+def list_file(pattern: str) -> Optional[str]:
+    """Absolute path of the list file a pattern refers to, or None if inline."""
+    if not pattern.startswith('@'):
+        return None
+    return _absolute(pattern[1:].strip())
+
+
+def list_entries(pattern: str) -> Optional[Tuple[str, ...]]:
+    """Entries of a list pattern, or None if its list file can't be read."""
+    path = list_file(pattern)
+    if path is None:
+        return tuple(e.strip() for e in pattern.split('|') if e.strip())
+    try:
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        memo = _file_memo.get(path)
+        if memo and memo[0] == key:
+            return memo[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = tuple(_parse_lines(f))
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"Warning: Cannot read list file {path}: {e}", file=sys.stderr)
+        return None
+    _file_memo[path] = (key, entries)
+    return entries
+
+
+def _parse_lines(lines: Iterable[str]) -> Iterator[str]:
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def list_files_key(paths: Iterable[str]) -> Tuple[Tuple[str, int, int], ...]:
+    """(path, mtime_ns, size) of each list file; changes when any is edited."""
+    key = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            key.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            key.append((path, 0, -1))
+    return tuple(key)
+
+
+class TokenSet:
+    """in_set: the value, or one of its words or tokens, is a list entry.
+
+    A command like `curl https://evil.com:8080/x` is looked up as the whole
+    value, its words and the host-like tokens inside them ("evil.com").
+    Lookups are exact and case-sensitive.
+    """
+
+    __slots__ = ('entries',)
+
+    def __init__(self, entries: Iterable[str]):
+        self.entries: FrozenSet[str] = frozenset(entries)
+
+    def matches(self, value: str) -> bool:
+        return not self.entries.isdisjoint(self._candidates(value))
+
+    @staticmethod
+    def _candidates(value: str) -> Iterator[str]:
+        yield value.strip()
+        for word in value.split():
+            word = word.strip('\'"`')
+            yield word
+            yield from _TOKEN.findall(word)
+
+
+class PathTrie:
+    """path_prefix: the value is a path inside (or equal to) a listed directory.
+
+    Entries and values are made absolute against the project root and
+    normalized, then compared component by component, so "/repo/build"
+    contains "/repo/build/out.js" but not "/repo/builds".
+    """
+
+    __slots__ = ('_root',)
+
+    def __init__(self, entries: Iterable[str]):
+        self._root: Dict[str, dict] = {}
+        for entry in entries:
+            node = self._root
+            for part in _path_parts(entry):
+                node = node.setdefault(part, {})
+            node[_END] = {}
+
+    def matches(self, value: str) -> bool:
+        if not value:
+            return False
+        node = self._root
+        if _END in node:
+            return True
+        for part in _path_parts(value):
+            node = node.get(part)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+
+def _path_parts(path: str) -> List[str]:
+    return [p for p in _absolute(path).split(os.sep) if p]
+
+
+class GlobSet:
+    """glob_match: the whole value matches one of the globs (fnmatch syntax).
+
+    Case-sensitive; `*` also matches "/", so `*.env` matches any .env file.
+    Literal entries are looked up in a set and `*suffix` entries by suffix;
+    only the remaining globs go through one combined regex.
+    """
+
+    __slots__ = ('_exact', '_suffixes', '_suffix_lengths', '_regex')
+
+    def __init__(self, globs: Iterable[str]):
+        exact = set()
+        suffixes = set()
+        rest = []
+        for glob in dict.fromkeys(globs):
+            if not _GLOB_CHARS.intersection(glob):
+                exact.add(glob)
+            elif glob.startswith('*') and not _GLOB_CHARS.intersection(glob[1:]):
+                suffixes.add(glob[1:])
+            else:
+                rest.append(glob)
+        self._exact = frozenset(exact)
+        self._suffixes = frozenset(suffixes)
+        self._suffix_lengths = tuple(sorted({len(s) for s in suffixes}))
+        self._regex = None
+        if rest:
+            self._regex = re.compile('|'.join(f'(?:{fnmatch.translate(g)})' for g in rest))
+
+    def matches(self, value: str) -> bool:
+        if value in self._exact:
+            return True
+        for n in self._suffix_lengths:
+            if n > len(value):
+                break
+            if value[len(value) - n:] in self._suffixes:
+                return True
+        return self._regex is not None and self._regex.match(value) is not None
+
+
+# Matcher class per operator
+MATCHERS = {
+    'in_set': TokenSet,
+    'path_prefix': PathTrie,
+    'glob_match': GlobSet,
+}
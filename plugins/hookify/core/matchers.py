@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Narrow hook matchers for hookify plugin.
+
+hooks/hooks.json registers the PreToolUse and PostToolUse hooks for every
+tool. `python3 matchers.py write` records, per project in the state
+directory, exactly the tools the enabled rules target; the hook scripts
+check it first (see utils/manifest.py) and end any other tool call before
+the rule manifest or engine is touched. hooks.json is left alone: it is
+shared by every project using the plugin and replaced on plugin update.
+`status` reports whether the recorded tools still cover the rules;
+`reset` forgets them.
+
+A rule's tools are the tools of its tool_matcher that the engine would
+apply it to (see RuleIndex.rules_for). A rule without tool_matcher needs
+every tool, whatever its event: tools that map to no event (Read, Grep,
+MCP tools...) are checked against every rule, so nothing is recorded.
+
+Usage:
+    python3 matchers.py [write|status|reset]
+"""
+
+import json
+import os
+import sys
+from typing import FrozenSet, Iterable, Optional
+
+# Allow running as a script: make the "hookify" package importable
+PLUGIN_ROOT = os.environ.get('CLAUDE_PLUGIN_ROOT') or os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))
+parent_dir = os.path.dirname(PLUGIN_ROOT)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from hookify.core.config_loader import Rule, load_rule_snapshot
+from hookify.core.compiler import parse_tool_matcher
+from hookify.utils.manifest import matchers_path, rule_event
+
+# Hooks the recorded matchers apply to
+TOOL_HOOKS = ('PreToolUse', 'PostToolUse')
+
+
+def required_tools(rules: Iterable[Rule]) -> Optional[FrozenSet[str]]:
+    """Tools the tool hooks must fire for, or None for every tool.
+
+    Same selection as RuleIndex.rules_for: a tool with no event of its own
+    gets every rule, so a rule without tool_matcher needs every tool.
+    """
+    needed = set()
+    for rule in rules:
+        if not rule.enabled or not rule.conditions:
+            continue
+        tools = parse_tool_matcher(rule.tool_matcher)
+        if tools is None:
+            return None
+        # The tool's event must fit the rule's
+        needed.update(t for t in tools
+                      if rule.event == 'all' or rule_event('PreToolUse', t) in (None, rule.event))
+    return frozenset(needed)
+
+
+def covers(recorded: FrozenSet[str], tools: Optional[FrozenSet[str]]) -> bool:
+    """True if the recorded tools include every tool in tools."""
+    return tools is not None and tools <= recorded
+
+
+def recorded_tools(project_dir: str = '.') -> Optional[FrozenSet[str]]:
+    """Tools `write` narrowed project_dir's tool hooks to, or None for every tool."""
+    try:
+        with open(matchers_path(project_dir), 'r', encoding='utf-8') as f:
+            tools = json.load(f)['tools']
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return frozenset(tools)
+
+
+def _project_tools(project_dir: str) -> Optional[FrozenSet[str]]:
+    return required_tools(load_rule_snapshot(start_dir=project_dir)['rules'])
+
+
+def write_matchers(project_dir: str) -> Optional[FrozenSet[str]]:
+    """Record the tools project_dir's rules need in the state directory.
+
+    Returns:
+        The tools recorded, or None if the rules need every tool (nothing
+        is recorded then)
+    """
+    tools = _project_tools(project_dir)
+    if tools is None:
+        reset_matchers(project_dir)
+        return None
+    path = matchers_path(project_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'tools': sorted(tools)}))
+    os.replace(tmp_path, path)
+    return tools
+
+
+def reset_matchers(project_dir: str) -> None:
+    """Forget project_dir's recorded matchers: the tool hooks run for every tool."""
+    try:
+        os.unlink(matchers_path(project_dir))
+    except FileNotFoundError:
+        pass
+
+
+def missing_tools(rules: Iterable[Rule], project_dir: str = '.') -> Optional[str]:
+    """Describe what project_dir's recorded matchers miss for these rules, or None."""
+    recorded = recorded_tools(project_dir)
+    if recorded is None:
+        # Not written (or reset): every tool reaches the rules
+        return None
+    tools = required_tools(rules)
+    if covers(recorded, tools):
+        return None
+    needed = 'every tool' if tools is None else ', '.join(sorted(tools))
+    return (f"hookify's tool hooks are limited to {_shown(recorded)} by /hookify:matchers, "
+            f"but the rules need {needed}. Run /hookify:matchers to update them.")
+
+
+def _shown(tools: Optional[FrozenSet[str]]) -> str:
+    if tools is None:
+        return 'every tool'
+    return ', '.join(sorted(tools)) or 'no tool'
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Limit hookify's tool hooks to the tools its rules target")
+    parser.add_argument('command', choices=['write', 'status', 'reset'], nargs='?', default='write')
+    parser.add_argument('--project-dir', default=os.getcwd())
+    args = parser.parse_args(argv)
+
+    if args.command == 'reset':
+        reset_matchers(args.project_dir)
+        print("hookify tool hooks run for every tool again")
+        return 0
+
+    if args.command == 'write':
+        tools = write_matchers(args.project_dir)
+        print(f"{', '.join(TOOL_HOOKS)}: {_shown(tools)}")
+        return 0
+
+    snapshot = load_rule_snapshot(start_dir=args.project_dir)
+    rules = snapshot['rules']
+    print(f"Rule sources: {', '.join(snapshot['sources']) or 'none'}")
+    print(f"Rules need: {_shown(required_tools(rules))}")
+    print(f"{', '.join(TOOL_HOOKS)}: {_shown(recorded_tools(args.project_dir))}")
+    notice = missing_tools(rules, args.project_dir)
+    if notice:
+        print(f"STALE: {notice}")
+        return 1
+    print("Matchers cover the rules.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
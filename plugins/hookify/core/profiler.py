@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""Optional rule profiling for hookify plugin.
+
+With HOOKIFY_PROFILE=1, every hook call records how often each rule and
+condition was evaluated and matched and how long it took, plus the hook's
+total latency and any error. Records are appended as JSON lines to a stats
+file in the hookify state directory, rotated once it grows past
+MAX_STATS_BYTES. `python3 profiler.py summary` (or /hookify:stats) reports
+the slowest rules and per-hook latency histograms; it changes nothing.
+`save-costs` stores the measured condition costs, which the engine then
+uses to order conditions (see cost_model.py).
+
+Usage:
+    python3 profiler.py summary [--top N]
+    python3 profiler.py save-costs
+    python3 profiler.py clear
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+# Allow running as a script: make the "hookify" package importable
+PLUGIN_ROOT = os.environ.get('CLAUDE_PLUGIN_ROOT') or os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))
+parent_dir = os.path.dirname(PLUGIN_ROOT)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from hookify.utils.state import state_path
+
+# The stats file is rotated to <file>.1 once it is larger than this
+MAX_STATS_BYTES = 4 * 1024 * 1024
+# Upper bounds (ms) of the latency histogram buckets
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+# Claude Code's timeout for command hooks without an explicit one
+DEFAULT_HOOK_TIMEOUT = 60
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get('HOOKIFY_PROFILE', '') not in ('', '0')
+
+
+def stats_path(project_dir: str = '.') -> str:
+    """Stats file for a project (rules are loaded relative to its root)."""
+    return state_path('stats', project_dir, '.jsonl')
+
+
+class Profiler:
+    """Counters for one hook call.
+
+    Rules rejected up front by the literal prefilter are only counted in
+    `skipped`; they never reach condition evaluation. The combined regex
+    scan of a field is timed as part of the first condition that needs it.
+    """
+
+    def __init__(self):
+        # rule name -> [evaluated, matched, total seconds, max seconds]
+        self.rules: Dict[str, List[float]] = {}
+        # "rule name#index" -> [evaluated, matched, total seconds, max seconds]
+        self.conditions: Dict[str, List[float]] = {}
+        # condition key -> "field operator pattern" (for reports)
+        self.condition_labels: Dict[str, str] = {}
+        self.skipped = 0
+        # rule name -> why it was skipped for exceeding its time or size budget
+        self.over_budget_rules: Dict[str, str] = {}
+        # Answered from the session's decision cache without evaluating
+        self.cached = False
+
+    def rule(self, name: str, matched: bool, seconds: float) -> None:
+        _add(self.rules, name, matched, seconds)
+
+    def condition(self, rule_name: str, index: int, condition, matched: bool,
+                  seconds: float) -> None:
+        key = f'{rule_name}#{index}'
+        if key not in self.condition_labels:
+            self.condition_labels[key] = condition_label(condition)
+        _add(self.conditions, key, matched, seconds)
+
+    def over_budget(self, rule_name: str, reason: str) -> None:
+        self.over_budget_rules[rule_name] = reason
+
+    def record(self, hook_name: str, tool_name: str, seconds: float,
+               error: Optional[str] = None) -> Dict[str, Any]:
+        """Build the stats record for this hook call."""
+        return {
+            'ts': round(time.time(), 3),
+            'hook': hook_name,
+            'tool': tool_name,
+            'ms': round(seconds * 1e3, 3),
+            'skipped': self.skipped,
+            'rules': {k: _rounded(v) for k, v in self.rules.items()},
+            'conditions': {k: _rounded(v) + [self.condition_labels[k]]
+                           for k, v in self.conditions.items()},
+            'over_budget': self.over_budget_rules,
+            'cached': self.cached,
+            'error': error,
+        }
+
+    def save(self, hook_name: str, tool_name: str, seconds: float,
+             error: Optional[str] = None, path: Optional[str] = None) -> None:
+        """Append this call's record to the stats file. Failures are not fatal."""
+        path = path or stats_path()
+        line = json.dumps(self.record(hook_name, tool_name, seconds, error),
+                          separators=(',', ':')) + '\n'
+        try:
+            try:
+                if os.path.getsize(path) > MAX_STATS_BYTES:
+                    os.replace(path, path + '.1')
+            except FileNotFoundError:
+                pass
+            # O_APPEND keeps concurrent hook processes from interleaving lines
+            fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, line.encode('utf-8'))
+            finally:
+                os.close(fd)
+        except OSError as e:
+            print(f"Warning: Could not write hookify stats {path}: {e}", file=sys.stderr)
+
+
+def condition_label(condition) -> str:
+    """Label of a condition in reports: "field operator pattern"."""
+    return f'{condition.field} {condition.operator} {condition.pattern}'[:120]
+
+
+def _add(table: Dict[str, List[float]], key: str, matched: bool, seconds: float) -> None:
+    entry = table.get(key)
+    if entry is None:
+        entry = table[key] = [0, 0, 0.0, 0.0]
+    entry[0] += 1
+    entry[1] += matched
+    entry[2] += seconds
+    if seconds > entry[3]:
+        entry[3] = seconds
+
+
+def _rounded(entry: List[float]) -> List[float]:
+    # Times are stored in milliseconds
+    return [entry[0], entry[1], round(entry[2] * 1e3, 4), round(entry[3] * 1e3, 4)]
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Records from the rotated and current stats files, oldest first."""
+    for name in (path + '.1', path):
+        try:
+            with open(name, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # Torn write or foreign data
+                        continue
+        except FileNotFoundError:
+            continue
+
+
+def hook_timeouts() -> Dict[str, float]:
+    """Timeout (seconds) of each hookify hook, from hooks/hooks.json."""
+    timeouts: Dict[str, float] = {}
+    try:
+        with open(os.path.join(PLUGIN_ROOT, 'hooks', 'hooks.json')) as f:
+            config = json.load(f)
+    except (OSError, ValueError):
+        return timeouts
+    for event, matchers in config.get('hooks', {}).items():
+        for matcher in matchers:
+            for hook in matcher.get('hooks', []):
+                timeouts[event] = max(timeouts.get(event, 0), hook.get('timeout', DEFAULT_HOOK_TIMEOUT))
+    return timeouts
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def condition_totals(records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """"rule#index" -> [evaluated, matched, total ms, max ms, label] over records."""
+    conditions: Dict[str, List[Any]] = {}
+    for record in records:
+        for key, (evaluated, matched, total, peak, label) in record.get('conditions', {}).items():
+            entry = conditions.setdefault(key, [0, 0, 0.0, 0.0, label])
+            if entry[4] != label:
+                # The rule file changed; earlier numbers were for another condition
+                entry[:] = [0, 0, 0.0, 0.0, label]
+            entry[0] += evaluated
+            entry[1] += matched
+            entry[2] += total
+            entry[3] = max(entry[3], peak)
+    return conditions
+
+
+def summarize(records: List[Dict[str, Any]], top: int = 10) -> str:
+    """Human-readable report of the slowest rules and hook latencies."""
+    if not records:
+        return ("No hookify stats recorded yet. Set HOOKIFY_PROFILE=1 in the environment "
+                "Claude Code runs in to record them.")
+
+    latencies: Dict[str, List[float]] = {}
+    rules: Dict[str, List[float]] = {}
+    conditions = condition_totals(records)
+    errors: List[Dict[str, Any]] = []
+    over_budget: Dict[str, List[Any]] = {}
+    skipped = 0
+    cached = 0
+    for record in records:
+        latencies.setdefault(record['hook'], []).append(record['ms'])
+        skipped += record.get('skipped', 0)
+        cached += bool(record.get('cached'))
+        if record.get('error'):
+            errors.append(record)
+        for name, reason in record.get('over_budget', {}).items():
+            entry = over_budget.setdefault(name, [0, reason])
+            entry[0] += 1
+            entry[1] = reason
+        for name, (evaluated, matched, total, peak) in record.get('rules', {}).items():
+            entry = rules.setdefault(name, [0, 0, 0.0, 0.0])
+            entry[0] += evaluated
+            entry[1] += matched
+            entry[2] += total
+            entry[3] = max(entry[3], peak)
+
+    since = time.strftime('%Y-%m-%d %H:%M', time.localtime(records[0]['ts']))
+    lines = [f"{len(records)} hook calls since {since} ({cached} answered from the decision cache)", ""]
+
+    # Hooks, closest to their timeout first
+    timeouts = hook_timeouts()
+    lines.append(f"{'hook':18} {'calls':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+                 f"{'max ms':>8} {'timeout':>8} {'max/timeout':>11}")
+    by_headroom = sorted(latencies.items(), key=lambda kv: -max(kv[1]) / (
+        timeouts.get(kv[0], DEFAULT_HOOK_TIMEOUT) * 1e3))
+    for hook, values in by_headroom:
+        values.sort()
+        timeout = timeouts.get(hook, DEFAULT_HOOK_TIMEOUT)
+        lines.append(f"{hook:18} {len(values):6d} {_percentile(values, 0.5):8.1f} "
+                     f"{_percentile(values, 0.95):8.1f} {_percentile(values, 0.99):8.1f} "
+                     f"{values[-1]:8.1f} {timeout:7g}s {values[-1] / (timeout * 1e3):10.1%}")
+
+    lines += ["", "Latency histograms (calls per bucket, upper bound in ms):"]
+    for hook, values in by_headroom:
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for value in values:
+            counts[next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if value <= bound),
+                        len(LATENCY_BUCKETS_MS))] += 1
+        buckets = [f"<={bound}:{n}" for bound, n in zip(LATENCY_BUCKETS_MS, counts) if n]
+        if counts[-1]:
+            buckets.append(f">{LATENCY_BUCKETS_MS[-1]}:{counts[-1]}")
+        lines.append(f"  {hook:18} {' '.join(buckets)}")
+
+    lines += ["", f"Slowest rules (top {top} by total time; {skipped} evaluations skipped "
+                  f"by the literal prefilter):",
+              f"{'rule':40} {'evaluated':>9} {'matched':>8} {'total ms':>10} {'mean ms':>8} {'max ms':>8}"]
+    for name, (evaluated, matched, total, peak) in sorted(rules.items(), key=lambda kv: -kv[1][2])[:top]:
+        lines.append(f"{name[:40]:40} {evaluated:9d} {matched:8d} {total:10.2f} "
+                     f"{total / evaluated:8.3f} {peak:8.2f}")
+
+    lines += ["", f"Slowest conditions (top {top} by total time):",
+              f"{'rule#condition':40} {'evaluated':>9} {'matched':>8} {'total ms':>10} {'max ms':>8}  condition"]
+    for key, (evaluated, matched, total, peak, label) in sorted(
+            conditions.items(), key=lambda kv: -kv[1][2])[:top]:
+        lines.append(f"{key[:40]:40} {evaluated:9d} {matched:8d} {total:10.2f} {peak:8.2f}  {label}")
+
+    if over_budget:
+        lines += ["", "Rules skipped for exceeding their time or size budget:"]
+        for name, (count, reason) in sorted(over_budget.items(), key=lambda kv: -kv[1][0]):
+            lines.append(f"  {name}: {count} times (last: {reason})")
+
+    if errors:
+        lines += ["", f"{len(errors)} hook calls failed; most recent:"]
+        for record in errors[-5:]:
+            when = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record['ts']))
+            lines.append(f"  {when} {record['hook']}: {record['error']}")
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize hookify profiling stats")
+    parser.add_argument('command', choices=['summary', 'save-costs', 'clear'], nargs='?',
+                        default='summary')
+    parser.add_argument('--top', type=int, default=10, help="rules and conditions to list")
+    parser.add_argument('--project-dir', default=os.getcwd())
+    args = parser.parse_args(argv)
+
+    path = stats_path(args.project_dir)
+    if args.command == 'clear':
+        for name in (path, path + '.1'):
+            try:
+                os.unlink(name)
+            except FileNotFoundError:
+                pass
+        print("hookify stats cleared")
+        return 0
+
+    records = list(read_records(path))
+    if args.command == 'save-costs':
+        # Measured costs let the engine check cheap, selective conditions first
+        from hookify.core.cost_model import MIN_SAMPLES, costs_path, save_measured_costs
+        if not records:
+            print("No hookify stats recorded; measured costs left unchanged")
+            return 1
+        totals = condition_totals(records)
+        save_measured_costs(totals, costs_path(args.project_dir))
+        saved = sum(1 for counts in totals.values() if counts[0] >= MIN_SAMPLES)
+        print(f"Saved measured costs for {saved} of {len(totals)} conditions "
+              f"(conditions evaluated fewer than {MIN_SAMPLES} times keep estimated costs)")
+        return 0
+
+    print(summarize(records, args.top))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""Combined multi-pattern regex matching for hookify plugin.
+
+All regex_match patterns that target the same field are joined into one
+alternation of named groups, so a text is scanned once instead of once per
+pattern. Patterns that cannot be safely combined are searched on their own.
+"""
+
+import re
+import sys
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+try:
+    from re import _parser as _sre_parse, _constants as _sre
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+    import sre_constants as _sre
+
+# Constructs that change meaning (or fail) once a pattern is wrapped in a
+# group inside a larger alternation: numbered/named backreferences,
+# conditional groups and global inline flags such as "(?s)" or "(?x)".
+_NOT_COMBINABLE = re.compile(r'\\[1-9]|\(\?P[<=]|\(\?<[A-Za-z_]|\(\?\(|\(\?[aiLmsux-]+\)')
+
+# Each hit recompiles the alternation without the hit pattern. After this
+# many hits the remaining patterns are searched one by one instead, so
+# texts that trigger many rules don't pay for many compiles.
+MAX_RESCANS = 4
+
+
+def _group_name(i: int) -> str:
+    return f'_p{i}'
+
+
+@lru_cache(maxsize=256)
+def _compile_alternation(patterns: Tuple[str, ...]) -> re.Pattern:
+    """Compile patterns into one alternation, group _p<i> for patterns[i]."""
+    alternation = '|'.join(f'(?P<{_group_name(i)}>{p})' for i, p in enumerate(patterns))
+    return re.compile(alternation, re.IGNORECASE)
+
+
+class RegexSet:
+    """A set of regex patterns matched together against one text.
+
+    Matching semantics are the same as calling re.search(pattern, text,
+    re.IGNORECASE) for each pattern; only the number of scans differs.
+    """
+
+    def __init__(self, patterns: Sequence[str]):
+        self.patterns: List[str] = list(dict.fromkeys(patterns))
+        self._combined: List[str] = []
+        self._separate: List[Tuple[str, re.Pattern]] = []
+
+        for pattern in self.patterns:
+            try:
+                compiled = re.compile(pattern, re.IGNORECASE)
+            except re.error as e:
+                print(f"Invalid regex pattern '{pattern}': {e}", file=sys.stderr)
+                continue
+
+            if compiled.groupindex or _NOT_COMBINABLE.search(pattern):
+                self._separate.append((pattern, compiled))
+            else:
+                self._combined.append(pattern)
+
+        # A pattern can still break the alternation in ways the check above
+        # misses; verify once and fall back to separate searches if so.
+        if self._combined:
+            try:
+                _compile_alternation(tuple(self._combined))
+            except re.error:
+                self._separate.extend(
+                    (p, re.compile(p, re.IGNORECASE)) for p in self._combined)
+                self._combined = []
+
+    def matches(self, text: str) -> Set[str]:
+        """Return the subset of patterns that match somewhere in text."""
+        hits: Set[str] = set()
+
+        # Leftmost-first search over the remaining patterns. A hit at
+        # position p means no remaining pattern matches before p, so the
+        # next scan resumes at p with the hit pattern removed. Texts that
+        # match nothing are scanned exactly once.
+        remaining = tuple(self._combined)
+        pos = 0
+        scans = 0
+        while remaining:
+            if scans > MAX_RESCANS:
+                hits.update(p for p in remaining
+                            if re.compile(p, re.IGNORECASE).search(text, pos))
+                break
+            m = _compile_alternation(remaining).search(text, pos)
+            scans += 1
+            if not m:
+                break
+            hit = remaining[int(m.lastgroup[2:])]
+            hits.add(hit)
+            remaining = tuple(p for p in remaining if p != hit)
+            pos = m.start()
+
+        for pattern, compiled in self._separate:
+            if compiled.search(text):
+                hits.add(pattern)
+
+        return hits
+
+
+@lru_cache(maxsize=128)
+def regex_set(patterns: Tuple[str, ...]) -> RegexSet:
+    """Build (or reuse) the RegexSet for a tuple of patterns."""
+    return RegexSet(patterns)
+
+
+def group_patterns_by_field(conditions) -> Dict[str, Tuple[str, ...]]:
+    """Collect regex_match patterns per field from an iterable of Conditions."""
+    by_field: Dict[str, Dict[str, None]] = {}
+    for condition in conditions:
+        if condition.operator == 'regex_match':
+            by_field.setdefault(condition.field, {})[condition.pattern] = None
+    return {f: tuple(patterns) for f, patterns in by_field.items()}
+
+
+_REPEATS = (_sre.MAX_REPEAT, _sre.MIN_REPEAT)
+# Bounded repeats this large backtrack like unbounded ones: "(.*a){12}"
+MANY_REPEATS = 10
+
+
+@lru_cache(maxsize=1024)
+def redos_risk(pattern: str) -> Optional[str]:
+    """Return why pattern may backtrack catastrophically, or None.
+
+    A heuristic that flags the shapes behind exponential backtracking: an
+    unbounded repeat whose body can itself be split several ways, such as
+    nested quantifiers ("(a+)+", "(\\w+\\s*)*") or overlapping alternatives
+    ("(a|ab)*"). A nested repeat followed by a separator it cannot consume,
+    as in "(\\d+\\.)+", is not flagged.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern, re.IGNORECASE)
+    except (re.error, RecursionError, OverflowError):
+        return None
+    return _risk(list(parsed))
+
+
+def _risk(items) -> Optional[str]:
+    for op, av in items:
+        if op in _REPEATS:
+            lo, hi, body = av
+            if hi == _sre.MAXREPEAT or hi >= MANY_REPEATS:
+                reason = _ambiguous_body(_unwrap(list(body)))
+                if reason:
+                    return reason
+            reason = _risk(list(body))
+        elif op is _sre.SUBPATTERN:
+            reason = _risk(list(av[-1]))
+        elif op is _sre.BRANCH:
+            reason = next(filter(None, (_risk(list(b)) for b in av[1])), None)
+        elif op in (_sre.ASSERT, _sre.ASSERT_NOT):
+            reason = _risk(list(av[1]))
+        else:
+            # Atomic groups and possessive repeats never backtrack into themselves
+            reason = None
+        if reason:
+            return reason
+    return None
+
+
+def _unwrap(items):
+    """Strip groups that wrap a whole sequence: ((x)) -> x."""
+    while len(items) == 1 and items[0][0] is _sre.SUBPATTERN:
+        items = list(items[0][1][-1])
+    return items
+
+
+def _ambiguous_body(body) -> Optional[str]:
+    """Why a repeated body can match the same text in many ways, or None."""
+    if len(body) == 1 and body[0][0] is _sre.BRANCH:
+        branches = [_unwrap(list(b)) for b in body[0][1][1]]
+        firsts = [_first_chars(b) for b in branches]
+        for i in range(len(firsts)):
+            for j in range(i + 1, len(firsts)):
+                if _overlap(firsts[i], firsts[j]):
+                    return "repeated alternation with overlapping branches"
+        for branch in branches:
+            reason = _ambiguous_body(branch)
+            if reason:
+                return reason
+        return None
+
+    first = _first_chars(body)
+    for i, (op, av) in enumerate(body):
+        trailing = i and all(_can_be_empty(*item) for item in body[i:])
+        if trailing and _overlap(first, _first_chars(_optional_content(op, av))):
+            # The optional tail can also start the next iteration: "(a|aa)*"
+            return "optional tail overlapping the repeated text"
+        if op not in _REPEATS or av[1] < 2:
+            continue
+        chars = _first_chars(list(av[2]))
+        # Safe only if some required element can't be consumed by the inner
+        # repeat, which pins down where each iteration ends
+        required = [body[j] for j in range(len(body)) if j != i and not _can_be_empty(*body[j])]
+        if not any(not _overlap(chars, _first_chars([item])) for item in required):
+            return "nested quantifiers"
+    return None
+
+
+# Character classes are approximated over ASCII, which is enough to tell
+# separators such as "." or "\\s" apart from "\\w" or "\\d"
+_ASCII = frozenset(range(128))
+_CATEGORIES = {
+    _sre.CATEGORY_DIGIT: frozenset(c for c in _ASCII if chr(c).isdigit()),
+    _sre.CATEGORY_SPACE: frozenset(c for c in _ASCII if chr(c).isspace()),
+    _sre.CATEGORY_WORD: frozenset(c for c in _ASCII if chr(c).isalnum() or c == ord('_')),
+}
+_CATEGORIES.update({
+    _sre.CATEGORY_NOT_DIGIT: _ASCII - _CATEGORIES[_sre.CATEGORY_DIGIT],
+    _sre.CATEGORY_NOT_SPACE: _ASCII - _CATEGORIES[_sre.CATEGORY_SPACE],
+    _sre.CATEGORY_NOT_WORD: _ASCII - _CATEGORIES[_sre.CATEGORY_WORD],
+})
+
+
+def _fold(code: int) -> int:
+    return ord(chr(code).lower()[0])
+
+
+def _class_chars(av) -> Optional[Set[int]]:
+    """Characters matched by a [...] set (None if unknown)."""
+    chars: Set[int] = set()
+    negate = False
+    for op, item in av:
+        if op is _sre.NEGATE:
+            negate = True
+        elif op is _sre.LITERAL:
+            chars.add(_fold(item))
+        elif op is _sre.RANGE and item[1] - item[0] <= 256:
+            chars.update(_fold(c) for c in range(item[0], item[1] + 1))
+        elif op is _sre.CATEGORY and item in _CATEGORIES:
+            chars |= _CATEGORIES[item]
+        else:
+            return None
+    if negate:
+        return set(_ASCII - {_fold(c) for c in chars} - chars)
+    return chars
+
+
+def _first_chars(items) -> Optional[Set[int]]:
+    """Characters a sequence can start with (None: any, or unknown)."""
+    for i, (op, av) in enumerate(items):
+        if op is _sre.AT:
+            continue
+        if _can_be_empty(op, av) and op in _REPEATS + (_sre.BRANCH, _sre.SUBPATTERN):
+            # Either this item's first character or whatever follows it
+            here = _first_chars(_optional_content(op, av))
+            rest = _first_chars(items[i + 1:])
+            return None if here is None or rest is None else here | rest
+        if op is _sre.LITERAL:
+            return {_fold(av)}
+        if op is _sre.NOT_LITERAL:
+            return set(_ASCII - {_fold(av)})
+        if op is _sre.IN:
+            return _class_chars(av)
+        if op in _REPEATS:
+            return _first_chars(list(av[2]))
+        if op is _sre.SUBPATTERN:
+            return _first_chars(list(av[-1]))
+        if op is _sre.BRANCH:
+            union: Set[int] = set()
+            for branch in av[1]:
+                chars = _first_chars(list(branch))
+                if chars is None:
+                    return None
+                union |= chars
+            return union
+        return None
+    return None
+
+
+def _optional_content(op, av):
+    """The non-empty alternatives of an item that can match empty."""
+    if op in _REPEATS:
+        return list(av[2])
+    if op is _sre.BRANCH:
+        return [(_sre.BRANCH, (None, [b for b in av[1] if len(b)]))]
+    if op is _sre.SUBPATTERN:
+        return list(av[-1])
+    return []
+
+
+def _overlap(a: Optional[Set[int]], b: Optional[Set[int]]) -> bool:
+    return a is None or b is None or bool(a & b)
+
+
+def _can_be_empty(op, av) -> bool:
+    if op in _REPEATS:
+        return av[0] == 0 or all(_can_be_empty(*item) for item in av[2])
+    if op is _sre.SUBPATTERN:
+        return all(_can_be_empty(*item) for item in av[-1])
+    if op is _sre.BRANCH:
+        return any(all(_can_be_empty(*item) for item in branch) for branch in av[1])
+    return op in (_sre.AT, _sre.ASSERT, _sre.ASSERT_NOT)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Replay recorded sessions against hookify rule sets.
+
+Reads JSONL transcripts (or recorded hook inputs), rebuilds the hook calls
+they imply and evaluates them with RuleEngine.evaluate_many across a
+process pool. Reports per-rule hit counts and, given a baseline rule set,
+every hook call whose decision changed.
+
+Usage:
+    python3 replay.py --rules NEW_DIR [--baseline OLD_DIR] [--workers N]
+                      [--output report.json] PATH [PATH ...]
+
+PATH is a .jsonl file or a directory searched recursively for them.
+"""
+
+import argparse
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Allow running as a script: make the "hookify" package importable
+PLUGIN_ROOT = os.environ.get('CLAUDE_PLUGIN_ROOT') or os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))
+parent_dir = os.path.dirname(PLUGIN_ROOT)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from hookify.core.config_loader import load_rule_snapshot
+from hookify.core.rule_engine import RuleEngine
+from hookify.core.rule_index import RuleIndex
+
+# Changed decisions kept per file (and in the final report)
+DEFAULT_MAX_CHANGES = 200
+
+
+def hook_inputs(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (line number, hook input) for the hook calls recorded in path.
+
+    Lines that already are hook inputs (they have hook_event_name) are used
+    as is. Claude Code transcript entries are turned into the calls the
+    hooks would have seen: PreToolUse/PostToolUse per tool use,
+    UserPromptSubmit per typed prompt and one Stop at the end, evaluated
+    against the whole transcript.
+    """
+    pending: Dict[str, Dict[str, Any]] = {}
+    saw_assistant = False
+    line_no = 0
+
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line_no, line in enumerate(f, 1):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(entry, dict):
+                continue
+
+            if 'hook_event_name' in entry:
+                yield line_no, _without_session(entry)
+                continue
+
+            message = entry.get('message')
+            content = message.get('content') if isinstance(message, dict) else None
+            common = {'transcript_path': path, 'cwd': entry.get('cwd', '')}
+
+            if entry.get('type') == 'assistant':
+                saw_assistant = True
+                for block in content if isinstance(content, list) else ():
+                    if isinstance(block, dict) and block.get('type') == 'tool_use':
+                        tool_input = block.get('input')
+                        call = {**common, 'tool_name': block.get('name', ''),
+                                'tool_input': tool_input if isinstance(tool_input, dict) else {}}
+                        pending[block.get('id')] = call
+                        yield line_no, {**call, 'hook_event_name': 'PreToolUse'}
+
+            elif entry.get('type') == 'user':
+                if isinstance(content, str):
+                    yield line_no, {**common, 'hook_event_name': 'UserPromptSubmit',
+                                    'prompt': content, 'user_prompt': content}
+                    continue
+                for block in content if isinstance(content, list) else ():
+                    if not isinstance(block, dict) or block.get('type') != 'tool_result':
+                        continue
+                    call = pending.pop(block.get('tool_use_id'), None)
+                    if call is not None:
+                        response = entry.get('toolUseResult', block.get('content'))
+                        yield line_no, {**call, 'hook_event_name': 'PostToolUse',
+                                        'tool_response': response}
+
+    if saw_assistant:
+        yield line_no, {'hook_event_name': 'Stop', 'transcript_path': path,
+                        'stop_hook_active': False}
+
+
+def _without_session(input_data: Dict[str, Any]) -> Dict[str, Any]:
+    # Replays must not read or write the live sessions' transcript checkpoints
+    return {k: v for k, v in input_data.items() if k != 'session_id'}
+
+
+def decision_of(response: Dict[str, Any]) -> str:
+    """Summarize a hook response as "block", "warn" or "allow"."""
+    if response.get('decision') == 'block':
+        return 'block'
+    if response.get('hookSpecificOutput', {}).get('permissionDecision') == 'deny':
+        return 'block'
+    if response.get('systemMessage'):
+        return 'warn'
+    return 'allow'
+
+
+def _describe(input_data: Dict[str, Any]) -> str:
+    """Short human-readable description of a hook call."""
+    tool_input = input_data.get('tool_input')
+    if not isinstance(tool_input, dict):
+        tool_input = {}
+    detail = (tool_input.get('command') or tool_input.get('file_path')
+              or input_data.get('user_prompt') or '')
+    text = f"{input_data.get('tool_name') or input_data['hook_event_name']}: {detail}"
+    return text if len(text) <= 200 else text[:197] + '...'
+
+
+# Per-worker state, set by _init_worker(): rule set name -> (index, engine)
+_rule_sets: Dict[str, Tuple[RuleIndex, RuleEngine]] = {}
+_max_changes = DEFAULT_MAX_CHANGES
+
+
+def load_index(rules_dir: str) -> RuleIndex:
+    """Build a RuleIndex from the hookify.*.local.md files in rules_dir."""
+    snapshot = load_rule_snapshot(rules_dir)
+    return RuleIndex(snapshot['rules'], snapshot['version'])
+
+
+def _init_worker(rules_dir: str, baseline_dir: Optional[str], max_changes: int) -> None:
+    global _max_changes
+    _rule_sets['rules'] = (load_index(rules_dir), RuleEngine())
+    if baseline_dir:
+        _rule_sets['baseline'] = (load_index(baseline_dir), RuleEngine())
+    _max_changes = max_changes
+
+
+def replay_file(path: str) -> Dict[str, Any]:
+    """Replay one file against the worker's rule sets."""
+    inputs = list(hook_inputs(path))
+    calls = [input_data for _, input_data in inputs]
+    result: Dict[str, Any] = {
+        'path': path,
+        'calls': Counter(c['hook_event_name'] for c in calls),
+        'hits': {},
+        'decisions': {},
+        'changes': [],
+        'changed': 0,
+    }
+
+    outcomes = {}
+    for name, (index, engine) in _rule_sets.items():
+        hits: Counter = Counter()
+        decisions: Counter = Counter()
+        outcome = []
+        for response, matched in engine.evaluate_many(index, calls):
+            hits.update(r.name for r in matched)
+            decision = decision_of(response)
+            decisions[decision] += 1
+            outcome.append((decision, [r.name for r in matched]))
+        result['hits'][name] = hits
+        result['decisions'][name] = decisions
+        outcomes[name] = outcome
+
+    if 'baseline' in outcomes:
+        pairs = zip(inputs, outcomes['baseline'], outcomes['rules'])
+        for (line_no, input_data), (old, old_rules), (new, new_rules) in pairs:
+            if old == new:
+                continue
+            result['changed'] += 1
+            if len(result['changes']) < _max_changes:
+                result['changes'].append({
+                    'path': path,
+                    'line': line_no,
+                    'hook': input_data['hook_event_name'],
+                    'call': _describe(input_data),
+                    'baseline': old,
+                    'new': new,
+                    'baseline_rules': old_rules,
+                    'new_rules': new_rules,
+                })
+    return result
+
+
+def find_files(paths: List[str]) -> List[str]:
+    """Expand directories into the .jsonl files under them."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, n) for n in sorted(names) if n.endswith('.jsonl'))
+        else:
+            files.append(path)
+    return files
+
+
+def replay(files: List[str], rules_dir: str, baseline_dir: Optional[str] = None,
+           workers: Optional[int] = None, max_changes: int = DEFAULT_MAX_CHANGES) -> Dict[str, Any]:
+    """Replay files across a process pool and merge the per-file results."""
+    report: Dict[str, Any] = {
+        'files': 0,
+        'calls': Counter(),
+        'hits': {},
+        'decisions': {},
+        'changed': 0,
+        'changes': [],
+        'errors': [],
+    }
+    # Every rule gets a count, so rules that never fire show up as 0
+    sets = {'rules': rules_dir, **({'baseline': baseline_dir} if baseline_dir else {})}
+    for name, directory in sets.items():
+        report['hits'][name] = Counter({r.name: 0 for r in load_rule_snapshot(directory)['rules']})
+        report['decisions'][name] = Counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(rules_dir, baseline_dir, max_changes)) as pool:
+        futures = [(path, pool.submit(replay_file, path)) for path in files]
+        for path, future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                # One bad file must not lose the others' results
+                report['errors'].append(f"{path}: {type(e).__name__}: {e}")
+                continue
+            report['files'] += 1
+            report['calls'].update(result['calls'])
+            for name in sets:
+                report['hits'][name].update(result['hits'][name])
+                report['decisions'][name].update(result['decisions'][name])
+            report['changed'] += result['changed']
+            room = max_changes - len(report['changes'])
+            report['changes'].extend(result['changes'][:room])
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    total = sum(report['calls'].values())
+    print(f"Replayed {total} hook calls from {report['files']} files")
+    for hook, count in sorted(report['calls'].items()):
+        print(f"  {hook:20} {count}")
+
+    for name, decisions in report['decisions'].items():
+        summary = ', '.join(f"{d} {decisions[d]}" for d in ('block', 'warn', 'allow'))
+        print(f"\nDecisions ({name}): {summary}")
+
+    baseline = report['hits'].get('baseline')
+    print(f"\n{'rule':50} {'hits':>8}" + (f" {'baseline':>9}" if baseline is not None else ''))
+    for rule, hits in sorted(report['hits']['rules'].items(), key=lambda kv: (-kv[1], kv[0])):
+        line = f"{rule:50} {hits:8d}"
+        if baseline is not None:
+            line += f" {baseline.get(rule, 0):9d}" if rule in baseline else f" {'(new)':>9}"
+        print(line)
+    if baseline is not None:
+        for rule in sorted(set(baseline) - set(report['hits']['rules'])):
+            print(f"{rule:50} {'(removed)':>8} {baseline[rule]:9d}")
+
+        print(f"\n{report['changed']} decisions changed")
+        for change in report['changes']:
+            print(f"  {change['path']}:{change['line']} {change['hook']} "
+                  f"{change['baseline']} -> {change['new']}  {change['call']}")
+        if report['changed'] > len(report['changes']):
+            print(f"  ... {report['changed'] - len(report['changes'])} more")
+
+    for error in report['errors']:
+        print(f"Error: {error}", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded sessions against hookify rules")
+    parser.add_argument('paths', nargs='+', metavar='PATH',
+                        help="transcript .jsonl files or directories of them")
+    parser.add_argument('--rules', default='.claude',
+                        help="directory with the rule files to test (default: .claude)")
+    parser.add_argument('--baseline', help="directory with the current rule files to compare against")
+    parser.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    parser.add_argument('--max-changes', type=int, default=DEFAULT_MAX_CHANGES,
+                        help=f"changed decisions to list (default {DEFAULT_MAX_CHANGES})")
+    parser.add_argument('--output', help="write the full report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    files = find_files(args.paths)
+    if not files:
+        print("No .jsonl files found", file=sys.stderr)
+        return 1
+
+    report = replay(files, args.rules, args.baseline, args.workers, args.max_changes)
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""Bounded-memory tool_response matching for hookify plugin.
+
+PostToolUse input carries the tool's output, which can run to tens of MB:
+a build log, a `cat` of a dump, a big Read. Conditions on the
+RESPONSE_FIELDS (see fields.py) are matched against it in chunks, like
+transcript scans: each chunk is decoded straight from the hook input's
+JSON text when it is reached, and the scan stops at the first hit, so the
+output is never decoded into one string.
+
+What each field reads:
+    stdout, stderr   the Bash tool's output streams
+    tool_response    stdout then stderr for Bash, the file content for
+                     Read, a plain string response as is, and any other
+                     response as JSON
+"""
+
+import json
+import re
+from json.decoder import scanstring
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+from hookify.core.transcript import REGEX_LOOKAHEAD, REGEX_OVERLAP
+from hookify.utils.payload import LazyObject
+
+# Characters of JSON text decoded per chunk
+CHUNK_CHARS = 1 << 20
+
+# High surrogate escape (\uD800-\uDBFF): kept with the low one after it
+_HIGH_SURROGATE = re.compile(r'\\u[dD][89abAB][0-9a-fA-F]{2}')
+
+# A string value located in JSON text, or one that is already decoded
+Source = Any
+
+
+def response_chunks(field: str, input_data: Any) -> Optional[Iterator[str]]:
+    """Text of a response field in chunks, or None if the input has no such field."""
+    if not input_data:
+        return None
+    if field in ('stdout', 'stderr'):
+        response = _source(input_data, 'tool_response')
+        if not hasattr(response, 'get'):
+            return None
+        source = _source(response, field)
+        return None if source is None else _chunks(source)
+    if field != 'tool_response':
+        return None
+
+    source = _source(input_data, 'tool_response')
+    if source is None:
+        return None
+    if _is_string(source) or not hasattr(source, 'get'):
+        return _chunks(source)
+    streams = [s for s in (_source(source, 'stdout'), _source(source, 'stderr')) if s is not None]
+    if streams:
+        return _joined(streams)
+    file = source.get('file')
+    content = _source(file, 'content') if hasattr(file, 'get') else None
+    if content is None:
+        content = _source(source, 'content')
+    if content is not None and _is_string(content):
+        return _chunks(content)
+    return _chunks(source)
+
+
+def response_text(field: str, input_data: Any) -> Optional[str]:
+    """The whole text of a response field (for operators that need all of it)."""
+    chunks = response_chunks(field, input_data)
+    return None if chunks is None else ''.join(chunks)
+
+
+def _source(mapping: Any, key: str) -> Optional[Source]:
+    """mapping[key]; left in place in the JSON text if it is a lazily read string."""
+    if isinstance(mapping, LazyObject):
+        location = mapping.locate(key)
+        if location is None:
+            return None
+        text, pos = location
+        if text.startswith('"', pos):
+            return location
+    elif key not in mapping:
+        return None
+    return mapping[key]
+
+
+def _is_string(source: Source) -> bool:
+    return isinstance(source, (str, tuple))
+
+
+def _chunks(source: Source) -> Iterator[str]:
+    if isinstance(source, tuple):
+        return _json_string_chunks(*source)
+    if not isinstance(source, str):
+        if isinstance(source, LazyObject):
+            source = source.decode()
+        source = json.dumps(source, ensure_ascii=False)
+    return (source[i:i + CHUNK_CHARS] for i in range(0, len(source), CHUNK_CHARS))
+
+
+def _joined(sources: List[Source]) -> Iterator[str]:
+    """Chunks of the sources, non-empty ones separated by a newline."""
+    wrote = False
+    for source in sources:
+        first = True
+        for chunk in _chunks(source):
+            if not chunk:
+                continue
+            if first and wrote:
+                yield '\n'
+            first = False
+            wrote = True
+            yield chunk
+
+
+def _json_string_chunks(text: str, pos: int) -> Iterator[str]:
+    """Decode the JSON string starting at text[pos] (its quote) a chunk at a time."""
+    start = pos + 1
+    while True:
+        # 12 chars always hold a whole escape or surrogate pair
+        cut = min(start + max(CHUNK_CHARS, 12), len(text))
+        if cut < len(text):
+            cut = _escape_boundary(text, start, cut)
+        # scanstring stops at the string's closing quote if the chunk holds
+        # it; otherwise at the quote added here
+        piece = text[start:cut] + '"'
+        value, end = scanstring(piece, 0)
+        yield value
+        if end < len(piece):
+            return
+        if cut >= len(text):
+            raise json.JSONDecodeError("Unterminated string starting at", text, pos)
+        start = cut
+
+
+def _escape_boundary(text: str, start: int, cut: int) -> int:
+    """cut, moved back so that no escape (or surrogate pair) is split."""
+    b = text.rfind('\\', max(start, cut - 5), cut)
+    if b != -1 and _escaping(text, start, b):
+        if b + (6 if text.startswith('u', b + 1) else 2) > cut:
+            cut = b
+    b = cut - 6
+    if b >= start and _HIGH_SURROGATE.match(text, b) and _escaping(text, start, b):
+        cut = b
+    return cut
+
+
+def _escaping(text: str, start: int, b: int) -> bool:
+    """True if the backslash at b starts an escape (isn't itself escaped)."""
+    run = b
+    while run > start and text[run - 1] == '\\':
+        run -= 1
+    return (b - run) % 2 == 0
+
+
+def match_chunks(operator: str, pattern: str, regex: Optional[re.Pattern],
+                 chunks: Iterable[str]) -> bool:
+    """Apply a text operator to chunked text; same result as on the joined text."""
+    if operator in ('contains', 'not_contains'):
+        found = _contains(pattern, chunks)
+        return not found if operator == 'not_contains' else found
+    if operator == 'regex_match':
+        return regex is not None and _search(regex, chunks)
+    if operator == 'equals':
+        seen = 0
+        for chunk in chunks:
+            if pattern[seen:seen + len(chunk)] != chunk:
+                return False
+            seen += len(chunk)
+        return seen == len(pattern)
+    if operator == 'starts_with':
+        head = ''
+        for chunk in chunks:
+            head += chunk[:len(pattern) - len(head)]
+            if len(head) >= len(pattern):
+                break
+        return head == pattern
+    if operator == 'ends_with':
+        tail = ''
+        for chunk in chunks:
+            tail = (tail + chunk)[-len(pattern):] if pattern else ''
+        return tail.endswith(pattern)
+    return False
+
+
+def _contains(needle: str, chunks: Iterable[str]) -> bool:
+    if not needle:
+        return True
+    carry = ''
+    for chunk in chunks:
+        window = carry + chunk
+        if needle in window:
+            return True
+        # Overlap by len(needle) - 1 so no occurrence is split
+        carry = window[-(len(needle) - 1):] if len(needle) > 1 else ''
+    return False
+
+
+def _search(regex: re.Pattern, chunks: Iterable[str]) -> bool:
+    """regex.search over overlapping windows, like TranscriptScanner._search."""
+    tail = ''
+    # Whether tail still begins at the start of the text
+    at_start = True
+    for text, final in _with_final(chunks):
+        window = tail + text
+        # Past the start, the window's first char is only look-behind context
+        m = regex.search(window, 0 if at_start else 1)
+        if m:
+            if final or m.end() <= len(window) - REGEX_LOOKAHEAD:
+                return True
+            if m.start() < len(window) - REGEX_OVERLAP:
+                # Too long to be re-found in the next window
+                return True
+            # Otherwise it is re-checked with more right-hand context
+        if final:
+            return False
+        at_start = at_start and len(window) <= REGEX_OVERLAP + 1
+        tail = window[-(REGEX_OVERLAP + 1):]
+    return False
+
+
+def _with_final(chunks: Iterable[str]) -> Iterator[Tuple[str, bool]]:
+    """(chunk, is_last) pairs; a single empty chunk if there are none."""
+    previous = None
+    for chunk in chunks:
+        if previous is not None:
+            yield previous, False
+        previous = chunk
+    yield previous or '', True
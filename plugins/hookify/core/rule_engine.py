@@ -1,36 +1,68 @@
 #!/usr/bin/env python3
 """Rule evaluation engine for hookify plugin."""
 
-import re
+import os
 import sys
-from functools import lru_cache
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple, Union
 
 # Import from local module
-from hookify.core.config_loader import Rule, Condition
+from hookify.core.config_loader import Rule
+from hookify.core.compiler import CompiledCondition, CompiledRule, STREAMED_FIELDS, compiled_rule
+from hookify.core.fields import FieldView
+from hookify.core.regex_set import regex_set, group_patterns_by_field
+from hookify.core.literal_set import LiteralPrefilter
+from hookify.core.profiler import Profiler
+from hookify.core.budget import Budget, BudgetExceeded, Deadline
+from hookify.core.rule_index import RuleIndex
+from hookify.core.response import match_chunks, response_chunks
+from hookify.core.transcript import TranscriptScanner, TranscriptCheckpoint, transcript_path_for
 
+# Rule lists whose prepared state evaluate_many() keeps
+MAX_PREPARED = 256
 
-# Cache compiled regexes (max 128 patterns)
-@lru_cache(maxsize=128)
-def compile_regex(pattern: str) -> re.Pattern:
-    """Compile regex pattern with caching.
-
-    Args:
-        pattern: Regex pattern string
-
-    Returns:
-        Compiled regex pattern
-    """
-    return re.compile(pattern, re.IGNORECASE)
+# Over-budget rules named in the systemMessage
+MAX_REPORTED_SKIPS = 5
 
 
 class RuleEngine:
     """Evaluates rules against hook input data."""
 
-    def __init__(self):
-        """Initialize rule engine."""
-        # No need for instance cache anymore - using global lru_cache
-        pass
+    def __init__(self, profiler: Optional[Profiler] = None, budget: Optional[Budget] = None,
+                 first_block_wins: Optional[bool] = None):
+        """Initialize rule engine.
+
+        Args:
+            profiler: Optional Profiler that records per-rule and
+                per-condition counts and timings
+            budget: Time and field size limits (default: from HOOKIFY_*
+                environment variables)
+            first_block_wins: Evaluate blocking rules first and stop at the
+                first one that matches; the response then names only that
+                rule (default: HOOKIFY_FIRST_BLOCK_WINS=1)
+        """
+        self.profiler = profiler
+        self.budget = budget if budget is not None else Budget.from_env()
+        if first_block_wins is None:
+            first_block_wins = os.environ.get('HOOKIFY_FIRST_BLOCK_WINS', '') not in ('', '0')
+        self.first_block_wins = first_block_wins
+        # Per-evaluation state, set up by _matching_rules():
+        # field -> tuple of regex patterns used by the rules being evaluated
+        self._regex_patterns: Dict[str, tuple] = {}
+        # field -> set of those patterns that matched the current input
+        # (False when the combined scan ran out of time)
+        self._regex_hits: Dict[str, Any] = {}
+        # Literal prefilter for the rules being evaluated, and the input's
+        # memoized field values
+        self._prefilter: Optional[LiteralPrefilter] = None
+        self._fields: Optional[FieldView] = None
+        # transcript path -> per-session scan checkpoint, saved after evaluation
+        self._checkpoints: Dict[str, TranscriptCheckpoint] = {}
+        # time.monotonic() by which all rules of this input must be done
+        self._hook_deadline: Optional[float] = None
+        # id(rule list) -> (rule list, prefilter, regex patterns by field),
+        # kept across evaluate_many() calls
+        self._prepared: Dict[int, Tuple[List[Rule], LiteralPrefilter, Dict[str, tuple]]] = {}
 
     def evaluate_rules(self, rules: List[Rule], input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Evaluate all rules and return combined results.
@@ -46,16 +78,151 @@ class RuleEngine:
             Response dict with systemMessage, hookSpecificOutput, etc.
             Empty dict {} if no rules match.
         """
-        hook_event = input_data.get('hook_event_name', '')
-        blocking_rules = []
-        warning_rules = []
+        matched, skipped = self.match_rules(rules, input_data)
+        return self.response(input_data.get('hook_event_name', ''), matched, skipped)
+
+    def match_rules(self, rules: List[Rule], input_data: Dict[str, Any]
+                    ) -> Tuple[List[Rule], List[Tuple[Rule, str]]]:
+        """Return the rules that match input_data, without building a response.
+
+        Returns:
+            (matched rules in rule order, [(rule, reason)] for rules skipped
+            because they ran past their time or size budget)
+        """
+        # One literal scan per field rejects rules whose contains/not_contains
+        # patterns or required regex literals don't fit the input
+        prefilter = LiteralPrefilter(rules, skip_fields=STREAMED_FIELDS)
+        return self._matching_rules(rules, input_data, prefilter)
+
+    def evaluate_many(self, rules: Union[List[Rule], RuleIndex],
+                      inputs: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], List[Rule]]]:
+        """Evaluate a stream of inputs, preparing the rules only once.
+
+        The literal prefilter and the per-field regex groups are built once
+        per rule list and reused for every input (and by later calls with the
+        same list), instead of once per call as in evaluate_rules().
 
-        for rule in rules:
-            if self._rule_matches(rule, input_data):
-                if rule.action == 'block':
-                    blocking_rules.append(rule)
-                else:
-                    warning_rules.append(rule)
+        Args:
+            rules: Rules evaluated against every input, or a RuleIndex, in
+                which case each input sees the rules its hook would
+                (chosen by its hook_event_name and tool_name)
+            inputs: Hook input dicts
+
+        Yields:
+            (response, matched rules) per input, in input order. The response
+            is what evaluate_rules() returns for the same rules and input.
+        """
+        for input_data in inputs:
+            hook_event = input_data.get('hook_event_name', '')
+            if isinstance(rules, RuleIndex):
+                bucket = rules.rules_for_input(hook_event, input_data)
+            else:
+                bucket = rules
+            if not bucket:
+                yield {}, []
+                continue
+
+            entry = self._prepared.get(id(bucket))
+            if entry is None:
+                if len(self._prepared) >= MAX_PREPARED:
+                    self._prepared.clear()
+                entry = self._prepared[id(bucket)] = (
+                    bucket,
+                    LiteralPrefilter(bucket, skip_fields=STREAMED_FIELDS),
+                    group_patterns_by_field(
+                        c for r in bucket for c in r.conditions if c.field not in STREAMED_FIELDS),
+                )
+            _, prefilter, regex_patterns = entry
+            prefilter.reset()
+            matched, skipped = self._matching_rules(bucket, input_data, prefilter, regex_patterns)
+            yield self.response(hook_event, matched, skipped), matched
+
+    def _matching_rules(self, rules: List[Rule], input_data: Dict[str, Any],
+                        prefilter: LiteralPrefilter,
+                        regex_patterns: Optional[Dict[str, tuple]] = None
+                        ) -> Tuple[List[Rule], List[Tuple[Rule, str]]]:
+        """Return the rules that match input_data, in rule order.
+
+        Args:
+            rules: Rules to evaluate
+            input_data: Hook input JSON
+            prefilter: LiteralPrefilter built for rules (reset for this input)
+            regex_patterns: Regex patterns by field to match in one combined
+                scan; defaults to those of the rules passing the prefilter
+
+        Returns:
+            (matched rules, [(rule, reason)] for rules skipped because they
+            ran past their time or size budget)
+        """
+        fields = FieldView(input_data, self.budget.cap)
+        self._prefilter = prefilter
+        self._fields = fields
+        candidates = [r for r in rules if prefilter.passes(r, fields.get, fields.capped)]
+        if self.profiler is not None:
+            self.profiler.skipped += len(rules) - len(candidates)
+        if self.first_block_wins:
+            # Once a blocking rule matches, no other rule can change the decision
+            candidates = ([r for r in candidates if r.action == 'block'] +
+                          [r for r in candidates if r.action != 'block'])
+
+        # Regex conditions of the remaining rules are matched per field in one
+        # combined scan, done lazily the first time a rule needs that field
+        if regex_patterns is None:
+            regex_patterns = group_patterns_by_field(
+                c for r in candidates for c in r.conditions if c.field not in STREAMED_FIELDS)
+        self._regex_patterns = regex_patterns
+        self._regex_hits = {}
+
+        hook_budget = self.budget.hook_ms
+        self._hook_deadline = time.monotonic() + hook_budget / 1e3 if hook_budget else None
+
+        profiled = self.profiler is not None
+        matched: List[Rule] = []
+        skipped: List[Tuple[Rule, str]] = []
+        try:
+            for rule in candidates:
+                compiled = compiled_rule(rule)
+                try:
+                    if (self._profiled_rule_matches(compiled, fields) if profiled
+                            else compiled.matches(self, fields)):
+                        matched.append(rule)
+                        if self.first_block_wins and rule.action == 'block':
+                            break
+                except BudgetExceeded as e:
+                    # Report and skip the rule rather than stall the tool call
+                    print(f"Warning: hookify rule '{rule.name}' skipped: {e}", file=sys.stderr)
+                    skipped.append((rule, str(e)))
+                    if self.profiler is not None:
+                        self.profiler.over_budget(rule.name, str(e))
+            return matched, skipped
+        finally:
+            for checkpoint in self._checkpoints.values():
+                checkpoint.save()
+
+            # Scan results belong to this input only
+            self._checkpoints = {}
+            self._prefilter = None
+            self._fields = None
+            self._regex_patterns = {}
+            self._regex_hits = {}
+            self._hook_deadline = None
+
+    def response(self, hook_event: str, matched: List[Rule],
+                 skipped: List[Tuple[Rule, str]] = ()) -> Dict[str, Any]:
+        """Build the hook response for the matched and over-budget rules."""
+        response = self._match_response(hook_event, matched)
+        if skipped:
+            names = ', '.join(f"{r.name} ({reason})" for r, reason in skipped[:MAX_REPORTED_SKIPS])
+            if len(skipped) > MAX_REPORTED_SKIPS:
+                names += f", and {len(skipped) - MAX_REPORTED_SKIPS} more"
+            note = f"Hookify skipped {len(skipped)} rule(s) that exceeded their time or size budget: {names}"
+            message = response.get('systemMessage')
+            response['systemMessage'] = f"{message}\n\n{note}" if message else note
+        return response
+
+    def _match_response(self, hook_event: str, matched: List[Rule]) -> Dict[str, Any]:
+        blocking_rules = [r for r in matched if r.action == 'block']
+        warning_rules = [r for r in matched if r.action != 'block']
 
         # If any blocking rules matched, block the operation
         if blocking_rules:
@@ -93,184 +260,102 @@ class RuleEngine:
         # No matches - allow operation
         return {}
 
-    def _rule_matches(self, rule: Rule, input_data: Dict[str, Any]) -> bool:
-        """Check if rule matches input data.
-
-        Args:
-            rule: Rule to evaluate
-            input_data: Hook input data
-
-        Returns:
-            True if rule matches, False otherwise
-        """
-        # Extract tool information
-        tool_name = input_data.get('tool_name', '')
-        tool_input = input_data.get('tool_input', {})
-
-        # Check tool matcher if specified
-        if rule.tool_matcher:
-            if not self._matches_tool(rule.tool_matcher, tool_name):
-                return False
-
-        # If no conditions, don't match
-        # (Rules must have at least one condition to be valid)
-        if not rule.conditions:
+    def _profiled_rule_matches(self, rule: CompiledRule, fields: FieldView) -> bool:
+        """CompiledRule.matches() that records rule and condition timings."""
+        profiler = self.profiler
+        started = time.perf_counter()
+
+        matched = bool(rule.conditions) and (
+            rule.tools is None or fields.tool_name in rule.tools)
+        if matched:
+            for condition in rule.conditions:
+                t0 = time.perf_counter()
+                ok = condition.check(self, fields)
+                profiler.condition(rule.name, condition.index, condition.condition, ok,
+                                   time.perf_counter() - t0)
+                if not ok:
+                    matched = False
+                    break
+
+        profiler.rule(rule.name, matched, time.perf_counter() - started)
+        return matched
+
+    # Called by compiled conditions (see compiler.OPERATORS)
+
+    def match_regex(self, condition: CompiledCondition, value: str) -> bool:
+        """regex_match, answered from the field's combined scan when possible."""
+        patterns = self._regex_patterns.get(condition.field)
+        if patterns and condition.pattern in patterns:
+            hits = self._regex_hits.get(condition.field)
+            if hits is None:
+                try:
+                    with self._deadline(condition):
+                        hits = regex_set(patterns).matches(value)
+                except BudgetExceeded:
+                    # Some pattern in the combined scan is too slow; match
+                    # each one separately so only its own rule is skipped
+                    hits = False
+                self._regex_hits[condition.field] = hits
+            if hits is not False:
+                return condition.pattern in hits
+        with self._deadline(condition):
+            return bool(condition.regex.search(value))
+
+    def contains(self, condition: CompiledCondition, value: str) -> bool:
+        """True if condition.pattern occurs in value (for contains/not_contains)."""
+        if self._prefilter is not None:
+            found = self._prefilter.contains(condition.field, condition.pattern, self._fields.get)
+            if found is not None:
+                return found
+        return condition.pattern in value
+
+    def match_transcript(self, condition: CompiledCondition, input_data: Dict[str, Any]) -> bool:
+        """Match a transcript condition against the session file, with bounded memory."""
+        transcript_path = transcript_path_for(input_data)
+        if not transcript_path:
             return False
-
-        # All conditions must match
-        for condition in rule.conditions:
-            if not self._check_condition(condition, tool_name, tool_input, input_data):
-                return False
-
-        return True
-
-    def _matches_tool(self, matcher: str, tool_name: str) -> bool:
-        """Check if tool_name matches the matcher pattern.
-
-        Args:
-            matcher: Pattern like "Bash", "Edit|Write", "*"
-            tool_name: Actual tool name
-
-        Returns:
-            True if matches
-        """
-        if matcher == '*':
-            return True
-
-        # Split on | for OR matching
-        patterns = matcher.split('|')
-        return tool_name in patterns
-
-    def _check_condition(self, condition: Condition, tool_name: str,
-                        tool_input: Dict[str, Any], input_data: Dict[str, Any] = None) -> bool:
-        """Check if a single condition matches.
-
-        Args:
-            condition: Condition to check
-            tool_name: Tool being used
-            tool_input: Tool input dict
-            input_data: Full hook input data (for Stop events, etc.)
-
-        Returns:
-            True if condition matches
-        """
-        # Extract the field value to check
-        field_value = self._extract_field(condition.field, tool_name, tool_input, input_data)
-        if field_value is None:
+        with self._deadline(condition):
+            return TranscriptScanner(transcript_path).check(
+                condition.operator, condition.pattern,
+                self._transcript_checkpoint(input_data, transcript_path))
+
+    def match_response(self, condition: CompiledCondition, input_data: Dict[str, Any]) -> bool:
+        """Match a tool_response condition chunk by chunk, stopping at the first hit."""
+        chunks = response_chunks(condition.field, input_data)
+        if chunks is None:
             return False
+        with self._deadline(condition):
+            return match_chunks(condition.operator, condition.pattern, condition.regex, chunks)
 
-        # Apply operator
-        operator = condition.operator
-        pattern = condition.pattern
-
-        if operator == 'regex_match':
-            return self._regex_match(pattern, field_value)
-        elif operator == 'contains':
-            return pattern in field_value
-        elif operator == 'equals':
-            return pattern == field_value
-        elif operator == 'not_contains':
-            return pattern not in field_value
-        elif operator == 'starts_with':
-            return field_value.startswith(pattern)
-        elif operator == 'ends_with':
-            return field_value.endswith(pattern)
-        else:
-            # Unknown operator
-            return False
-
-    def _extract_field(self, field: str, tool_name: str,
-                      tool_input: Dict[str, Any], input_data: Dict[str, Any] = None) -> Optional[str]:
-        """Extract field value from tool input or hook input data.
-
-        Args:
-            field: Field name like "command", "new_text", "file_path", "reason", "transcript"
-            tool_name: Tool being used (may be empty for Stop events)
-            tool_input: Tool input dict
-            input_data: Full hook input (for accessing transcript_path, reason, etc.)
+    def _deadline(self, condition: CompiledCondition) -> Deadline:
+        """Deadline for one expensive condition (regex, transcript or output scan).
 
-        Returns:
-            Field value as string, or None if not found
+        Bounded by the per-condition budget and by what is left of the hook
+        budget; raises BudgetExceeded if the hook budget is already used up.
         """
-        # Direct tool_input fields
-        if field in tool_input:
-            value = tool_input[field]
-            if isinstance(value, str):
-                return value
-            return str(value)
-
-        # For Stop events and other non-tool events, check input_data
-        if input_data:
-            # Stop event specific fields
-            if field == 'reason':
-                return input_data.get('reason', '')
-            elif field == 'transcript':
-                # Read transcript file if path provided
-                transcript_path = input_data.get('transcript_path')
-                if transcript_path:
-                    try:
-                        with open(transcript_path, 'r') as f:
-                            return f.read()
-                    except FileNotFoundError:
-                        print(f"Warning: Transcript file not found: {transcript_path}", file=sys.stderr)
-                        return ''
-                    except PermissionError:
-                        print(f"Warning: Permission denied reading transcript: {transcript_path}", file=sys.stderr)
-                        return ''
-                    except (IOError, OSError) as e:
-                        print(f"Warning: Error reading transcript {transcript_path}: {e}", file=sys.stderr)
-                        return ''
-                    except UnicodeDecodeError as e:
-                        print(f"Warning: Encoding error in transcript {transcript_path}: {e}", file=sys.stderr)
-                        return ''
-            elif field == 'user_prompt':
-                # For UserPromptSubmit events
-                return input_data.get('user_prompt', '')
-
-        # Handle special cases by tool type
-        if tool_name == 'Bash':
-            if field == 'command':
-                return tool_input.get('command', '')
-
-        elif tool_name in ['Write', 'Edit']:
-            if field == 'content':
-                # Write uses 'content', Edit has 'new_string'
-                return tool_input.get('content') or tool_input.get('new_string', '')
-            elif field == 'new_text' or field == 'new_string':
-                return tool_input.get('new_string', '')
-            elif field == 'old_text' or field == 'old_string':
-                return tool_input.get('old_string', '')
-            elif field == 'file_path':
-                return tool_input.get('file_path', '')
-
-        elif tool_name == 'MultiEdit':
-            if field == 'file_path':
-                return tool_input.get('file_path', '')
-            elif field in ['new_text', 'content']:
-                # Concatenate all edits
-                edits = tool_input.get('edits', [])
-                return ' '.join(e.get('new_string', '') for e in edits)
-
-        return None
-
-    def _regex_match(self, pattern: str, text: str) -> bool:
-        """Check if pattern matches text using regex.
-
-        Args:
-            pattern: Regex pattern
-            text: Text to match against
-
-        Returns:
-            True if pattern matches
-        """
-        try:
-            # Use cached compiled regex (LRU cache with max 128 patterns)
-            regex = compile_regex(pattern)
-            return bool(regex.search(text))
-
-        except re.error as e:
-            print(f"Invalid regex pattern '{pattern}': {e}", file=sys.stderr)
-            return False
+        condition_ms = self.budget.condition_ms
+        seconds = condition_ms / 1e3 if condition_ms else None
+        message = f"{condition.field} {condition.operator} exceeded the {condition_ms:g} ms condition budget"
+        if self._hook_deadline is not None:
+            remaining = self._hook_deadline - time.monotonic()
+            message_hook = f"the {self.budget.hook_ms:g} ms hook budget ran out"
+            if remaining <= 0:
+                raise BudgetExceeded(message_hook)
+            if seconds is None or remaining < seconds:
+                seconds, message = remaining, message_hook
+        return Deadline(seconds, message)
+
+    def _transcript_checkpoint(self, input_data: Dict[str, Any],
+                               transcript_path: str) -> Optional[TranscriptCheckpoint]:
+        """Checkpoint for incremental transcript scans (needs a session_id)."""
+        session_id = input_data.get('session_id')
+        if not session_id:
+            return None
+        checkpoint = self._checkpoints.get(transcript_path)
+        if checkpoint is None:
+            checkpoint = TranscriptCheckpoint(session_id, transcript_path)
+            self._checkpoints[transcript_path] = checkpoint
+        return checkpoint
 
 
 # For testing
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Dispatch index for hookify plugin.
+
+Compiles a loaded rule set into event -> tool_name -> rules, so a hook call
+for a tool no rule targets costs a single dict lookup. The index is built
+once per rule-set version and reused across evaluations.
+"""
+
+import hashlib
+import os
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from hookify.core.config_loader import Rule, load_rule_snapshot
+from hookify.core.compiler import compile_rule, parse_tool_matcher
+from hookify.core.cost_model import costs_path, load_measured_costs, order_rules
+from hookify.core.match_lists import LIST_OPERATORS, list_base, list_file, list_files_key
+from hookify.utils.manifest import rule_event
+
+
+def rule_event_for(hook_name: str, input_data: Dict[str, Any]) -> Optional[str]:
+    """Return the rule event ("bash", "file", "stop", "prompt") for a hook call.
+
+    None means no event filter: every enabled rule is considered.
+    """
+    return rule_event(hook_name, input_data.get('tool_name', ''))
+
+
+class RuleIndex:
+    """Enabled rules of one rule-set version, indexed by event and tool."""
+
+    def __init__(self, rules: List[Rule], version: str = '',
+                 measured: Optional[Dict[str, List[Any]]] = None):
+        """
+        Args:
+            rules: Loaded rules (disabled ones are left out)
+            version: Rule-set version from load_rule_snapshot()
+            measured: Measured condition costs for ordering conditions
+                (see cost_model.save_measured_costs); estimates otherwise
+        """
+        self.version = version
+        # True if the load that returned this index found the rule files
+        # changed (see load_rule_index)
+        self.changed = False
+        # Rules without conditions never match; leave them out entirely
+        self._rules = [r for r in rules if r.enabled and r.conditions]
+        order_rules(self._rules, measured)
+        # Compiled once per version; the engine reuses them for every input
+        self._tools = [compile_rule(r).tools for r in self._rules]
+        # List files read by in_set/path_prefix/glob_match conditions. Their
+        # contents are part of the rule set, so they are part of its version
+        self.list_files = sorted({
+            path for r in self._rules for c in r.conditions
+            if c.operator in LIST_OPERATORS and (path := list_file(c.pattern))
+        })
+        self.lists_key = list_files_key(self.list_files)
+        # Relative list paths and path_prefix entries are resolved against it
+        self.list_base = list_base() if any(
+            c.operator in LIST_OPERATORS for r in self._rules for c in r.conditions) else None
+        if self.list_base is not None:
+            lists = repr((self.list_base, self.lists_key)).encode('utf-8', 'surrogateescape')
+            self.version = f"{version}:{hashlib.sha1(lists).hexdigest()[:8]}"
+        self._by_event: Dict[Optional[str], List[int]] = {}
+        self._buckets: Dict[Tuple[Optional[str], str], Tuple[List[Rule], FrozenSet[str]]] = {}
+
+    @property
+    def rules(self) -> List[Rule]:
+        """Every rule in the index (enabled, with conditions)."""
+        return self._rules
+
+    def rules_for(self, event: Optional[str], tool_name: str) -> List[Rule]:
+        """Rules that can apply to this event and tool, in rule-set order.
+
+        Same selection as load_rules(event) followed by the engine's tool
+        matcher check.
+        """
+        return self._bucket(event, tool_name)[0]
+
+    def rules_for_input(self, hook_name: str, input_data: Dict[str, Any]) -> List[Rule]:
+        """Rules the `hook_name` hook evaluates for this input."""
+        return self.rules_for(rule_event_for(hook_name, input_data),
+                              input_data.get('tool_name', ''))
+
+    def fields_for(self, event: Optional[str], tool_name: str) -> FrozenSet[str]:
+        """Condition fields read by rules_for(event, tool_name)."""
+        return self._bucket(event, tool_name)[1]
+
+    def _bucket(self, event: Optional[str], tool_name: str) -> Tuple[List[Rule], FrozenSet[str]]:
+        key = (event, tool_name)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rules = [self._rules[i] for i in self._event_rules(event)
+                     if self._tools[i] is None or tool_name in self._tools[i]]
+            fields = frozenset(c.field for r in rules for c in r.conditions)
+            bucket = self._buckets[key] = (rules, fields)
+        return bucket
+
+    def _event_rules(self, event: Optional[str]) -> List[int]:
+        indices = self._by_event.get(event)
+        if indices is None:
+            indices = self._by_event[event] = [
+                i for i, r in enumerate(self._rules)
+                if not event or r.event == 'all' or r.event == event
+            ]
+        return indices
+
+
+# rules_dir (None: the merged rule sources) -> (RuleIndex of the last loaded
+# version, its snapshot version, measured costs it used)
+_indexes: Dict[Optional[str], Tuple[RuleIndex, str, Any]] = {}
+
+
+def load_rule_index(rules_dir: Optional[str] = None) -> RuleIndex:
+    """Return the RuleIndex for the current rule files, rebuilding on change.
+
+    Args:
+        rules_dir: Load only this directory; by default, the rules merged
+            from every rule source of the current directory
+    """
+    snapshot = load_rule_snapshot(rules_dir)
+    # Measurements are kept per directory hooks run in, or next to rules_dir
+    costs_key, measured = load_measured_costs(
+        costs_path((os.path.dirname(rules_dir) or '.') if rules_dir else '.'))
+    entry = _indexes.get(rules_dir)
+    if (entry is None or entry[1] != snapshot['version'] or entry[2] != costs_key or
+            entry[0].lists_key != list_files_key(entry[0].list_files) or
+            entry[0].list_base not in (None, list_base())):
+        entry = _indexes[rules_dir] = (
+            RuleIndex(snapshot['rules'], snapshot['version'], measured),
+            snapshot['version'], costs_key)
+    # Set on every load: only the call that found the rule files changed sees True
+    entry[0].changed = snapshot['changed']
+    return entry[0]
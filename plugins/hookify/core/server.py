@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Resident evaluation server for hookify plugin.
+
+Keeps rules, compiled regexes and a RuleEngine warm in one long-lived
+process per project, listening on a Unix socket. The hook scripts forward
+their stdin to it and fall back to in-process evaluation when it is not
+running.
+
+Usage:
+    python3 server.py start|stop|status [--idle SECONDS]
+"""
+
+import os
+import sys
+import json
+import signal
+import socket
+import subprocess
+import time
+
+# Allow running as a script: make the "hookify" package importable
+PLUGIN_ROOT = os.environ.get('CLAUDE_PLUGIN_ROOT') or os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))
+parent_dir = os.path.dirname(PLUGIN_ROOT)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from hookify.utils.client import socket_path
+from hookify.utils.state import state_path
+
+# Exit after this many seconds without a request
+DEFAULT_IDLE_TIMEOUT = 1800
+MAX_REQUEST_BYTES = 256 * 1024 * 1024
+
+
+def pid_path(project_dir: str) -> str:
+    return state_path('server', project_dir, '.pid')
+
+
+def log_path(project_dir: str) -> str:
+    return state_path('server', project_dir, '.log')
+
+
+class HookifyServer:
+    """Serves hook evaluations for one project directory."""
+
+    def __init__(self, project_dir: str, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        from hookify.core.rule_engine import RuleEngine
+
+        self.project_dir = project_dir
+        self.idle_timeout = idle_timeout
+        self.engine = RuleEngine()
+        self.path = socket_path(project_dir)
+        self.sock = None
+        self.running = False
+
+    def serve_forever(self) -> None:
+        """Bind the socket and handle requests until idle or stopped."""
+        os.chdir(self.project_dir)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.path)
+        os.chmod(self.path, 0o600)
+        self.sock.listen(16)
+        self.sock.settimeout(self.idle_timeout)
+        self.running = True
+
+        try:
+            while self.running:
+                try:
+                    conn, _ = self.sock.accept()
+                except socket.timeout:
+                    break
+                except InterruptedError:
+                    continue
+                with conn:
+                    self._handle(conn)
+        finally:
+            self.sock.close()
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def stop(self, *_args) -> None:
+        """Signal handler: unwind serve_forever so the socket is removed."""
+        self.running = False
+        raise SystemExit(0)
+
+    def _handle(self, conn: socket.socket) -> None:
+        """Read one request, evaluate it and write the JSON reply."""
+        conn.settimeout(5.0)
+        chunks = []
+        size = 0
+        try:
+            while True:
+                chunk = conn.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                size += len(chunk)
+                if size > MAX_REQUEST_BYTES:
+                    return
+        except OSError:
+            return
+
+        request = b''.join(chunks).decode('utf-8', 'surrogateescape')
+        hook_name, project_dir, payload = (request.split('\n', 2) + ['', ''])[:3]
+        if os.path.realpath(project_dir) != os.path.realpath(self.project_dir):
+            # Not ours: closing without a reply makes the client fall back
+            return
+
+        try:
+            conn.sendall(json.dumps(self.evaluate(hook_name, payload)).encode('utf-8'))
+        except OSError:
+            pass
+
+    def evaluate(self, hook_name: str, payload: str) -> dict:
+        """Evaluate one hook payload the same way the hook scripts do."""
+        from hookify.core.hook_runner import run_hook
+        from hookify.utils.payload import parse_payload
+
+        try:
+            input_data = parse_payload(payload)
+            return run_hook(hook_name, input_data, engine=self.engine)
+        except Exception as e:
+            return {"systemMessage": f"Hookify error: {str(e)}"}
+
+
+def _read_pid(project_dir: str):
+    try:
+        with open(pid_path(project_dir)) as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+        return pid
+    except (OSError, ValueError):
+        return None
+
+
+def start(project_dir: str, idle_timeout: float) -> int:
+    """Start a detached server for project_dir (no-op if already running)."""
+    pid = _read_pid(project_dir)
+    if pid:
+        print(f"hookify server already running (pid {pid})")
+        return 0
+
+    with open(log_path(project_dir), 'ab') as log:
+        proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), 'run',
+             '--idle', str(idle_timeout), '--project-dir', project_dir],
+            cwd=project_dir, stdin=subprocess.DEVNULL, stdout=log, stderr=log,
+            start_new_session=True,
+        )
+
+    # Wait briefly for the socket so the next hook call already uses it
+    deadline = time.monotonic() + 3.0
+    while time.monotonic() < deadline and not os.path.exists(socket_path(project_dir)):
+        if proc.poll() is not None:
+            print(f"hookify server failed to start, see {log_path(project_dir)}", file=sys.stderr)
+            return 1
+        time.sleep(0.02)
+
+    print(f"hookify server started (pid {proc.pid}) on {socket_path(project_dir)}")
+    return 0
+
+
+def stop(project_dir: str) -> int:
+    pid = _read_pid(project_dir)
+    if not pid:
+        print("hookify server is not running")
+        return 0
+    os.kill(pid, signal.SIGTERM)
+    print(f"hookify server stopped (pid {pid})")
+    return 0
+
+
+def status(project_dir: str) -> int:
+    pid = _read_pid(project_dir)
+    if pid:
+        print(f"hookify server running (pid {pid}) on {socket_path(project_dir)}")
+    else:
+        print("hookify server is not running")
+    return 0
+
+
+def run(project_dir: str, idle_timeout: float) -> int:
+    """Run the server in the foreground."""
+    server = HookifyServer(project_dir, idle_timeout)
+    signal.signal(signal.SIGTERM, server.stop)
+    signal.signal(signal.SIGINT, server.stop)
+
+    with open(pid_path(project_dir), 'w') as f:
+        f.write(str(os.getpid()))
+    try:
+        server.serve_forever()
+    finally:
+        if _read_pid(project_dir) == os.getpid():
+            os.unlink(pid_path(project_dir))
+    return 0
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resident hookify evaluation server")
+    parser.add_argument('command', choices=['start', 'stop', 'status', 'run'])
+    parser.add_argument('--idle', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help="exit after this many idle seconds")
+    parser.add_argument('--project-dir', default=os.getcwd())
+    args = parser.parse_args(argv)
+
+    project_dir = os.path.realpath(args.project_dir)
+    if args.command == 'start':
+        return start(project_dir, args.idle)
+    if args.command == 'stop':
+        return stop(project_dir)
+    if args.command == 'status':
+        return status(project_dir)
+    return run(project_dir, args.idle)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
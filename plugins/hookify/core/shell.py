@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""Shell command parsing for hookify plugin.
+
+Splits a Bash tool command into simple commands ("segments") the way the
+shell would: on `;`, `&&`, `||`, `|`, `&`, newlines and subshell
+parentheses, with quotes, escapes, comments and here-documents handled.
+Commands inside `$(...)` and backticks become segments too. Each segment
+keeps its words (quotes removed) and its redirections.
+
+Rules read the result through the `command.*` fields (fields.COMMAND_FIELDS);
+a command is parsed once per input however many of them are used.
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import FrozenSet, List, Optional, Tuple
+
+# One token of shell input; tried in order at each position
+_TOKEN = re.compile(r'''
+    (?P<cont>\\\n)
+  | (?P<ws>[ \t\r]+)
+  | (?P<nl>\n)
+  | (?P<redir>(?:\d+|&)?(?:>>|>\||>&|>|<<<|<<-|<<|<&|<>|<))
+  | (?P<op>&&|\|\||;;|\|&|[;|&()])
+  | (?P<sq>\$?'[^']*'?)
+  | (?P<dq>"(?:[^"\\]|\\.)*"?)
+  | (?P<subst>\$\(|`)
+  | (?P<esc>\\.)
+  | (?P<word>[^\s;&|()<>'"`\\$]+|\$)
+''', re.VERBOSE | re.DOTALL)
+
+_DQ_ESCAPE = re.compile(r'\\([$`"\\\n])')
+_IDENT_ASSIGNMENT = re.compile(r'[A-Za-z_][A-Za-z0-9_]*\+?=')
+
+# Commands that run the command given as their arguments:
+# name -> (short options taking an argument, long options taking one,
+# operands before the command). Other options are taken to be flags.
+WRAPPERS = {
+    'sudo': ('CDghpRrTtUu', frozenset({'--chdir', '--close-from', '--command-timeout', '--group',
+                                       '--host', '--other-user', '--prompt', '--chroot',
+                                       '--role', '--type', '--user'}), 0),
+    'doas': ('Cu', frozenset(), 0),
+    'env': ('CSu', frozenset({'--chdir', '--split-string', '--unset'}), 0),
+    'nohup': ('', frozenset(), 0),
+    'time': ('fo', frozenset({'--format', '--output'}), 0),
+    'exec': ('a', frozenset(), 0),
+    'command': ('', frozenset(), 0),
+    'builtin': ('', frozenset(), 0),
+    'nice': ('n', frozenset({'--adjustment'}), 0),
+    'ionice': ('cnpPu', frozenset({'--class', '--classdata', '--pid', '--pgid', '--uid'}), 0),
+    'setsid': ('', frozenset(), 0),
+    'stdbuf': ('eio', frozenset({'--error', '--input', '--output'}), 0),
+    'timeout': ('ks', frozenset({'--kill-after', '--signal'}), 1),
+    'xargs': ('adEeILlnPs', frozenset({'--arg-file', '--delimiter', '--eof', '--max-args',
+                                       '--max-chars', '--max-lines', '--max-procs',
+                                       '--process-slot-var', '--replace'}), 0),
+}
+
+# $(...) nesting that is still parsed; deeper substitutions stay plain words
+MAX_SUBST_DEPTH = 8
+
+
+class Segment:
+    """One simple command: its words and its redirections."""
+
+    __slots__ = ('words', 'redirects')
+
+    def __init__(self):
+        self.words: List[str] = []
+        # (operator, target), e.g. ('>>', '/var/log/app.log')
+        self.redirects: List[Tuple[str, str]] = []
+
+    @property
+    def argv0(self) -> Optional[str]:
+        """Program name (basename), after variable assignments and wrappers."""
+        words = self.program_words()
+        return os.path.basename(words[0]) or words[0] if words else None
+
+    def program_words(self) -> List[str]:
+        """words from the program name on: `sudo -u root FOO=1 rm -rf x` -> rm -rf x."""
+        words = self.words
+        i = 0
+        while i < len(words):
+            word = words[i]
+            if _IDENT_ASSIGNMENT.match(word):
+                i += 1
+            elif word in WRAPPERS:
+                j = _skip_wrapper(words, i + 1, WRAPPERS[word])
+                if j >= len(words):
+                    # `sudo -l` runs no command: sudo is the program
+                    break
+                i = j
+            else:
+                break
+        return words[i:]
+
+
+def _skip_wrapper(words: List[str], i: int, spec: Tuple[str, FrozenSet[str], int]) -> int:
+    """Index of the first word after a wrapper's options and operands."""
+    short_args, long_args, operands = spec
+    while i < len(words):
+        word = words[i]
+        if word == '--':
+            i += 1
+            break
+        if word.startswith('--'):
+            # --user root, but not --user=root
+            i += 2 if word in long_args else 1
+        elif word.startswith('-') and len(word) > 1:
+            # Includes `nice -10`
+            i += 1
+            for j, c in enumerate(word[1:], 2):
+                if c in short_args:
+                    # -u root, but not -uroot
+                    if j == len(word):
+                        i += 1
+                    break
+        else:
+            break
+    return min(i + operands, len(words))
+
+
+class ParsedCommand:
+    """A command line split into segments."""
+
+    __slots__ = ('segments',)
+
+    def __init__(self, segments: List[Segment]):
+        self.segments = segments
+
+    def field(self, name: str) -> Optional[str]:
+        """Text of a command.* field, one value per line."""
+        if name == 'command.segments':
+            lines = [' '.join(s.words) for s in self.segments if s.words]
+        elif name == 'command.argv0':
+            lines = [s.argv0 for s in self.segments if s.argv0]
+        elif name == 'command.args':
+            lines = [' '.join(s.program_words()[1:]) for s in self.segments if s.argv0]
+        elif name == 'command.flags':
+            lines = [flag for s in self.segments for flag in _flags(s.program_words()[1:])]
+        elif name == 'command.redirects':
+            lines = [f'{op} {target}' for s in self.segments for op, target in s.redirects]
+        else:
+            return None
+        # A newline inside a quoted word would split one value in two
+        return '\n'.join(line.replace('\n', ' ') for line in lines)
+
+
+def _flags(args: List[str]) -> List[str]:
+    """Flags in args: `--long` without its =value, `-rf` also as -r and -f."""
+    flags = []
+    for arg in args:
+        if arg == '--':
+            break
+        if arg.startswith('--') and len(arg) > 2:
+            flags.append(arg.split('=', 1)[0])
+        elif arg.startswith('-') and len(arg) > 1 and not arg[1].isdigit():
+            flags.append(arg)
+            if len(arg) > 2:
+                flags.extend(f'-{c}' for c in arg[1:])
+    return flags
+
+
+@lru_cache(maxsize=32)
+def parse_command(command: str) -> ParsedCommand:
+    """Parse a command line (cached, so all command.* fields share one parse)."""
+    segments: List[Segment] = []
+    _parse(command, segments, 0)
+    return ParsedCommand([s for s in segments if s.words or s.redirects])
+
+
+def _parse(text: str, segments: List[Segment], depth: int) -> None:
+    segment = Segment()
+    segments.append(segment)
+    word: Optional[List[str]] = None
+    # Redirection operator waiting for its target word
+    pending_redirect: Optional[str] = None
+    # Here-document delimiters whose bodies start after the next newline
+    heredocs: List[Tuple[str, bool]] = []
+
+    def end_word():
+        nonlocal word, pending_redirect
+        if word is None:
+            return
+        text_ = ''.join(word)
+        word = None
+        if pending_redirect is not None:
+            op, pending_redirect = pending_redirect, None
+            if op.lstrip('0123456789&') in ('<<', '<<-'):
+                heredocs.append((text_, op.endswith('-')))
+            elif not (op.endswith('&') and (text_.isdigit() or text_ == '-')):
+                # 2>&1 and friends duplicate descriptors; no file involved
+                segment.redirects.append((op, text_))
+        else:
+            segment.words.append(text_)
+
+    pos, n = 0, len(text)
+    while pos < n:
+        m = _TOKEN.match(text, pos)
+        kind = m.lastgroup
+        token = m.group()
+        pos = m.end()
+
+        if kind == 'cont':
+            # Line continuation: removed, the word goes on
+            continue
+        if kind == 'word':
+            if token.startswith('#') and word is None:
+                # Comment to end of line
+                end = text.find('\n', pos)
+                pos = n if end == -1 else end
+                continue
+            part = token
+        elif kind == 'sq':
+            body = token[2:] if token.startswith('$') else token[1:]
+            part = body[:-1] if body.endswith("'") else body
+        elif kind == 'dq':
+            body = token[1:-1] if len(token) > 1 and token.endswith('"') else token[1:]
+            part = _DQ_ESCAPE.sub(r'\1', body)
+            if depth < MAX_SUBST_DEPTH:
+                for inner in _dq_substitutions(body):
+                    _parse(inner, segments, depth + 1)
+        elif kind == 'esc':
+            part = token[1]
+        elif kind == 'subst':
+            end = _subst_end(text, pos, token)
+            part = text[pos - len(token):end + 1]
+            if depth < MAX_SUBST_DEPTH:
+                _parse(text[pos:end], segments, depth + 1)
+            pos = min(end + 1, n)
+        elif kind == 'redir':
+            end_word()
+            pending_redirect = token
+            continue
+        else:
+            # Whitespace, newline or control operator
+            end_word()
+            if kind == 'ws':
+                continue
+            if kind == 'nl' and heredocs:
+                pos = _skip_heredocs(text, pos, heredocs)
+                heredocs = []
+            segment = Segment()
+            segments.append(segment)
+            continue
+        if word is None:
+            word = []
+        word.append(part)
+    end_word()
+
+
+def _subst_end(text: str, pos: int, opener: str) -> int:
+    """Index of the character closing a $( or ` substitution opened before pos."""
+    if opener == '`':
+        i = pos
+        while i < len(text):
+            if text[i] == '\\':
+                i += 2
+                continue
+            if text[i] == '`':
+                return i
+            i += 1
+        return len(text)
+
+    depth = 1
+    i = pos
+    while i < len(text):
+        c = text[i]
+        if c == '\\':
+            i += 2
+            continue
+        if c == "'":
+            close = text.find("'", i + 1)
+            i = len(text) if close == -1 else close + 1
+            continue
+        if c == '"':
+            m = _TOKEN.match(text, i)
+            i = m.end()
+            continue
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return len(text)
+
+
+def _dq_substitutions(body: str) -> List[str]:
+    """Commands of $(...) and `...` substitutions inside a double-quoted string."""
+    inner = []
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == '\\':
+            i += 2
+            continue
+        if body.startswith('$(', i) or c == '`':
+            opener = '$(' if c == '$' else '`'
+            start = i + len(opener)
+            end = _subst_end(body, start, opener)
+            inner.append(body[start:end])
+            i = end + 1
+            continue
+        i += 1
+    return inner
+
+
+def _skip_heredocs(text: str, pos: int, heredocs: List[Tuple[str, bool]]) -> int:
+    """Position after the bodies of the pending here-documents."""
+    for delimiter, strip_tabs in heredocs:
+        tabs = r'\t*' if strip_tabs else ''
+        m = re.compile(rf'^{tabs}{re.escape(delimiter)}[ \t]*$', re.MULTILINE).search(text, pos)
+        if m is None:
+            return len(text)
+        pos = m.end() + 1
+    return pos
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""Bounded-memory transcript matching for hookify plugin.
+
+Transcripts of long sessions reach hundreds of MB, so `transcript`
+conditions are evaluated against the file instead of a string holding all
+of it: substring checks run on overlapping byte chunks, regexes on
+overlapping decoded chunks. Both stop at the first hit.
+
+Transcripts only grow during a session, so `contains`, `not_contains` and
+end-insensitive `regex_match` results can be checkpointed per session:
+later hook calls scan only the bytes appended since the last scan.
+
+The `transcript.last_*` fields (TAIL_FIELDS) only need the end of the
+session: the file is read backwards in blocks from EOF and only the lines
+needed are parsed, so they cost the same at any transcript length.
+"""
+
+import codecs
+import json
+import os
+import re
+import sys
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Bytes read per chunk
+CHUNK_SIZE = 1 << 20
+# Characters carried over between regex chunks; matches spanning a chunk
+# boundary are found as long as they are shorter than this
+REGEX_OVERLAP = 64 * 1024
+# Right-hand context needed before trusting a match near a chunk's end
+# (for `$`, `\b` and lookaheads)
+REGEX_LOOKAHEAD = 1024
+
+# Regex constructs whose result can flip from match to no match when text
+# is appended (end anchors, word boundaries, negative lookahead)
+_END_SENSITIVE = re.compile(r'\$|\\[ZbB]|\(\?!')
+
+_CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+# Fields computed from the end of the transcript (see transcript_tail)
+TAIL_FIELDS = frozenset({'transcript.last_assistant', 'transcript.last_n_messages',
+                         'transcript.last_tool_calls'})
+# Bytes read per block when reading backwards
+TAIL_BLOCK_SIZE = 64 * 1024
+# Most bytes read back from EOF for one field; older entries are ignored
+MAX_TAIL_BYTES = 8 * 1024 * 1024
+# Messages in transcript.last_n_messages
+TAIL_MESSAGES = 10
+# Most tool calls in transcript.last_tool_calls
+TAIL_TOOL_CALLS = 50
+
+
+class TranscriptScanner:
+    """Evaluates conditions against a transcript file with bounded memory."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def check(self, operator: str, pattern: str,
+              checkpoint: Optional['TranscriptCheckpoint'] = None) -> bool:
+        """Return whether the transcript satisfies `operator` with `pattern`.
+
+        Same result as applying the operator to the whole file's text; an
+        unreadable file is treated as empty, as before. With a checkpoint,
+        monotonic conditions resume where the previous scan stopped.
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                return self._check_file(f, operator, pattern, checkpoint)
+        except FileNotFoundError:
+            print(f"Warning: Transcript file not found: {self.path}", file=sys.stderr)
+        except PermissionError:
+            print(f"Warning: Permission denied reading transcript: {self.path}", file=sys.stderr)
+        except UnicodeDecodeError as e:
+            print(f"Warning: Encoding error in transcript {self.path}: {e}", file=sys.stderr)
+        except (IOError, OSError) as e:
+            print(f"Warning: Error reading transcript {self.path}: {e}", file=sys.stderr)
+        return check_text(operator, pattern, '')
+
+    def _check_file(self, f, operator: str, pattern: str,
+                    checkpoint: Optional['TranscriptCheckpoint']) -> bool:
+        st = os.fstat(f.fileno())
+        size = st.st_size
+        needle = pattern.encode('utf-8')
+
+        if operator in ('contains', 'not_contains', 'regex_match'):
+            key = checkpoint_key(operator, pattern) if checkpoint is not None else None
+            start = 0
+            found = None
+            if key:
+                checkpoint.validate(st)
+                found, start = checkpoint.get(key)
+
+            if not found:
+                if operator == 'regex_match':
+                    found, end = self._search(f, pattern, start)
+                else:
+                    found, end = self._find(f, size, needle, start)
+                if found is None:
+                    # Invalid regex
+                    return False
+                if key:
+                    checkpoint.record(key, end, found)
+
+            return not found if operator == 'not_contains' else found
+        if operator == 'equals':
+            return size == len(needle) and f.read(len(needle)) == needle
+        if operator == 'starts_with':
+            return f.read(len(needle)) == needle
+        if operator == 'ends_with':
+            if size < len(needle):
+                return False
+            f.seek(size - len(needle))
+            return f.read() == needle
+        # Unknown operator
+        return False
+
+    def _find(self, f, size: int, needle: bytes, start: int = 0) -> Tuple[bool, int]:
+        """Substring search over raw byte chunks from byte offset start.
+
+        UTF-8 is self-synchronizing, so a byte match is a text match. Chunks
+        overlap by len(needle) - 1 bytes so no occurrence is split.
+
+        Returns (found, offset scanned up to).
+        """
+        if not needle:
+            return True, start
+        if size < len(needle):
+            return False, start
+        f.seek(max(0, start - (len(needle) - 1)))
+        carry = b''
+        while True:
+            data = f.read(CHUNK_SIZE)
+            if not data:
+                return False, f.tell()
+            window = carry + data
+            if window.find(needle) != -1:
+                return True, f.tell()
+            carry = window[-(len(needle) - 1):] if len(needle) > 1 else b''
+
+    def _search(self, f, pattern: str, start: int = 0) -> Tuple[Optional[bool], int]:
+        """Regex search over overlapping decoded chunks from byte offset start.
+
+        Stops at the first hit. Returns (found, offset scanned up to), with
+        found None for an invalid pattern.
+        """
+        try:
+            regex = re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            print(f"Invalid regex pattern '{pattern}': {e}", file=sys.stderr)
+            return None, start
+
+        # Resume a little before start so matches straddling it are seen
+        resume = max(0, start - REGEX_OVERLAP)
+        f.seek(resume)
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        tail = ''
+        # Whether tail still begins at the start of the file
+        at_start = resume == 0
+        # Resuming mid-file may land inside a character
+        align = resume > 0
+        while True:
+            data = f.read(CHUNK_SIZE)
+            if align and data:
+                # Skip to a character boundary (drop UTF-8 continuation bytes)
+                data = data.lstrip(_CONTINUATION_BYTES)
+                if not data:
+                    continue
+                align = False
+            final = not data
+            text = decoder.decode(data, final=final)
+            if not text and not final:
+                continue
+
+            window = tail + text
+            # Once the window no longer begins at the start of the file, its
+            # first char only provides look-behind context (so `^` and `\A`
+            # can't match there)
+            start_index = 0 if at_start else 1
+            m = regex.search(window, start_index)
+            if m:
+                if final or m.end() <= len(window) - REGEX_LOOKAHEAD:
+                    return True, f.tell()
+                if m.start() < len(window) - REGEX_OVERLAP:
+                    # Too long to be re-found in the next window
+                    return True, f.tell()
+                # Otherwise it is re-checked with more right-hand context
+
+            if final:
+                return False, f.tell()
+            at_start = at_start and len(window) <= REGEX_OVERLAP + 1
+            tail = window[-(REGEX_OVERLAP + 1):]
+
+
+def checkpoint_key(operator: str, pattern: str) -> Optional[str]:
+    """Checkpoint key for a monotonic condition, or None.
+
+    contains and not_contains share a key: both only need to know whether
+    the pattern occurs.
+    """
+    if operator in ('contains', 'not_contains'):
+        return 'contains\0' + pattern
+    if operator == 'regex_match' and not _END_SENSITIVE.search(pattern):
+        return 'regex_match\0' + pattern
+    return None
+
+
+class TranscriptCheckpoint:
+    """How far each transcript condition has been scanned in one session.
+
+    Stored in the hookify state directory, keyed by session_id and
+    transcript path. Each condition has its own offset, because a rule's
+    later conditions are skipped when an earlier one fails. Patterns that
+    matched stay matched.
+    """
+
+    def __init__(self, session_id: str, transcript_path: str):
+        from hookify.utils.state import session_state_path
+
+        self.file = session_state_path('transcript', session_id, transcript_path)
+        self.dirty = False
+        self.data: Dict[str, Any] = {'ino': None, 'conditions': {}}
+        try:
+            with open(self.file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict) and isinstance(data.get('conditions'), dict):
+                self.data = data
+        except (OSError, ValueError):
+            pass
+
+    def validate(self, st: os.stat_result) -> None:
+        """Drop all offsets if the transcript was replaced or truncated."""
+        conditions = self.data['conditions']
+        replaced = self.data.get('ino') not in (None, st.st_ino)
+        truncated = any(offset > st.st_size for offset, _ in conditions.values())
+        if replaced or truncated:
+            self.data = {'ino': st.st_ino, 'conditions': {}}
+            self.dirty = True
+        elif self.data.get('ino') is None:
+            self.data['ino'] = st.st_ino
+            self.dirty = True
+
+    def get(self, key: str) -> Tuple[bool, int]:
+        """Return (matched, offset scanned up to) for a condition key."""
+        offset, found = self.data['conditions'].get(key, (0, False))
+        return found, offset
+
+    def record(self, key: str, offset: int, found: bool) -> None:
+        self.data['conditions'][key] = (offset, found)
+        self.dirty = True
+
+    def save(self) -> None:
+        """Write the checkpoint if it changed. Failures are not fatal."""
+        if not self.dirty:
+            return
+        tmp_path = f"{self.file}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.file)
+            self.dirty = False
+        except OSError as e:
+            print(f"Warning: Could not write transcript checkpoint {self.file}: {e}", file=sys.stderr)
+
+
+def check_text(operator: str, pattern: str, text: str) -> bool:
+    """Apply an operator to an in-memory string (used for unreadable files)."""
+    if operator == 'regex_match':
+        try:
+            return bool(re.search(pattern, text, re.IGNORECASE))
+        except re.error:
+            return False
+    if operator == 'contains':
+        return pattern in text
+    if operator == 'equals':
+        return pattern == text
+    if operator == 'not_contains':
+        return pattern not in text
+    if operator == 'starts_with':
+        return text.startswith(pattern)
+    if operator == 'ends_with':
+        return text.endswith(pattern)
+    return False
+
+
+def transcript_path_for(input_data: Optional[dict]) -> Optional[str]:
+    """Return the transcript path a `transcript` condition should read."""
+    if not input_data:
+        return None
+    return input_data.get('transcript_path') or None
+
+
+def reverse_lines(f, size: int, block_size: int = TAIL_BLOCK_SIZE,
+                  limit: int = MAX_TAIL_BYTES) -> Iterator[bytes]:
+    """Non-blank lines of a binary file, last first, read in blocks from EOF.
+
+    Stops after `limit` bytes; a line that begins before that is not
+    returned.
+    """
+    pos = size
+    # Pieces of the line being assembled, last piece first
+    partial: List[bytes] = []
+    while pos > 0 and size - pos < limit:
+        n = min(block_size, pos)
+        pos -= n
+        f.seek(pos)
+        data = f.read(n)
+        end = len(data)
+        i = data.rfind(b'\n', 0, end)
+        while i != -1:
+            line = data[i + 1:end]
+            if partial:
+                partial.append(line)
+                line = b''.join(reversed(partial))
+                partial = []
+            if line.strip():
+                yield line
+            end = i
+            i = data.rfind(b'\n', 0, end)
+        partial.append(data[:end])
+    if pos == 0:
+        line = b''.join(reversed(partial))
+        if line.strip():
+            yield line
+
+
+def transcript_tail(path: str, field: str) -> str:
+    """Value of a TAIL_FIELDS field for the transcript at path.
+
+    Memoized per file size and mtime, so rules sharing a field (and the
+    resident server's repeated Stop calls) read the file once.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        print(f"Warning: Transcript file not found: {path}", file=sys.stderr)
+        return ''
+    except OSError as e:
+        print(f"Warning: Error reading transcript {path}: {e}", file=sys.stderr)
+        return ''
+    return _tail_value(path, field, st.st_size, st.st_mtime_ns)
+
+
+@lru_cache(maxsize=16)
+def _tail_value(path: str, field: str, size: int, mtime_ns: int) -> str:
+    try:
+        with open(path, 'rb') as f:
+            entries = _entries(reverse_lines(f, size))
+            if field == 'transcript.last_assistant':
+                return _last_assistant(entries)
+            if field == 'transcript.last_n_messages':
+                return _last_messages(entries, TAIL_MESSAGES)
+            if field == 'transcript.last_tool_calls':
+                return _last_tool_calls(entries, TAIL_TOOL_CALLS)
+    except (IOError, OSError) as e:
+        print(f"Warning: Error reading transcript {path}: {e}", file=sys.stderr)
+    return ''
+
+
+def _entries(lines: Iterator[bytes]) -> Iterator[Tuple[str, Any, List[Any]]]:
+    """(type, message id, content blocks) of user/assistant entries, last first."""
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(entry, dict) or entry.get('type') not in ('user', 'assistant'):
+            continue
+        message = entry.get('message')
+        if not isinstance(message, dict):
+            continue
+        content = message.get('content')
+        if isinstance(content, str):
+            content = [{'type': 'text', 'text': content}]
+        elif not isinstance(content, list):
+            continue
+        yield entry['type'], message.get('id'), [b for b in content if isinstance(b, dict)]
+
+
+def _text(blocks: List[Any]) -> str:
+    return '\n'.join(b['text'] for b in blocks
+                     if b.get('type') == 'text' and isinstance(b.get('text'), str))
+
+
+def _last_assistant(entries) -> str:
+    """Text of the last assistant message with any text in it.
+
+    Claude Code writes each content block of a message as its own entry;
+    the text blocks of that message are joined.
+    """
+    texts: List[str] = []
+    message_id = None
+    for kind, entry_id, blocks in entries:
+        if texts:
+            if kind != 'assistant' or entry_id is None or entry_id != message_id:
+                break
+        elif kind != 'assistant':
+            continue
+        text = _text(blocks)
+        if text:
+            texts.append(text)
+            message_id = entry_id
+    return '\n'.join(reversed(texts))
+
+
+def _last_messages(entries, count: int) -> str:
+    """The last `count` user and assistant messages with text, oldest first.
+
+    One "role: text" paragraph per message; tool calls and results are left out.
+    """
+    messages: List[List[Any]] = []
+    for kind, entry_id, blocks in entries:
+        text = _text(blocks)
+        if not text:
+            continue
+        if messages and entry_id is not None and messages[-1][:2] == [kind, entry_id]:
+            messages[-1][2].append(text)
+            continue
+        if len(messages) == count:
+            break
+        messages.append([kind, entry_id, [text]])
+    return '\n'.join(f"{kind}: " + '\n'.join(reversed(texts))
+                     for kind, _, texts in reversed(messages))
+
+
+def _last_tool_calls(entries, limit: int) -> str:
+    """Tool calls since the last user prompt, oldest first, one per line."""
+    calls: List[str] = []
+    for kind, _, blocks in entries:
+        if kind == 'user':
+            if any(b.get('type') == 'text' for b in blocks):
+                # A prompt (tool results come back as user entries too)
+                break
+            continue
+        for block in reversed(blocks):
+            if block.get('type') == 'tool_use':
+                calls.append(_describe_call(block))
+        if len(calls) >= limit:
+            break
+    return '\n'.join(reversed(calls[:limit]))
+
+
+def _describe_call(block: Dict[str, Any]) -> str:
+    """`Name: detail` for a tool_use block, on one line."""
+    tool_input = block.get('input')
+    detail = ''
+    if isinstance(tool_input, dict):
+        detail = tool_input.get('command') or tool_input.get('file_path')
+        if not isinstance(detail, str) or not detail:
+            detail = json.dumps(tool_input, ensure_ascii=False, sort_keys=True)
+    return f"{block.get('name', '')}: {detail}".replace('\n', ' ')
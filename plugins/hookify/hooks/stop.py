@@ -8,6 +8,7 @@ It reads .claude/hookify.*.local.md files and evaluates stop rules.
 import os
 import sys
 import json
+import time
 
 # CRITICAL: Add plugin root to Python path for imports
 PLUGIN_ROOT = os.environ.get('CLAUDE_PLUGIN_ROOT')
@@ -19,26 +20,45 @@ if PLUGIN_ROOT:
         sys.path.insert(0, PLUGIN_ROOT)
 
 try:
-    from hookify.core.config_loader import load_rules
-    from hookify.core.rule_engine import RuleEngine
+    from hookify.utils.manifest import rules_may_apply
 except ImportError as e:
     error_msg = {"systemMessage": f"Hookify import error: {e}"}
     print(json.dumps(error_msg), file=sys.stdout)
     sys.exit(0)
 
 
+def evaluate_in_process(payload, started=None):
+    """Evaluate rules in this process (no server running)."""
+    try:
+        from hookify.core.hook_runner import run_hook
+        from hookify.utils.payload import parse_payload
+    except ImportError as e:
+        return {"systemMessage": f"Hookify import error: {e}"}
+
+    input_data = parse_payload(payload)
+    return run_hook('Stop', input_data, started=started)
+
+
 def main():
     """Main entry point for Stop hook."""
+    started = time.time()
     try:
         # Read input from stdin
-        input_data = json.load(sys.stdin)
+        payload = sys.stdin.read()
+
+        # Calls no enabled rule applies to end here, before anything else is imported
+        if not rules_may_apply('Stop', payload):
+            print(json.dumps({}), file=sys.stdout)
+            return
 
-        # Load stop rules
-        rules = load_rules(event='stop')
+        # Prefer the resident server (rules and regexes already warm)
+        from hookify.utils.client import forward
+        reply = forward('Stop', payload)
+        if reply is not None:
+            print(reply, file=sys.stdout)
+            return
 
-        # Evaluate rules
-        engine = RuleEngine()
-        result = engine.evaluate_rules(rules, input_data)
+        result = evaluate_in_process(payload, started)
 
         # Always output JSON (even if empty)
         print(json.dumps(result), file=sys.stdout)
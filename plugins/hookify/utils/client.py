@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Thin client for the resident hookify server.
+
+Kept free of hookify.core imports so a hook script that reaches a running
+server never pays for loading the rule engine.
+"""
+
+import os
+import socket
+from typing import Optional
+
+from hookify.utils.state import state_path
+
+# Hooks time out after 10s; leave room for the in-process fallback
+CONNECT_TIMEOUT = 0.2
+REPLY_TIMEOUT = 4.0
+
+
+def socket_path(project_dir: str) -> str:
+    """Return the server socket path for a project directory."""
+    return state_path('server', project_dir, '.sock')
+
+
+def forward(hook_name: str, payload: str, project_dir: Optional[str] = None) -> Optional[str]:
+    """Send a hook payload to the server and return its JSON reply.
+
+    Returns None when no server is running or it fails to answer, in which
+    case the caller evaluates the rules in-process.
+    """
+    if not hasattr(socket, 'AF_UNIX') or os.environ.get('HOOKIFY_NO_SERVER'):
+        return None
+
+    project_dir = project_dir or os.getcwd()
+    path = socket_path(project_dir)
+    if not os.path.exists(path):
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(path)
+        sock.settimeout(REPLY_TIMEOUT)
+
+        request = f"{hook_name}\n{project_dir}\n{payload}"
+        sock.sendall(request.encode('utf-8', 'surrogateescape'))
+        sock.shutdown(socket.SHUT_WR)
+
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    except OSError:
+        # Stale socket, server exiting, or timeout - fall back to in-process
+        return None
+    finally:
+        sock.close()
+
+    reply = b''.join(chunks).decode('utf-8', 'replace')
+    return reply or None
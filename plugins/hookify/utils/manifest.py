@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Rule manifest for hookify plugin.
+
+A few hundred bytes in the state directory recording which rule events and
+tools the enabled rules apply to, plus the fingerprints of the rule
+directories and files it was built from (every source of
+config_loader.rule_sources, including ones that don't exist yet). The
+loader rewrites it whenever the rule files change.
+Hook scripts read it with only os and json loaded (not even typing), and
+a call that no rule applies to ends there, before the rule engine is
+imported. Tool calls outside the tools `/hookify:matchers write` recorded
+for the project (see core/matchers.py) end even before the manifest is read.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterable
+
+from hookify.utils.payload import parse_payload
+from hookify.utils.state import state_path
+
+# Bump when the manifest layout or the event mapping below changes
+MANIFEST_FORMAT = 2
+
+# Directory of user-global rules, shared by every project ('' turns them off)
+USER_RULES_ENV = 'HOOKIFY_USER_RULES_DIR'
+
+
+def source_settings() -> list[str]:
+    """Environment that decides which directories rules are loaded from.
+
+    [CLAUDE_PROJECT_DIR or '', user rules directory or '']. Kept here rather
+    than in config_loader so the manifest can be checked against it.
+    """
+    user_dir = os.environ.get(USER_RULES_ENV)
+    if user_dir is None:
+        user_dir = os.path.join(os.path.expanduser('~'), '.claude')
+    return [os.environ.get('CLAUDE_PROJECT_DIR', ''), user_dir]
+
+
+def rule_event(hook_name: str, tool_name: str) -> str | None:
+    """Return the rule event ("bash", "file", "stop", "prompt") for a hook call.
+
+    None means no event filter: every enabled rule is considered.
+    """
+    if hook_name == 'Stop':
+        return 'stop'
+    if hook_name == 'UserPromptSubmit':
+        return 'prompt'
+
+    # PreToolUse / PostToolUse: use tool_name to determine "bash" vs "file" event
+    if tool_name == 'Bash':
+        return 'bash'
+    if tool_name in ['Edit', 'Write', 'MultiEdit']:
+        return 'file'
+    return None
+
+
+def manifest_path(start_dir: str) -> str:
+    return state_path('manifest', start_dir)
+
+
+def matchers_path(start_dir: str) -> str:
+    """State file with the tools start_dir's tool hooks are narrowed to."""
+    return state_path('matchers', start_dir)
+
+
+def write_manifest(start_dir: str, settings: list[str], dirs: dict[str, int | None],
+                   files: dict[str, list[int]], rules: Iterable) -> None:
+    """Record what the rules loaded for start_dir apply to. Failures are not fatal.
+
+    Args:
+        start_dir: Directory the rule sources were found from
+        settings: source_settings() they were found with
+        dirs: Rule directory -> its st_mtime_ns when it was listed, or None
+            if it didn't exist
+        files: Path -> [mtime_ns, size, inode] of every rule file in them,
+            including ones that failed to parse
+        rules: The merged rules loaded from those files
+    """
+    targets = set()
+    for rule in rules:
+        # Same selection as RuleIndex: disabled and condition-less rules never apply
+        if not rule.enabled or not rule.conditions:
+            continue
+        matcher = rule.tool_matcher
+        tools = None if not matcher or matcher == '*' else tuple(sorted(set(matcher.split('|'))))
+        targets.add((rule.event, tools))
+
+    manifest = {
+        'format': MANIFEST_FORMAT,
+        'settings': settings,
+        'dirs': dirs,
+        'files': files,
+        'rules': sorted(([event, list(tools) if tools else None] for event, tools in targets),
+                        key=lambda t: (t[0], t[1] or [])),
+    }
+    path = manifest_path(start_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(manifest, separators=(',', ':')))
+        os.replace(tmp_path, path)
+    except OSError:
+        # Without a manifest every hook call takes the full path
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def rules_may_apply(hook_name: str, payload: str, start_dir: str = '.') -> bool:
+    """False only when it is certain that no enabled rule applies to this call.
+
+    Costs one stat per rule source directory (existing or not) and rule
+    file; the project root is not searched for again. A tool hook call for
+    a tool the project's recorded matchers leave out costs one open.
+
+    Args:
+        hook_name: Claude Code hook event ("PreToolUse", "Stop", ...)
+        payload: The hook's stdin (JSON)
+        start_dir: Directory rule sources are found from
+    """
+    try:
+        # Only the routing keys are read: tool_input is never decoded here
+        tool_name = parse_payload(payload).get('tool_name', '')
+        if hook_name in ('PreToolUse', 'PostToolUse') and not _tool_recorded(tool_name, start_dir):
+            return False
+        with open(manifest_path(start_dir), 'r', encoding='utf-8') as f:
+            manifest = json.loads(f.read())
+        if manifest.get('format') != MANIFEST_FORMAT or manifest.get('settings') != source_settings():
+            return True
+        for rules_dir, dir_mtime in manifest['dirs'].items():
+            try:
+                current = os.stat(rules_dir).st_mtime_ns
+            except OSError:
+                current = None
+            if current != dir_mtime:
+                return True
+        for path, fingerprint in manifest['files'].items():
+            st = os.stat(path)
+            if [st.st_mtime_ns, st.st_size, st.st_ino] != fingerprint:
+                return True
+        event = rule_event(hook_name, tool_name)
+        for rule_event_name, tools in manifest['rules']:
+            if event and rule_event_name != 'all' and rule_event_name != event:
+                continue
+            if tools is None or tool_name in tools:
+                return True
+        return False
+    except (OSError, ValueError, KeyError, AttributeError, TypeError):
+        # Missing or stale manifest, or a payload the full path should report
+        return True
+
+
+def _tool_recorded(tool_name: str, start_dir: str) -> bool:
+    """False if start_dir's recorded matchers leave tool_name out."""
+    try:
+        with open(matchers_path(start_dir), 'r', encoding='utf-8') as f:
+            tools = json.loads(f.read())['tools']
+    except (OSError, ValueError, KeyError, TypeError):
+        # Never narrowed (or unreadable): every tool
+        return True
+    return tool_name in tools
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Lazy hook input decoding for hookify plugin.
+
+Hook input is one JSON object, and most of it is usually tool_input: the
+whole file of a Write, every edit of a MultiEdit. A hook call mostly reads
+tool_name and a field or two of it. parse_payload() returns a read-only
+mapping over the raw text instead of decoding it into dicts. The first
+lookup in an object records where each of its members' values starts: a
+key given twice resolves to its last value, like json.loads and
+JSON.parse. Strings are decoded as they are stepped over (json's C
+scanner is the fastest way past them) and short ones are kept; nested
+objects become lazy mappings in the same pass. Arrays, numbers and the like are only decoded
+when read, in place: json's scanner takes a start offset, so no slice of
+the payload is copied. A rule reading `file_path` never builds the edit
+list of a MultiEdit, and nothing is turned into dicts that no rule reads.
+
+Stdlib only, so the hook scripts can use it before the rule engine is
+imported.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterator, Mapping
+from json.decoder import WHITESPACE, scanstring
+
+_DECODER = json.JSONDecoder()
+
+# Characters that matter when stepping over an object or array
+_STRUCTURE = re.compile(r'["{}\[\]]')
+
+# End of a number, true, false or null
+_SCALAR_END = re.compile(r'[\s,}\]]')
+
+_UNSET = object()
+
+# Strings stepped over are kept up to this many characters of JSON text;
+# longer ones (tool output, file contents) are decoded again if read, so
+# they can be streamed (see core/response.py) instead of held in memory
+_KEEP_STRING_CHARS = 1 << 16
+
+# Escaped quotes _string_end steps over with str.find before handing over
+# to scanstring
+_FIND_QUOTES = 256
+
+
+def parse_payload(text: str):
+    """Decode hook input lazily (a LazyObject), or fully if it isn't an object."""
+    start = WHITESPACE.match(text, 0).end()
+    if not text.startswith('{', start):
+        return json.loads(text)
+    return LazyObject(text, start)
+
+
+class LazyObject(Mapping):
+    """Read-only mapping over a JSON object inside a JSON text.
+
+    Members are recorded on first access, all of them, so that a key given
+    twice resolves to its last value, as json.loads does. Malformed JSON
+    raises json.JSONDecodeError then, not up front.
+    """
+
+    __slots__ = ('_text', '_start', '_end', '_spans', '_values')
+
+    def __init__(self, text: str, start: int):
+        """
+        Args:
+            text: JSON text
+            start: Offset of the object's opening "{"
+        """
+        self._text = text
+        self._start = start
+        # Offset just past the closing "}", once scanned
+        self._end: int | None = None
+        # key -> offset of its (last) value
+        self._spans: dict[str, int] = {}
+        self._values: dict[str, object] = {}
+
+    def _scan(self) -> None:
+        """Record every member: key -> value offset, keeping strings and objects."""
+        if self._end is not None:
+            return
+        text = self._text
+        pos = WHITESPACE.match(text, self._start + 1).end()
+        if text.startswith('}', pos):
+            self._end = pos + 1
+            return
+        spans, values = self._spans, self._values
+        while True:
+            if not text.startswith('"', pos):
+                raise json.JSONDecodeError(
+                    "Expecting property name enclosed in double quotes", text, pos)
+            key, pos = scanstring(text, pos + 1)
+            pos = WHITESPACE.match(text, pos).end()
+            if not text.startswith(':', pos):
+                raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+            pos = WHITESPACE.match(text, pos + 1).end()
+            # A later duplicate replaces the earlier value
+            spans[key] = pos
+            values.pop(key, None)
+            if text.startswith('"', pos):
+                end = _string_end(text, pos)
+                if end - pos <= _KEEP_STRING_CHARS:
+                    # Short strings are decoded now; it's cheap
+                    values[key] = scanstring(text, pos + 1)[0]
+            elif text.startswith('{', pos):
+                child = LazyObject(text, pos)
+                child._scan()
+                values[key], end = child, child._end
+            else:
+                end = _skip(text, pos)
+            pos = WHITESPACE.match(text, end).end()
+            if text.startswith(',', pos):
+                pos = WHITESPACE.match(text, pos + 1).end()
+            elif text.startswith('}', pos):
+                self._end = pos + 1
+                return
+            else:
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+
+    def __getitem__(self, key: str):
+        value = self._values.get(key, _UNSET)
+        if value is _UNSET:
+            self._scan()
+            value = self._values.get(key, _UNSET)
+            if value is _UNSET:
+                value = self._values[key] = _decode(self._text, self._spans[key])
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        # Unlike Mapping's default, doesn't decode the value
+        self._scan()
+        return key in self._spans
+
+    def __iter__(self) -> Iterator[str]:
+        self._scan()
+        return iter(self._spans)
+
+    def __len__(self) -> int:
+        self._scan()
+        return len(self._spans)
+
+    def __bool__(self) -> bool:
+        self._scan()
+        return bool(self._spans)
+
+    def locate(self, key: str) -> tuple[str, int] | None:
+        """(JSON text, offset of key's value), to read a value without decoding it."""
+        if key not in self:
+            return None
+        return self._text, self._spans[key]
+
+    def decode(self) -> dict:
+        """The whole object as plain dicts and lists (not cached)."""
+        return _DECODER.raw_decode(self._text, self._start)[0]
+
+    def __repr__(self) -> str:
+        return repr(self.decode())
+
+
+def _decode(text: str, pos: int):
+    if text.startswith('{', pos):
+        return LazyObject(text, pos)
+    if text.startswith('"', pos):
+        return scanstring(text, pos + 1)[0]
+    return _DECODER.raw_decode(text, pos)[0]
+
+
+def _string_end(text: str, pos: int) -> int:
+    """Offset just past the JSON string whose opening quote is at pos.
+
+    str.find jumps from quote to quote, which is fastest for text with few
+    of them (most output and file contents); past _FIND_QUOTES escaped
+    quotes, json's C scanner takes over.
+    """
+    start = pos + 1
+    for _ in range(_FIND_QUOTES):
+        q = text.find('"', start)
+        if q == -1:
+            raise json.JSONDecodeError("Unterminated string starting at", text, pos)
+        b = q
+        while text[b - 1] == '\\':
+            b -= 1
+        if (q - b) % 2 == 0:
+            return q + 1
+        start = q + 1
+    return scanstring(text, start)[1]
+
+
+def _skip(text: str, pos: int) -> int:
+    """Offset just past the JSON value starting at pos; the value is discarded."""
+    if text.startswith('"', pos):
+        return _string_end(text, pos)
+
+    if text.startswith(('{', '['), pos):
+        depth = 0
+        while True:
+            m = _STRUCTURE.search(text, pos)
+            if m is None:
+                raise json.JSONDecodeError("Unterminated value", text, len(text))
+            pos = m.start()
+            c = m.group()
+            if c == '"':
+                pos = _skip(text, pos)
+                continue
+            pos += 1
+            if c in '{[':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return pos
+
+    m = _SCALAR_END.search(text, pos)
+    end = len(text) if m is None else m.start()
+    if end == pos:
+        raise json.JSONDecodeError("Expecting value", text, pos)
+    return end
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Per-user scratch state for hookify plugin.
+
+Caches, sockets and checkpoints live outside the project so they never
+show up in `git status` and never bump the mtime of `.claude/`.
+
+Only `os` and `stat` are imported at module level: hook scripts locate
+the rule manifest through this module before anything else is loaded.
+"""
+
+import os
+import stat
+
+# Private per-process directory used when the state directory is unsafe
+_fallback_dir = None
+
+
+def state_dir() -> str:
+    """Return the per-user hookify state directory, creating it if needed.
+
+    Honors HOOKIFY_STATE_DIR, otherwise uses a private directory under the
+    system temp dir. The default path is predictable, so another local user
+    could create it first and plant rule snapshots or a server socket. It is
+    only used if it is a real directory (not a symlink) owned by this user
+    with no group or other permissions. Otherwise a warning is printed and
+    a throwaway directory is used, so nothing is cached across calls.
+    """
+    path = os.environ.get('HOOKIFY_STATE_DIR')
+    if not path:
+        uid = os.getuid() if hasattr(os, 'getuid') else 0
+        path = os.path.join(_temp_root(), f'hookify-{uid}')
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+    except OSError:
+        return _unsafe(path)
+    if not _is_private(path):
+        return _unsafe(path)
+    return path
+
+
+def _is_private(path: str) -> bool:
+    """True if path is a directory (not a symlink) only this user can access."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(st.st_mode):
+        return False
+    if hasattr(os, 'getuid'):
+        return st.st_uid == os.getuid() and not st.st_mode & 0o077
+    return True
+
+
+def _unsafe(path: str) -> str:
+    """A private directory for this process only, used instead of path."""
+    global _fallback_dir
+    if _fallback_dir is None:
+        import atexit
+        import shutil
+        import sys
+        import tempfile
+
+        print(f"Warning: hookify state directory {path} is not a private directory owned "
+              f"by you; not using it (rule caches and the hookify server are not used)", file=sys.stderr)
+        _fallback_dir = tempfile.mkdtemp(prefix='hookify-')
+        atexit.register(shutil.rmtree, _fallback_dir, True)
+    return _fallback_dir
+
+
+def _temp_root() -> str:
+    """The system temp dir, as tempfile.gettempdir() finds it.
+
+    Checks the usual locations directly; tempfile itself (~20 ms to import)
+    is only loaded when none of them exists.
+    """
+    for name in ('TMPDIR', 'TEMP', 'TMP'):
+        value = os.environ.get(name)
+        if value and os.path.isdir(value):
+            return value
+    if os.name != 'nt' and os.path.isdir('/tmp'):
+        return '/tmp'
+    import tempfile
+    return tempfile.gettempdir()
+
+
+def project_key(path: str) -> str:
+    """Return a short stable key for a directory (used in state file names).
+
+    64-bit FNV-1a of the real path, so no hashlib import is needed.
+    """
+    h = 0xcbf29ce484222325
+    for byte in os.path.realpath(path).encode('utf-8', 'surrogateescape'):
+        h = ((h ^ byte) * 0x100000001b3) & 0xffffffffffffffff
+    return f'{h:016x}'
+
+
+def state_path(kind: str, directory: str, suffix: str = '.json') -> str:
+    """Return the state file path for `kind` scoped to `directory`."""
+    return os.path.join(state_dir(), f'{kind}-{project_key(directory)}{suffix}')
+
+
+def session_state_path(kind: str, session_id: str, *parts: str) -> str:
+    """Return the state file path for `kind` scoped to a session (and parts)."""
+    import hashlib
+
+    key = '\0'.join((session_id,) + parts)
+    digest = hashlib.sha1(key.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+    return os.path.join(state_dir(), f'{kind}-{digest}.json')